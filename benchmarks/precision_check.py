@@ -0,0 +1,111 @@
+"""
+Accuracy and speed of `precision='single'` against the double-precision path.
+
+Both paths see the same snapshots: they are generated in double precision and
+rounded to complex64 for the single-precision estimators, so only the
+processing precision differs. For every estimator and array size the check
+reports the RMSE of both paths, the largest deviation between their estimates
+and the speedup, and fails (exit status 1) when the single-precision RMSE
+exceeds the double-precision one by more than `--rmse-tolerance` or the
+estimates deviate by more than `--max-deviation` radians.
+
+Usage (from the repository root):
+    python -m benchmarks.precision_check
+    python -m benchmarks.precision_check --antennas 16 128 --trials 64
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from doa_algorithms import Capon, Esprit, Music, RootMUSIC, indices_to_angles
+from doa_algorithms.refinement import coarse_peaks
+from signal_model import FarField1DSource
+
+FREQ = 1e9
+NUM_TARGET = 2
+NUM_SAMPLE = 512
+
+
+def _grid(num_doas):
+    return np.linspace(-np.pi/2, np.pi/2, num_doas, endpoint=False)
+
+
+def _estimators(antennas, grid, precision):
+    all_doas = _grid(grid)
+    args = (NUM_SAMPLE, NUM_TARGET, False, antennas, FREQ, True)
+    music = Music(all_doas, None, antennas, FREQ, precision=precision)
+    music_fft = Music(all_doas, None, antennas, FREQ, backend='fft', precision=precision)
+    capon = Capon(all_doas, *args, precision=precision)
+    root_music = RootMUSIC(*args, precision=precision)
+    esprit = Esprit(*args, precision=precision)
+    return {
+        'music': lambda x: coarse_peaks(music.estimate_batch(x, NUM_TARGET), all_doas, NUM_TARGET),
+        'music_fft': lambda x: coarse_peaks(music_fft.estimate_batch(x, NUM_TARGET), all_doas, NUM_TARGET),
+        'music_refined': lambda x: music.estimate_refined(x, NUM_TARGET),
+        'capon': lambda x: coarse_peaks(capon.estimate_batch(x), all_doas, NUM_TARGET),
+        'capon_refined': lambda x: capon.estimate_refined(x),
+        'root_music': lambda x: np.sort(root_music.estimate_batch(x, unit_circle_only=True), axis=-1),
+        'esprit': lambda x: np.sort(esprit.estimate_from_snapshots(x), axis=-1),
+    }
+
+
+def _timed(fn, x):
+    fn(x)
+    tic = time.perf_counter()
+    result = fn(x)
+    return result, time.perf_counter() - tic
+
+
+def check(antennas, grid, trials, snr, seed, rmse_tolerance, max_deviation, log=print):
+    rng = np.random.default_rng(seed)
+    angles = np.sort(rng.uniform(-1.0, 1.0, (trials, NUM_TARGET)), axis=-1)
+    # keep the sources resolvable for the smallest array
+    angles[:, 1] = np.maximum(angles[:, 1], angles[:, 0] + 4 / antennas)
+    source = FarField1DSource(NUM_SAMPLE, NUM_TARGET, False, antennas, FREQ, True, seed=seed)
+    x_double = source.collect_plane_wave_response_batch(angles, snr)
+    x_single = x_double.astype(np.complex64)
+
+    double = _estimators(antennas, grid, 'double')
+    single = _estimators(antennas, grid, 'single')
+    failures = []
+    for name in double:
+        estimate_double, seconds_double = _timed(double[name], x_double)
+        estimate_single, seconds_single = _timed(single[name], x_single)
+        rmse_double = np.sqrt(np.nanmean((estimate_double - angles)**2))
+        rmse_single = np.sqrt(np.nanmean((estimate_single - angles)**2))
+        deviation = np.nanmax(np.abs(estimate_single - estimate_double))
+        ok = rmse_single <= rmse_double * (1 + rmse_tolerance) + 1e-12 and deviation <= max_deviation
+        log(f"{name:14s} M={antennas:4d} rmse {rmse_double:.3e} -> {rmse_single:.3e}  "
+            f"max deviation {deviation:.2e}  speedup x{seconds_double / seconds_single:5.2f}  "
+            f"{'ok' if ok else 'FAIL'}")
+        if not ok:
+            failures.append((name, antennas))
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--antennas', nargs='+', type=int, default=[16, 64, 128])
+    parser.add_argument('--grid', type=int, default=4096)
+    parser.add_argument('--trials', type=int, default=32)
+    parser.add_argument('--snr', type=float, default=10.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--rmse-tolerance', type=float, default=0.05,
+                        help='allowed relative RMSE increase of the single-precision path')
+    parser.add_argument('--max-deviation', type=float, default=1e-3,
+                        help='allowed deviation between single and double estimates, in radians')
+    args = parser.parse_args(argv)
+
+    failures = []
+    for antennas in args.antennas:
+        failures += check(antennas, args.grid, args.trials, args.snr, args.seed,
+                          args.rmse_tolerance, args.max_deviation)
+    if failures:
+        print(f"{len(failures)} check(s) exceeded the tolerances: {failures}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
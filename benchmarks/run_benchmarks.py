@@ -0,0 +1,324 @@
+"""
+Throughput and peak-memory benchmarks for every estimator in `doa_algorithms`
+and for the signal model, over a matrix of array, grid, snapshot and batch sizes.
+
+Usage (from the repository root):
+    python -m benchmarks.run_benchmarks --quick
+    python -m benchmarks.run_benchmarks --only music capon --antennas 16 64 --output results.json
+    python -m benchmarks.run_benchmarks --compare baseline.json --output results.json
+
+Every case reports estimates per second (batch items processed per second) and
+the peak memory traced during a single call. Results are written as JSON so two
+runs can be diffed with `--compare`.
+"""
+import argparse
+import itertools
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import scipy
+
+from doa_algorithms import (
+    Bartlett, Capon, Capon2D, CramerRaoBound, DOATracker, Esprit, Music, Music2D, RootMUSIC, SpectrumPeakFinder,
+    WidebandMusic)
+from signal_model import FarField1DSource, FarField2DSource, WidebandFarField1DSource, fbss
+
+FREQ = 1e9
+NUM_TARGET = 2
+ANGLES = np.array([-0.3, 0.4])
+
+FULL_MATRIX = {
+    'antennas': [8, 16, 32, 64, 128, 256],
+    'grid': [256, 1024, 4096, 16384],
+    'snapshots': [32, 256, 1024, 8192],
+    'batch': [1, 16],
+}
+QUICK_MATRIX = {
+    'antennas': [8, 32],
+    'grid': [256, 1024],
+    'snapshots': [64, 512],
+    'batch': [1, 8],
+}
+
+
+def _snapshots(num_antenna, num_sample, batch, seed=0):
+    source = FarField1DSource(num_sample, NUM_TARGET, False, num_antenna, FREQ, True, seed=seed)
+    return source.collect_plane_wave_response_batch(np.tile(ANGLES, (batch, 1)), 10)
+
+
+def _grid(num_doas):
+    return np.linspace(-np.pi/3, np.pi/3, num_doas, endpoint=False)
+
+
+def bench_music(antennas, grid, snapshots, batch):
+    music = Music(_grid(grid), None, antennas, FREQ)
+    x = _snapshots(antennas, snapshots, batch)
+    return lambda: music.estimate_batch(x, NUM_TARGET)
+
+
+def bench_music_fft(antennas, grid, snapshots, batch):
+    music = Music(_grid(grid), None, antennas, FREQ, backend='fft')
+    x = _snapshots(antennas, snapshots, batch)
+    return lambda: music.estimate_batch(x, NUM_TARGET)
+
+
+def bench_music_randomized(antennas, grid, snapshots, batch):
+    music = Music(_grid(grid), None, antennas, FREQ, backend='fft', eigensolver='randomized')
+    x = _snapshots(antennas, snapshots, batch)
+    return lambda: music.estimate_batch(x, NUM_TARGET)
+
+
+def bench_music_refined(antennas, grid, snapshots, batch):
+    music = Music(_grid(grid), None, antennas, FREQ)
+    x = _snapshots(antennas, snapshots, batch)
+    return lambda: music.estimate_refined(x, NUM_TARGET)
+
+
+def bench_tracking(antennas, grid, snapshots, batch):
+    # steady-state tracking: the first frame's full scan is excluded by the warm-up call
+    tracker = DOATracker(Music(_grid(grid), None, antennas, FREQ), NUM_TARGET)
+    x = _snapshots(antennas, snapshots, batch)
+    return lambda: [tracker.update(frame) for frame in x]
+
+
+def bench_capon(antennas, grid, snapshots, batch):
+    capon = Capon(_grid(grid), snapshots, NUM_TARGET, False, antennas, FREQ, True)
+    x = _snapshots(antennas, snapshots, batch)
+    return lambda: capon.estimate_batch(x)
+
+
+def bench_capon_fft(antennas, grid, snapshots, batch):
+    capon = Capon(_grid(grid), snapshots, NUM_TARGET, False, antennas, FREQ, True, backend='fft')
+    x = _snapshots(antennas, snapshots, batch)
+    return lambda: capon.estimate_batch(x)
+
+
+def bench_bartlett(antennas, grid, snapshots, batch):
+    bartlett = Bartlett(_grid(grid), antennas, FREQ)
+    x = _snapshots(antennas, snapshots, batch)
+    return lambda: bartlett.estimate(x)
+
+
+def bench_bartlett_fft(antennas, grid, snapshots, batch):
+    bartlett = Bartlett(_grid(grid), antennas, FREQ, backend='fft')
+    x = _snapshots(antennas, snapshots, batch)
+    return lambda: bartlett.estimate(x)
+
+
+def bench_music_2d(antennas, snapshots, batch):
+    # square URA with about `antennas` elements on a 1-degree azimuth-elevation grid
+    side = max(2, int(np.sqrt(antennas)))
+    music = Music2D(np.deg2rad(np.arange(-90, 90)), np.deg2rad(np.arange(-45, 45)), side, side, FREQ)
+    source = FarField2DSource(snapshots, NUM_TARGET, False, side, side, FREQ, True, seed=0)
+    x = source.collect_plane_wave_response_batch(np.tile(np.stack((ANGLES, ANGLES / 2), axis=-1), (batch, 1, 1)), 10)
+    return lambda: music.estimate(x, NUM_TARGET)
+
+
+def bench_capon_2d(antennas, snapshots, batch):
+    side = max(2, int(np.sqrt(antennas)))
+    capon = Capon2D(np.deg2rad(np.arange(-90, 90)), np.deg2rad(np.arange(-45, 45)), side, side, FREQ)
+    source = FarField2DSource(snapshots, NUM_TARGET, False, side, side, FREQ, True, seed=0)
+    x = source.collect_plane_wave_response_batch(np.tile(np.stack((ANGLES, ANGLES / 2), axis=-1), (batch, 1, 1)), 10)
+    return lambda: capon.estimate(x)
+
+
+def bench_wideband_music(antennas, grid, snapshots, batch):
+    # 64 STFT bins over a 40% fractional bandwidth
+    sampling_rate = 0.4 * FREQ
+    music = WidebandMusic(_grid(grid), sampling_rate, antennas, FREQ, nfft=64)
+    source = WidebandFarField1DSource(
+        max(snapshots, 64), NUM_TARGET, False, antennas, FREQ, sampling_rate, sampling_rate, seed=0)
+    x = source.collect_plane_wave_response_batch(np.tile(ANGLES, (batch, 1)), 10)
+    return lambda: music.estimate(x, NUM_TARGET)
+
+
+def bench_root_music(antennas, snapshots, batch):
+    root_music = RootMUSIC(snapshots, NUM_TARGET, False, antennas, FREQ, True)
+    x = _snapshots(antennas, snapshots, batch)
+    return lambda: root_music.estimate_batch(x, unit_circle_only=True)
+
+
+def bench_esprit(antennas, snapshots, batch):
+    esprit = Esprit(snapshots, NUM_TARGET, False, antennas, FREQ, True)
+    x = _snapshots(antennas, snapshots, batch)
+    return lambda: esprit.estimate_from_snapshots(x)
+
+
+def bench_crb(antennas, snapshots, batch):
+    crb = CramerRaoBound(snapshots, antennas, FREQ)
+    doas = np.sort(np.random.default_rng(0).uniform(-1, 1, (batch, NUM_TARGET)), axis=1)
+    snrs = np.arange(-20, 21, 5)
+    # bypass the memoization so every call does the work
+    return lambda: crb._crb(doas, snrs, 'stochastic')
+
+
+def bench_fbss(antennas, snapshots, batch):
+    x = _snapshots(antennas, snapshots, batch)
+    num_subarray = max(1, antennas // 4)
+    return lambda: fbss(x, antennas, num_subarray)
+
+
+def bench_peak_finder(grid, batch):
+    music = Music(_grid(grid), None, 16, FREQ)
+    spectra = music.estimate_batch(_snapshots(16, 256, batch), NUM_TARGET)
+    peak_finder = SpectrumPeakFinder(NUM_TARGET, filter_type='butterworth')
+    return lambda: peak_finder.find_peaks_batch(spectra)
+
+
+def bench_signal_generation(antennas, snapshots, batch):
+    source = FarField1DSource(snapshots, NUM_TARGET, False, antennas, FREQ, True, seed=0)
+    angles = np.tile(ANGLES, (batch, 1))
+    out = np.empty((batch, snapshots, antennas), dtype=np.complex128)
+    return lambda: source.collect_plane_wave_response_batch(angles, 10, out=out)
+
+
+BENCHMARKS = {
+    'music': bench_music,
+    'music_fft': bench_music_fft,
+    'music_randomized': bench_music_randomized,
+    'music_refined': bench_music_refined,
+    'tracking': bench_tracking,
+    'capon': bench_capon,
+    'capon_fft': bench_capon_fft,
+    'bartlett': bench_bartlett,
+    'bartlett_fft': bench_bartlett_fft,
+    'music_2d': bench_music_2d,
+    'capon_2d': bench_capon_2d,
+    'wideband_music': bench_wideband_music,
+    'root_music': bench_root_music,
+    'esprit': bench_esprit,
+    'crb': bench_crb,
+    'fbss': bench_fbss,
+    'peak_finder': bench_peak_finder,
+    'signal_generation': bench_signal_generation,
+}
+
+
+def _parameters(bench):
+    code = bench.__code__
+    return code.co_varnames[:code.co_argcount]
+
+
+def _input_bytes(case):
+    # complex128 snapshot tensor, the dominant allocation of most cases
+    return 16 * case.get('batch', 1) * case.get('snapshots', 1) * case.get('antennas', 1)
+
+
+def _time_call(fn, min_time, max_repeat):
+    fn()
+    timings = []
+    start = time.perf_counter()
+    while len(timings) < max_repeat and (time.perf_counter() - start < min_time or len(timings) < 3):
+        tic = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - tic)
+    return float(np.median(timings)), len(timings)
+
+
+def _peak_memory(fn):
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def run(names, matrix, min_time, max_repeat, max_bytes, log=print):
+    results = []
+    for name in names:
+        bench = BENCHMARKS[name]
+        params = _parameters(bench)
+        for values in itertools.product(*(matrix[p] for p in params)):
+            case = dict(zip(params, values))
+            if _input_bytes(case) > max_bytes:
+                continue
+            fn = bench(**case)
+            seconds, repeats = _time_call(fn, min_time, max_repeat)
+            peak = _peak_memory(fn)
+            batch = case.get('batch', 1)
+            result = {
+                'benchmark': name,
+                'params': case,
+                'seconds_per_call': seconds,
+                'estimates_per_second': batch / seconds,
+                'peak_memory_bytes': peak,
+                'repeats': repeats,
+            }
+            results.append(result)
+            log(f"{name:18s} {json.dumps(case):70s} {result['estimates_per_second']:12.1f} est/s "
+                f"{peak / 2**20:9.2f} MiB")
+    return results
+
+
+def _metadata():
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'python': sys.version.split()[0],
+        'numpy': np.__version__,
+        'scipy': scipy.__version__,
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+def compare(baseline, results, log=print):
+    """
+    Print the throughput ratio (current / baseline) of every case present in both runs.
+    """
+    def key(result):
+        return result['benchmark'], json.dumps(result['params'], sort_keys=True)
+
+    previous = {key(result): result for result in baseline['results']}
+    for result in results:
+        old = previous.get(key(result))
+        if old is None:
+            continue
+        ratio = result['estimates_per_second'] / old['estimates_per_second']
+        log(f"{result['benchmark']:18s} {key(result)[1]:70s} x{ratio:6.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument('--quick', action='store_true', help='small parameter matrix for smoke runs')
+    for axis in FULL_MATRIX:
+        parser.add_argument(f'--{axis}', nargs='+', type=int, help=f'override the {axis} axis')
+    parser.add_argument('--min-time', type=float, default=0.2, help='minimum timed seconds per case')
+    parser.add_argument('--max-repeat', type=int, default=50)
+    parser.add_argument('--max-bytes', type=float, default=256 * 2**20,
+                        help='skip cases whose snapshot tensor exceeds this size')
+    parser.add_argument('--output', help='write results to this JSON file')
+    parser.add_argument('--compare', help='baseline JSON to compare against')
+    args = parser.parse_args(argv)
+
+    matrix = dict(QUICK_MATRIX if args.quick else FULL_MATRIX)
+    for axis in FULL_MATRIX:
+        if getattr(args, axis) is not None:
+            matrix[axis] = getattr(args, axis)
+
+    results = run(args.only, matrix, args.min_time, args.max_repeat, args.max_bytes)
+    report = {'metadata': _metadata(), 'matrix': matrix, 'results': results}
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=1)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), results)
+    return report
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,16 @@
+from .bartlett import Bartlett
 from .capon import Capon
+from .context import FrameContext
 from .cramer_rao_bound_doa import CramerRaoBound
 from .esprite import Esprit
 from .music import Music
+from .planar import Capon2D, Music2D, coarse_peaks_2d
 from .root_music import RootMUSIC
-from .utils import SpectrumPeakFinder
+from .utils import SpectrumPeakFinder, indices_to_angles
+from .streaming import StreamingCovariance, SubspaceTracker
+from .tracking import DOATracker
+from .wideband import WidebandMusic
+from .evaluation import MonteCarloEvaluator
+from .profiling import StageProfiler, stage
+from .refinement import refine_minima
+from .service import DOAService, encode_frame
@@ -0,0 +1,58 @@
+import numpy as np
+from signal_model.sensor_array import UniformLinearSensorArray
+
+from .context import as_frame_context
+from .profiling import stage
+from .utils import SPECTRUM_BACKENDS, fft_quadratic_form
+
+
+class Bartlett(UniformLinearSensorArray):
+    """
+    Conventional (delay-and-sum) beamformer spectrum `a^H R a / a^H a`.
+    """
+
+    def __init__(
+        self,
+        all_doas: list,
+        *args,
+        backend: str = 'matrix',
+        fft_size: int = None,
+        **kwargs
+    ):
+        super().__init__(*args, **kwargs)
+        if backend not in SPECTRUM_BACKENDS:
+            raise ValueError(f"Invalid backend '{backend}'. Supported are {SPECTRUM_BACKENDS}.")
+        self.all_doas = all_doas
+        self.backend = backend
+        self.fft_size = fft_size
+
+    def _manifold_matrix(self) -> np.ndarray:
+        return self.manifold(self.all_doas)
+
+    def estimate(self, input_signal: np.ndarray) -> np.ndarray:
+        """
+        input shape:
+            (..., num_sample, num_antenna), or a `FrameContext`
+        output shape:
+            (..., num_doas)
+        """
+        return self.estimate_from_covariance(as_frame_context(input_signal, self.complex_dtype).covariance)
+
+    def estimate_from_covariance(self, R: np.ndarray) -> np.ndarray:
+        """
+        input shape:
+            (..., num_antenna, num_antenna)
+        output shape:
+            (..., num_doas)
+        """
+        R = np.asarray(R).astype(self.complex_dtype, copy=False)
+        if self.backend == 'fft':
+            with stage('spectrum'):
+                power = fft_quadratic_form(R, self.all_doas, self.d / self._lambda, self._is_degrees, self.fft_size)
+                return power / R.shape[-1]
+
+        with stage('manifold'):
+            A = self._manifold_matrix()
+        with stage('spectrum'):
+            power = np.real(np.sum(A.conj() * (R @ A), axis=-2))
+            return power / R.shape[-1]
@@ -1,36 +1,170 @@
 import numpy as np
-from scipy import linalg
 from signal_model.antenna_response import FarField1DSource
+from signal_model.covariance import sample_covariance
+
+from .context import FrameContext
+from .profiling import stage
+from .refinement import coarse_peaks, grid_spacing, refine_minima
+from .utils import SPECTRUM_BACKENDS, fft_quadratic_form
+
+
+def _relative_loading(R: np.ndarray, diagonal_loading: float) -> np.ndarray:
+    """
+    Diagonal loading relative to the average element power, per matrix.
+
+    output shape:
+        (...)
+    """
+    return diagonal_loading * np.trace(R, axis1=-2, axis2=-1).real / R.shape[-1]
+
+
+def whitening_matrix(source, diagonal_loading: float = 0.0, dtype=np.complex128) -> np.ndarray:
+    """
+    `W` with `W^H W = (R + loading I)^-1`, so that `a^H R^-1 a = ||W a||^2`.
+    For a covariance this is `L^-1` of the Cholesky factor `R = L L^H`; for
+    a `FrameContext` it is `diag(lambda)^-1/2 V^H` from the eigendecomposition
+    the context already holds.
+
+    input shape:
+        (..., num_antenna, num_antenna) or a `FrameContext`
+    output shape:
+        (..., num_antenna, num_antenna)
+    """
+    if isinstance(source, FrameContext):
+        loading = _relative_loading(source.covariance, diagonal_loading)
+        eigenvalues = source.eigenvalues + loading[..., np.newaxis]
+        if np.any(eigenvalues <= 0):
+            raise ValueError("R is not positive definite, consider diagonal loading.")
+        scaled = source.eigenvectors / np.sqrt(eigenvalues)[..., np.newaxis, :]
+        return scaled.conj().swapaxes(-1, -2)
+
+    R = np.asarray(source).astype(dtype, copy=False)
+    loading = _relative_loading(R, diagonal_loading)
+    if np.any(loading > 0):
+        R = R + loading[..., np.newaxis, np.newaxis] * np.eye(R.shape[-1], dtype=R.real.dtype)
+    with stage('decomposition'):
+        try:
+            L = np.linalg.cholesky(R)
+        except np.linalg.LinAlgError:
+            raise ValueError("Failed to factorize R, consider diagonal loading.")
+        return np.linalg.solve(L, np.broadcast_to(np.eye(L.shape[-1], dtype=L.dtype), L.shape))
 
 
 class Capon(FarField1DSource):
-    def __init__(self, all_doas, *args, **kwargs):
+    def __init__(
+        self,
+        all_doas,
+        *args,
+        diagonal_loading: float = 0.0,
+        backend: str = 'matrix',
+        fft_size: int = None,
+        **kwargs
+    ):
         super().__init__(*args, **kwargs)
+        if backend not in SPECTRUM_BACKENDS:
+            raise ValueError(f"Invalid backend '{backend}'. Supported are {SPECTRUM_BACKENDS}.")
         self.all_doas = all_doas
+        self.diagonal_loading = diagonal_loading
+        self.backend = backend
+        self.fft_size = fft_size
 
-    def _calc_weights(self, R_inv, stv):
-        w = R_inv @ stv
-        w /= (stv.conj().T @ R_inv @ stv)
-        return w
+    def _manifold_matrix(self) -> np.ndarray:
+        return self.manifold(self.all_doas)
 
-    def _calc_power(self, weights, signal):
-        y = np.dot(weights.conj().T, signal.T)
-        power = np.mean(np.abs(y)**2)
-        return power
+    def _whitening(self, source, diagonal_loading: float = None) -> np.ndarray:
+        if diagonal_loading is None:
+            diagonal_loading = self.diagonal_loading
+        return whitening_matrix(source, diagonal_loading, self.complex_dtype)
+
+    def _source(self, input_signals):
+        if isinstance(input_signals, FrameContext):
+            return input_signals
+        with stage('covariance'):
+            return sample_covariance(input_signals, dtype=self.complex_dtype)
+
+    @staticmethod
+    def _inverse(W: np.ndarray) -> np.ndarray:
+        return W.conj().swapaxes(-1, -2) @ W
+
+    def _spectrum(self, W: np.ndarray) -> np.ndarray:
+        if self.backend == 'fft':
+            with stage('spectrum'):
+                denominator = fft_quadratic_form(
+                    self._inverse(W), self.all_doas, self.d / self._lambda, self._is_degrees, self.fft_size)
+                return (1 / denominator).astype(self.real_dtype)
+
+        with stage('manifold'):
+            A = self._manifold_matrix()
+        with stage('spectrum'):
+            whitened = W @ A
+            denominator = np.sum(whitened.real**2 + whitened.imag**2, axis=-2)
+            return (1 / denominator).astype(self.real_dtype)
+
+    def estimate_from_covariance(self, R: np.ndarray, diagonal_loading: float = None) -> np.ndarray:
+        """
+        MVDR spectrum `1 / (a^H R^-1 a)` over `all_doas`, computed as
+        `1 / ||W a||^2` with the whitening matrix of `_whitening`. The 'fft'
+        backend forms `R^-1 = W^H W` and evaluates it with `fft_quadratic_form`.
+
+        input shape:
+            (..., num_antenna, num_antenna)
+        output shape:
+            (..., num_doas)
+        """
+        return self._spectrum(self._whitening(R, diagonal_loading))
+
+    def estimate_batch(self, input_signals: np.ndarray, diagonal_loading: float = None) -> np.ndarray:
+        """
+        A `FrameContext` is whitened with its eigendecomposition, snapshots
+        with a Cholesky factor of their covariance.
+
+        input shape:
+            (batch, num_sample, num_antenna), or a `FrameContext`
+        output shape:
+            (batch, num_doas)
+        """
+        return self._spectrum(self._whitening(self._source(input_signals), diagonal_loading))
 
     def estimate(self, doas: np.ndarray, snr: int):
-        power = np.empty_like(self.all_doas, dtype=np.float32)
         sig = self.collect_plane_wave_response(doas, snr)
-        R = np.cov(sig, rowvar=False)
-        try:
-            R_inv = linalg.inv(R)
-        except linalg.LinAlgError:
-            raise ValueError("Failed to invert R.")
+        with stage('covariance'):
+            R = sample_covariance(sig)
+        return self.estimate_from_covariance(R)
 
-        for i, doa in enumerate(self.all_doas):
-            stv = self.steering_vector(doa)[:, np.newaxis]
+    def estimate_refined(
+        self,
+        input_signals: np.ndarray,
+        method: str = 'newton',
+        num_iter: int = None,
+        peak_finder=None,
+        diagonal_loading: float = None
+    ) -> np.ndarray:
+        """
+        Coarse-to-fine DOAs of `num_target` sources: the peaks of the spectrum
+        over `all_doas` are refined off-grid by `refine_minima` on `a^H R^-1 a`.
 
-            w = self._calc_weights(R_inv, stv)
-            power[i] = self._calc_power(w, sig)
+        input shape:
+            (..., num_sample, num_antenna), or a `FrameContext`
+        output shape:
+            (..., num_target)
+        """
+        return self.estimate_refined_from_covariance(
+            self._source(input_signals), method, num_iter, peak_finder, diagonal_loading)
 
-        return power
+    def estimate_refined_from_covariance(
+        self,
+        R: np.ndarray,
+        method: str = 'newton',
+        num_iter: int = None,
+        peak_finder=None,
+        diagonal_loading: float = None
+    ) -> np.ndarray:
+        """
+        input shape:
+            (..., num_antenna, num_antenna)
+        output shape:
+            (..., num_target)
+        """
+        W = self._whitening(R, diagonal_loading)
+        angles = coarse_peaks(self._spectrum(W), self.all_doas, self.num_target, peak_finder)
+        return refine_minima(self, self._inverse(W), angles, method, num_iter, grid_spacing(self.all_doas))
@@ -0,0 +1,250 @@
+import numpy as np
+from scipy.sparse.linalg import eigsh
+from signal_model.covariance import sample_covariance
+
+from .profiling import stage
+
+SOURCE_COUNT_CRITERIA = ('mdl', 'aic')
+EIGENSOLVERS = ('full', 'lanczos', 'randomized')
+
+
+def _lanczos_subspace(R: np.ndarray, k: int) -> np.ndarray:
+    """
+    Dominant `k` eigenvectors of every matrix with ARPACK's Lanczos iteration.
+
+    input shape:
+        (..., num_antenna, num_antenna)
+    output shape:
+        (..., num_antenna, k)
+    """
+    num_antenna = R.shape[-1]
+    flat = R.reshape(-1, num_antenna, num_antenna)
+    vectors = np.empty((flat.shape[0], num_antenna, k), dtype=R.dtype)
+    # a fixed start vector keeps the result reproducible
+    v0 = np.ones(num_antenna, dtype=R.dtype)
+    for i, matrix in enumerate(flat):
+        eigenvalues, eigenvectors = eigsh(matrix, k=k, which='LA', v0=v0)
+        vectors[i] = eigenvectors[:, np.argsort(eigenvalues)[::-1]]
+    return vectors.reshape(R.shape[:-1] + (k,))
+
+
+def _randomized_subspace(R: np.ndarray, k: int, oversample: int = 8, num_iter: int = 3) -> np.ndarray:
+    """
+    Dominant `k` eigenvectors from a randomized range finder with `num_iter`
+    subspace iterations and a Rayleigh-Ritz step, batched over the leading axes.
+
+    input shape:
+        (..., num_antenna, num_antenna)
+    output shape:
+        (..., num_antenna, k)
+    """
+    num_antenna = R.shape[-1]
+    size = min(num_antenna, k + oversample)
+    probe = np.random.default_rng(0).standard_normal((num_antenna, size)).astype(R.dtype)
+    Q = np.linalg.qr(R @ probe)[0]
+    for _ in range(num_iter):
+        Q = np.linalg.qr(R @ Q)[0]
+    Q_H = Q.conj().swapaxes(-1, -2)
+    # eigh sorts ascending, the dominant Ritz vectors are the trailing ones
+    ritz = np.linalg.eigh(Q_H @ R @ Q)[1][..., ::-1][..., :k]
+    return Q @ ritz
+
+
+class FrameContext:
+    """
+    Covariance and Hermitian eigendecomposition of one frame (or a batch of
+    frames), computed lazily and at most once. Every estimator accepts a
+    context in place of snapshots, so running several of them on the same
+    frame costs one covariance and one eigendecomposition.
+
+    Usage:
+        ctx = FrameContext(sig)
+        music.estimate(ctx, ctx.mdl())
+        esprit.estimate_from_snapshots(ctx)
+
+    Parameters:
+    - `input_signal`: Snapshots, (..., num_sample, num_antenna).
+    - `covariance`: Covariances, (..., num_antenna, num_antenna), e.g. the output of `fbss`.
+      Exactly one of `input_signal` and `covariance` must be given.
+    - `num_sample`: Snapshots behind `covariance`, needed for `mdl` and `aic`.
+    - `dtype`: Complex dtype the data is cast to, e.g. an estimator's `complex_dtype`.
+    """
+
+    def __init__(
+        self,
+        input_signal: np.ndarray = None,
+        covariance: np.ndarray = None,
+        num_sample: int = None,
+        dtype=None
+    ):
+        if (input_signal is None) == (covariance is None):
+            raise ValueError("Exactly one of input_signal or covariance must be given.")
+        if dtype is not None:
+            if input_signal is not None:
+                input_signal = np.asarray(input_signal).astype(dtype, copy=False)
+            else:
+                covariance = np.asarray(covariance).astype(dtype, copy=False)
+        self._input_signal = input_signal
+        self._covariance = covariance
+        self._eigenvalues = None
+        self._eigenvectors = None
+        self._noise_projectors = {}
+        self._partial_subspaces = {}
+        if num_sample is None and input_signal is not None:
+            num_sample = input_signal.shape[-2]
+        self.num_sample = num_sample
+
+    @property
+    def num_antenna(self) -> int:
+        source = self._covariance if self._input_signal is None else self._input_signal
+        return source.shape[-1]
+
+    @property
+    def covariance(self) -> np.ndarray:
+        """
+        output shape:
+            (..., num_antenna, num_antenna)
+        """
+        if self._covariance is None:
+            with stage('covariance'):
+                self._covariance = sample_covariance(self._input_signal)
+        return self._covariance
+
+    def _decompose(self):
+        if self._eigenvalues is None:
+            R = self.covariance
+            with stage('decomposition'):
+                self._eigenvalues, self._eigenvectors = np.linalg.eigh(R)
+
+    @property
+    def eigenvalues(self) -> np.ndarray:
+        """
+        Ascending, as returned by `eigh`.
+
+        output shape:
+            (..., num_antenna)
+        """
+        self._decompose()
+        return self._eigenvalues
+
+    @property
+    def eigenvectors(self) -> np.ndarray:
+        """
+        Columns ordered like `eigenvalues`.
+
+        output shape:
+            (..., num_antenna, num_antenna)
+        """
+        self._decompose()
+        return self._eigenvectors
+
+    def noise_subspace(self, num_sources: int) -> np.ndarray:
+        """
+        output shape:
+            (..., num_antenna, num_antenna - num_sources)
+        """
+        return self.eigenvectors[..., :self.num_antenna - num_sources]
+
+    def signal_subspace(self, num_sources: int) -> np.ndarray:
+        """
+        Strongest eigenvector first.
+
+        output shape:
+            (..., num_antenna, num_sources)
+        """
+        return self.eigenvectors[..., ::-1][..., :num_sources]
+
+    def dominant_subspace(self, num_sources: int, eigensolver: str = 'full') -> np.ndarray:
+        """
+        Signal subspace from `eigensolver`: 'full' slices the complete
+        decomposition, 'lanczos' and 'randomized' extract only the
+        `num_sources` dominant eigenvectors in O(M^2 K) for large arrays.
+        Results are cached per solver and number of sources, and a complete
+        decomposition is reused when one already exists.
+
+        output shape:
+            (..., num_antenna, num_sources)
+        """
+        if eigensolver not in EIGENSOLVERS:
+            raise ValueError(f"Unknown eigensolver '{eigensolver}'. Supported are {EIGENSOLVERS}.")
+        if eigensolver == 'full' or self._eigenvectors is not None:
+            return self.signal_subspace(num_sources)
+
+        key = (num_sources, eigensolver)
+        if key not in self._partial_subspaces:
+            R = self.covariance
+            with stage('decomposition'):
+                if eigensolver == 'lanczos':
+                    self._partial_subspaces[key] = _lanczos_subspace(R, num_sources)
+                else:
+                    self._partial_subspaces[key] = _randomized_subspace(R, num_sources)
+        return self._partial_subspaces[key]
+
+    def noise_projector(self, num_sources: int, eigensolver: str = 'full') -> np.ndarray:
+        """
+        `En En^H`, or `I - Es Es^H` from `dominant_subspace` for a partial
+        `eigensolver`, cached per number of sources and solver.
+
+        output shape:
+            (..., num_antenna, num_antenna)
+        """
+        key = (num_sources, eigensolver)
+        if key not in self._noise_projectors:
+            if eigensolver == 'full':
+                En = self.noise_subspace(num_sources)
+                projector = En @ En.conj().swapaxes(-1, -2)
+            else:
+                Es = self.dominant_subspace(num_sources, eigensolver)
+                projector = np.eye(self.num_antenna, dtype=Es.dtype) - Es @ Es.conj().swapaxes(-1, -2)
+            self._noise_projectors[key] = projector
+        return self._noise_projectors[key]
+
+    def information_criterion(self, criterion: str = 'mdl') -> np.ndarray:
+        """
+        MDL or AIC of Wax and Kailath for every candidate number of sources
+        `k = 0 ... num_antenna - 1`, from the equality of the `num_antenna - k`
+        smallest eigenvalues.
+
+        output shape:
+            (..., num_antenna)
+        """
+        if criterion not in SOURCE_COUNT_CRITERIA:
+            raise ValueError(f"Unknown criterion '{criterion}'. Supported are {SOURCE_COUNT_CRITERIA}.")
+        if self.num_sample is None:
+            raise ValueError("num_sample is required for source counting from a covariance.")
+
+        M = self.num_antenna
+        N = self.num_sample
+        # the criteria difference nearly equal logs, so they are evaluated in double precision
+        eigenvalues = np.maximum(self.eigenvalues.astype(float), np.finfo(float).tiny)
+        # noise eigenvalues of hypothesis k are the M - k smallest, i.e. the first M - k ascending
+        k = np.arange(M)
+        num_noise = M - k
+        log_geometric = np.cumsum(np.log(eigenvalues), axis=-1)[..., ::-1] / num_noise
+        log_arithmetic = np.log(np.cumsum(eigenvalues, axis=-1)[..., ::-1] / num_noise)
+        log_likelihood = N * num_noise * (log_arithmetic - log_geometric)
+
+        if criterion == 'mdl':
+            return log_likelihood + 0.5 * k * (2 * M - k) * np.log(N)
+        return 2 * log_likelihood + 2 * k * (2 * M - k)
+
+    def mdl(self) -> np.ndarray:
+        """
+        Number of sources minimizing the MDL criterion, an int per frame.
+        """
+        return np.argmin(self.information_criterion('mdl'), axis=-1)
+
+    def aic(self) -> np.ndarray:
+        """
+        Number of sources minimizing the AIC criterion, an int per frame.
+        """
+        return np.argmin(self.information_criterion('aic'), axis=-1)
+
+
+def as_frame_context(input_signal, dtype=None) -> FrameContext:
+    """
+    Wrap snapshots in a `FrameContext` of the given dtype; contexts are returned unchanged.
+    """
+    if isinstance(input_signal, FrameContext):
+        return input_signal
+    return FrameContext(input_signal, dtype=dtype)
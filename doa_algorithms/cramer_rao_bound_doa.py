@@ -1,47 +1,118 @@
+import warnings
+from collections import OrderedDict
+
 import numpy as np
-from scipy import linalg
 from signal_model.sensor_array import UniformLinearSensorArray
 
+from .profiling import stage
+
 
 class CramerRaoBound(UniformLinearSensorArray):
-    def __init__(self, num_samples, *args, **kwargs):
+    """
+    Stochastic and deterministic CRB for uncorrelated, equal-power sources in
+    unit-power white noise, in the projector form of [1]:
+
+        CRB_sto = 1/(2N) {Re[(D^H P_A^perp D) . (P A^H R^-1 A P)^T]}^-1
+        CRB_det = 1/(2N) {Re[(D^H P_A^perp D) . P^T]}^-1
+
+    With `P = p I` and `G = A^H A`, `A^H R^-1 A = (I + p G)^-1 G`, so every
+    quantity is a (num_doas, num_doas) matrix and no (num_antenna, num_antenna)
+    inverse is needed. The Fisher information is inverted near singularity for
+    closely spaced sources, so the bound is always evaluated in double precision
+    whatever the array's `precision`.
+
+    The stochastic bound is larger than that of the earlier hand-assembled
+    FIM, by about 1.5x for well separated sources at high SNR and by up to
+    three orders of magnitude for closely spaced sources at low SNR. That FIM
+    was not the expansion of `N tr(R^-1 dR_i R^-1 dR_j)` and treated the
+    source and noise powers as known.
+
+    References:
+        [1] P. Stoica, E. G. Larsson and A. B. Gershman, "The stochastic CRB for
+        array processing: a textbook derivation," IEEE Signal Processing
+        Letters, vol. 8, no. 5, pp. 148–150, May 2001.
+    """
+
+    def __init__(self, num_samples, *args, cache_size: int = 1024, **kwargs):
         super().__init__(*args, **kwargs)
         self.num_samples = num_samples
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
 
     def crb_stochastic(self, doas, snr):
-        doas = np.array(doas).flatten()
-        num_doas = len(doas)
+        return self.crb_surface(np.array(doas).flatten(), snr, model='stochastic')
 
-        A = self.steering_matrix(doas)
-        dA = self.steering_matrix_derivative(doas)
+    def crb_deterministic(self, doas, snr):
+        return self.crb_surface(np.array(doas).flatten(), snr, model='deterministic')
 
-        snr_linear = 10**(snr/10)
+    def crb_surface(self, doas: np.ndarray, snrs, model: str = 'stochastic') -> np.ndarray:
+        """
+        input shape:
+            doas: (num_doas,) or (batch, num_doas)
+            snrs: scalar or (num_snr,)
+        output shape:
+            (num_snr, batch, num_doas) with the snr and batch axes dropped for scalar / 1-D inputs
+        """
+        if model not in ('stochastic', 'deterministic'):
+            raise ValueError("Model must be either 'stochastic' or 'deterministic'.")
+        doas = np.asarray(doas, dtype=float)
+        snrs = np.asarray(snrs, dtype=float)
 
-        P = np.eye(num_doas) * snr_linear
+        key = (model, self.num_samples, doas.shape, doas.tobytes(), snrs.shape, snrs.tobytes())
+        crb = self._cache.get(key)
+        if crb is None:
+            crb = self._crb(np.atleast_2d(doas), np.atleast_1d(snrs), model)
+            num_singular = np.count_nonzero(np.all(np.isinf(crb), axis=-1))
+            if num_singular:
+                warnings.warn(
+                    f"Fisher Information Matrix is singular or poorly conditioned for {num_singular} "
+                    f"configuration(s); their bound is inf.", RuntimeWarning, stacklevel=2)
+            if doas.ndim == 1:
+                crb = crb[:, 0]
+            if snrs.ndim == 0:
+                crb = crb[0]
+            crb.setflags(write=False)
+            self._cache[key] = crb
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(key)
+        return crb
 
-        R = A @ P @ A.conj().T + np.eye(self.num_antenna)
-        R_inv = linalg.inv(R)
-
-        FIM = np.zeros((num_doas, num_doas), dtype=complex)
+    def _crb(self, doas, snrs, model):
+        try:
+            return self._crb_vectorized(doas, snrs, model)
+        except np.linalg.LinAlgError:
+            if doas.shape[0] == 1 and snrs.shape[0] == 1:
+                return np.full((1, 1, doas.shape[1]), np.inf)
 
-        for i in range(num_doas):
-            for j in range(num_doas):
-                dA_i = dA[:, i].reshape(-1, 1)
-                dA_j = dA[:, j].reshape(-1, 1)
+        # isolate the ill-conditioned configurations
+        if doas.shape[0] > 1:
+            return np.concatenate([self._crb(doas[j:j+1], snrs, model) for j in range(doas.shape[0])], axis=1)
+        return np.concatenate([self._crb(doas, snrs[i:i+1], model) for i in range(snrs.shape[0])], axis=0)
 
-                term1 = np.trace(R_inv @ dA_i @ P[i:i+1, :] @ A.conj().T @ R_inv @ A @ P[:, j:j+1] @ dA_j.conj().T)
-                term2 = np.trace(R_inv @ dA_i @ P[i:i+1, j:j+1] @ dA_j.conj().T)
-                term3 = np.trace(R_inv @ A @ P[:, j:j+1] @ dA_j.conj().T @ R_inv @ dA_i @ P[i:i+1, :] @ A.conj().T)
-                term4 = np.trace(R_inv @ A @ P @ A.conj().T @ R_inv @ dA_i @ P[i:i+1, j:j+1] @ dA_j.conj().T)
+    def _crb_vectorized(self, doas, snrs, model):
+        batch, num_doas = doas.shape
+        flat = doas.reshape(-1)
+        with stage('manifold'):
+            A = self.steering_matrix(flat)
+            D = self.steering_matrix_derivative(flat, steering=A)
+        # (num_antenna, batch * num_doas) -> (batch, num_antenna, num_doas)
+        A = A.reshape(self.num_antenna, batch, num_doas).transpose(1, 0, 2)
+        D = D.reshape(self.num_antenna, batch, num_doas).transpose(1, 0, 2)
 
-                FIM[i, j] = self.num_samples * np.real(term1 + term2 + term3 + term4)
+        with stage('fisher'):
+            A_H = A.conj().swapaxes(-1, -2)
+            G = A_H @ A
+            A_H_D = A_H @ D
+            H = D.conj().swapaxes(-1, -2) @ D - A_H_D.conj().swapaxes(-1, -2) @ np.linalg.solve(G, A_H_D)
 
-        try:
-            if num_doas == 1:
-                crb = 1 / FIM[0, 0]
+            p = (10**(snrs / 10))[:, np.newaxis, np.newaxis, np.newaxis]
+            eye = np.eye(num_doas)
+            if model == 'stochastic':
+                source_term = p**2 * np.linalg.solve(eye + p * G, G)
             else:
-                crb = np.diag(linalg.inv(FIM))
-            return crb
-        except np.linalg.LinAlgError:
-            print("Warning: Fisher Information Matrix is singular or poorly conditioned")
-            return np.full(num_doas, np.inf)
+                source_term = p * np.broadcast_to(eye, G.shape)
+
+            FIM = 2 * self.num_samples * np.real(H * source_term.swapaxes(-1, -2))
+            return np.diagonal(np.linalg.inv(FIM), axis1=-2, axis2=-1).copy()
@@ -1,7 +1,9 @@
 import numpy as np
-from scipy import linalg
 from signal_model.antenna_response import FarField1DSource
 
+from .context import FrameContext, as_frame_context
+from .profiling import stage
+
 
 class Esprit(FarField1DSource):
     """
@@ -15,35 +17,68 @@ class Esprit(FarField1DSource):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
-    def estimate(self, angles: np.ndarray, snr: int, displacement_vector=1, formulation='tls'):
+    def _rotational_operator(self, Es: np.ndarray, displacement_vector: int, formulation: str) -> np.ndarray:
+        """
+        Solves `Esx Phi = Esy` for every signal subspace in the batch.
+
+        input shape:
+            (..., num_antenna, num_target)
+        output shape:
+            (..., num_target, num_target)
+        """
+        Esx = Es[..., :-displacement_vector, :]
+        Esy = Es[..., displacement_vector:, :]
+
+        if formulation == 'tls':
+            Exy = np.concatenate((Esx, Esy), axis=-1)
+            Exy = Exy.conj().swapaxes(-1, -2) @ Exy
+            # eigh sorts ascending, the TLS partition needs descending order
+            V = np.linalg.eigh(Exy)[1][..., ::-1]
+            V12 = V[..., :self.num_target, self.num_target:]
+            V22 = V[..., self.num_target:, self.num_target:]
+            # Phi = -V12 V22^-1
+            Phi = -np.linalg.solve(V22.swapaxes(-1, -2), V12.swapaxes(-1, -2)).swapaxes(-1, -2)
+        elif formulation == 'ls':
+            Esx_H = Esx.conj().swapaxes(-1, -2)
+            Phi = np.linalg.solve(Esx_H @ Esx, Esx_H @ Esy)
+        else:
+            raise ValueError("Formulation must be either 'ls' or 'tls'.")
+
+        return Phi
+
+    def _doas_from_context(self, ctx: FrameContext, displacement_vector: int, formulation: str) -> np.ndarray:
         if displacement_vector < 1:
             raise ValueError(
                 'displacement_vector must be a non-negative integer.')
 
+        Es = ctx.signal_subspace(self.num_target)
+        with stage('rotational'):
+            Phi = self._rotational_operator(Es, displacement_vector, formulation)
+            doa = np.linalg.eigvals(Phi.astype(np.complex128, copy=False))
+        sin_thetas = np.angle(doa) * self._lambda / (2 * np.pi * self.d * displacement_vector)
+        return -np.arcsin(sin_thetas)
+
+    def estimate(self, angles: np.ndarray, snr: int, displacement_vector=1, formulation='tls'):
         x = self.collect_plane_wave_response(angles, snr)
         y = self.collect_plane_wave_response_doublets(angles, snr)
         z = np.vstack([x, y])
 
-        R = np.cov(z, rowvar=False)
+        return self._doas_from_context(FrameContext(z, dtype=self.complex_dtype), displacement_vector, formulation)
 
-        E = linalg.svd(R)[0]
-        Es = E[:, :self.num_target]
-        Esx = Es[:-displacement_vector, :]
-        Esy = Es[displacement_vector:, :]
+    def estimate_from_snapshots(self, input_signal: np.ndarray, displacement_vector=1, formulation='tls') -> np.ndarray:
+        """
+        ESPRIT on measured snapshots. Covariances, signal subspaces and the
+        LS/TLS rotational step are computed for the whole batch at once.
 
-        if formulation == 'tls':
-            Exy = np.hstack((Esx, Esy))
-            Exy = Exy.conj().T @ Exy
-            V = linalg.svd(Exy)[0]
-            V12 = V[:self.num_target, self.num_target:]
-            V22 = V[self.num_target:, self.num_target:]
-            Phi = (-V12 / V22)
-        elif formulation == 'ls':
-            Esx_H = Esx.conj().T
-            Phi = (Esx_H @ Esx) / (Esx_H @ Esy)
-        else:
-            raise ValueError("Formulation must be either 'ls' or 'tls'.")
-
-        doa = linalg.eigvals(Phi)
-        doa = np.arcsin(np.angle(doa) / (np.pi * displacement_vector))
-        return -doa
+        input shape:
+            (num_sample, num_antenna) or (batch, num_sample, num_antenna), or a `FrameContext`
+        output shape:
+            (num_target,) or (batch, num_target)
+        """
+        ctx = as_frame_context(input_signal, self.complex_dtype)
+        if ctx.num_antenna != self.num_antenna:
+            raise ValueError(
+                f"Input signal should have {self.num_antenna} columns (antennas). "
+                f"Got {ctx.num_antenna}"
+            )
+        return self._doas_from_context(ctx, displacement_vector, formulation)
@@ -0,0 +1,201 @@
+import hashlib
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+from signal_model.antenna_response import FarField1DSource
+from signal_model.utils import generate_random_angles_batch
+
+from .context import FrameContext
+from .workers import ALGORITHMS, blas_thread_environment, build_estimators, estimate_doas, init_worker
+
+SWEEPS = ('snr', 'num_sample')
+
+
+def run_trials(config: dict, snr: float, num_sample: int, num_trials: int, seed_sequence: np.random.SeedSequence) -> dict:
+    """
+    Run `num_trials` independent trials of one sweep point. Every random draw
+    comes from generators spawned from `seed_sequence`, so the result depends
+    only on the seed and not on which worker runs the task.
+
+    Returns the per-algorithm sums of squared errors over trials and targets,
+    the summed CRB, the number of trials and the per-algorithm number of
+    failed trials, whose estimate count did not match `num_target`. Failed
+    trials add nothing to the squared errors.
+    """
+    estimators = build_estimators(config, num_sample)
+    all_doas = np.asarray(config['all_doas'])
+    angle_seed, source_seed = seed_sequence.spawn(2)
+    rng = np.random.default_rng(angle_seed)
+    source = FarField1DSource(
+        num_sample, config['num_target'], config['coherent'], config['num_antenna'],
+        config['freq'], config['is_baseband'], seed=source_seed)
+
+    squared_error = {name: 0.0 for name in config['algorithms']}
+    num_failures = {name: 0 for name in config['algorithms']}
+    crb = 0.0
+    angles = generate_random_angles_batch(
+        num_trials, config['num_target'], all_doas, config['min_separation'], rng)
+    for angle in angles:
+        # one covariance and eigendecomposition shared by every algorithm
+        ctx = FrameContext(source.collect_plane_wave_response(angle, snr))
+
+        for name in config['algorithms']:
+            estimate = estimate_doas(estimators, name, ctx, all_doas, config['num_target'])
+            if estimate.shape != angle.shape:
+                num_failures[name] += 1
+            else:
+                squared_error[name] += float(np.sum((estimate - angle)**2))
+
+        crb += float(np.sum(np.real(estimators['crb'].crb_stochastic(angle, snr))))
+
+    return {'squared_error': squared_error, 'crb': crb, 'num_trials': num_trials, 'num_failures': num_failures}
+
+
+class MonteCarloEvaluator:
+    """
+    Parallel, reproducible RMSE sweeps for the estimators in this package.
+
+    Each sweep point is split into tasks of `trials_per_task` trials. Tasks get
+    their own `SeedSequence` child and are fanned out over a process pool whose
+    workers are capped at `blas_threads` BLAS threads each. When `checkpoint_dir`
+    is set, finished tasks are written to disk as they complete, and a rerun with
+    the same configuration only runs the missing tasks.
+    """
+
+    def __init__(
+        self,
+        num_antenna: int,
+        num_target: int,
+        freq: float,
+        all_doas: np.ndarray,
+        min_separation: float,
+        coherent: bool = False,
+        is_baseband: bool = False,
+        algorithms: tuple = ALGORITHMS,
+        seed: int = None,
+        max_workers: int = None,
+        blas_threads: int = 1,
+        trials_per_task: int = 10,
+        checkpoint_dir: str = None,
+    ):
+        unknown = set(algorithms) - set(ALGORITHMS)
+        if unknown:
+            raise ValueError(f"Unknown algorithms {sorted(unknown)}. Supported are {ALGORITHMS}.")
+        if trials_per_task <= 0:
+            raise ValueError("trials_per_task must be positive.")
+
+        self.config = {
+            'num_antenna': num_antenna,
+            'num_target': num_target,
+            'freq': float(freq),
+            'all_doas': np.asarray(all_doas, dtype=float).tolist(),
+            'min_separation': float(min_separation),
+            'coherent': bool(coherent),
+            'is_baseband': bool(is_baseband),
+            'algorithms': list(algorithms),
+        }
+        self.seed = np.random.SeedSequence(seed).entropy if seed is None else seed
+        self.max_workers = max_workers
+        self.blas_threads = blas_threads
+        self.trials_per_task = trials_per_task
+        self.checkpoint_dir = checkpoint_dir
+
+    def sweep_snr(self, snrs, num_sample: int, num_iter: int) -> dict:
+        points = [(float(snr), int(num_sample)) for snr in snrs]
+        result = self._run('snr', points, num_iter)
+        result['snr'] = np.asarray(snrs)
+        return result
+
+    def sweep_num_sample(self, num_samples, snr: float, num_iter: int) -> dict:
+        points = [(float(snr), int(num_sample)) for num_sample in num_samples]
+        result = self._run('num_sample', points, num_iter)
+        result['num_sample'] = np.asarray(num_samples)
+        return result
+
+    def _tasks(self, sweep, points, num_iter):
+        num_chunks = -(-num_iter // self.trials_per_task)
+        root = np.random.SeedSequence(self.seed, spawn_key=(SWEEPS.index(sweep),))
+        children = root.spawn(len(points) * num_chunks)
+        tasks = []
+        for i, (snr, num_sample) in enumerate(points):
+            for chunk in range(num_chunks):
+                num_trials = min(self.trials_per_task, num_iter - chunk * self.trials_per_task)
+                tasks.append((f'{i}:{chunk}', i, snr, num_sample, num_trials, children[i * num_chunks + chunk]))
+        return tasks
+
+    def _checkpoint_path(self, sweep, points, num_iter):
+        if self.checkpoint_dir is None:
+            return None
+        identity = json.dumps(
+            [self.config, str(self.seed), self.trials_per_task, sweep, points, num_iter], sort_keys=True)
+        digest = hashlib.sha1(identity.encode()).hexdigest()[:16]
+        return os.path.join(self.checkpoint_dir, f'{sweep}_{digest}.json')
+
+    @staticmethod
+    def _load_checkpoint(path):
+        if path is None or not os.path.exists(path):
+            return {}
+        with open(path) as f:
+            return json.load(f)
+
+    @staticmethod
+    def _save_checkpoint(path, done):
+        if path is None:
+            return
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(done, f)
+        os.replace(tmp_path, path)
+
+    def _run(self, sweep, points, num_iter):
+        checkpoint = self._checkpoint_path(sweep, points, num_iter)
+        done = self._load_checkpoint(checkpoint)
+        pending = [task for task in self._tasks(sweep, points, num_iter) if task[0] not in done]
+
+        if self.max_workers is not None and self.max_workers <= 1:
+            for task_id, _, snr, num_sample, num_trials, seed_sequence in pending:
+                done[task_id] = run_trials(self.config, snr, num_sample, num_trials, seed_sequence)
+                self._save_checkpoint(checkpoint, done)
+        elif pending:
+            with blas_thread_environment(self.blas_threads), ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=init_worker,
+                initargs=(self.blas_threads,),
+            ) as executor:
+                futures = {
+                    executor.submit(run_trials, self.config, snr, num_sample, num_trials, seed_sequence): task_id
+                    for task_id, _, snr, num_sample, num_trials, seed_sequence in pending
+                }
+                for future in as_completed(futures):
+                    done[futures[future]] = future.result()
+                    self._save_checkpoint(checkpoint, done)
+
+        return self._aggregate(done, len(points))
+
+    def _aggregate(self, done, num_points):
+        squared_error = {name: np.zeros(num_points) for name in self.config['algorithms']}
+        num_failures = {name: np.zeros(num_points, dtype=int) for name in self.config['algorithms']}
+        crb = np.zeros(num_points)
+        num_trials = np.zeros(num_points)
+        for task_id, result in done.items():
+            i = int(task_id.split(':')[0])
+            for name in squared_error:
+                squared_error[name][i] += result['squared_error'][name]
+                num_failures[name][i] += result['num_failures'][name]
+            crb[i] += result['crb']
+            num_trials[i] += result['num_trials']
+
+        # failed trials are left out of each algorithm's RMSE, NaN when every trial failed
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rmse = {name: np.sqrt(value / (num_trials - num_failures[name])) for name, value in squared_error.items()}
+        return {
+            'rmse': rmse,
+            'crb': np.sqrt(crb / num_trials),
+            'num_trials': num_trials,
+            'num_failures': num_failures,
+        }
@@ -1,7 +1,11 @@
 import numpy as np
-from scipy import linalg
 from signal_model.sensor_array import UniformLinearSensorArray
 
+from .context import EIGENSOLVERS, FrameContext, as_frame_context
+from .profiling import stage
+from .refinement import coarse_peaks, grid_spacing, refine_minima
+from .utils import SPECTRUM_BACKENDS, fft_quadratic_form, fft_subspace_power
+
 
 class Music(UniformLinearSensorArray):
     def __init__(
@@ -9,48 +13,158 @@ class Music(UniformLinearSensorArray):
         all_doas: list,
         num_subarray: int = None,
         *args,
+        backend: str = 'matrix',
+        fft_size: int = None,
+        eigensolver: str = 'full',
         **kwargs
     ):
         super().__init__(*args, **kwargs)
+        if backend not in SPECTRUM_BACKENDS:
+            raise ValueError(f"Invalid backend '{backend}'. Supported are {SPECTRUM_BACKENDS}.")
+        if eigensolver not in EIGENSOLVERS:
+            raise ValueError(f"Invalid eigensolver '{eigensolver}'. Supported are {EIGENSOLVERS}.")
         self.all_doas = all_doas
         self.num_subarray = num_subarray
-        self.steering_matrix_cache = None
+        self.backend = backend
+        self.fft_size = fft_size
+        self.eigensolver = eigensolver
 
     def _manifold_matrix(self, num_antenna: int = None) -> np.ndarray:
-        if num_antenna is None:
-            num_antenna = self.num_antenna
-        if self.steering_matrix_cache is None or self.steering_matrix_cache_key != num_antenna:
-            self.steering_matrix_cache = self.steering_matrix(self.all_doas, num_antenna)
-            self.steering_matrix_cache_key = num_antenna
-        return self.steering_matrix_cache
-
-    def estimate(self, input_signal: np.ndarray, num_sources: int) -> np.ndarray:
-        R = np.cov(input_signal, rowvar=False)
-        noise_subspace = linalg.svd(R)[0]
-        noise_subspace = noise_subspace[:, num_sources:]
-        noise_subspace = noise_subspace @ noise_subspace.conj().T
+        return self.manifold(self.all_doas, num_antenna)
 
+    def _num_antenna_adj(self) -> int:
         if self.num_subarray is not None:
-            num_antenna_adj = self.num_antenna - (self.num_subarray - 1)
-        else:
-            num_antenna_adj = self.num_antenna
+            return self.num_antenna - (self.num_subarray - 1)
+        return self.num_antenna
+
+    def _spectrum(self, noise_subspace: np.ndarray, projector: np.ndarray = None) -> np.ndarray:
+        """
+        Evaluates `a^H En En^H a` as the squared column norms of `En^H A`, so the
+        (num_doas, num_doas) matrix `A^H Q A` is never formed. The 'fft' backend
+        evaluates `Q = En En^H` (or the given `projector`) with `fft_quadratic_form`.
+
+        input shape:
+            (..., num_antenna, num_noise)
+        output shape:
+            (..., num_doas)
+        """
+        if self.backend == 'fft':
+            with stage('spectrum'):
+                if projector is None:
+                    projector = noise_subspace @ noise_subspace.conj().swapaxes(-1, -2)
+                p_music = fft_quadratic_form(
+                    projector, self.all_doas, self.d / self._lambda, self._is_degrees, self.fft_size)
+                p_music = np.where(p_music <= 0, 1e-6, p_music)
+                return 1 / p_music
 
-        A = self._manifold_matrix(num_antenna_adj)
-        p_music = A.conj().T @ noise_subspace @ A
-        p_music = np.diag(p_music)
+        with stage('manifold'):
+            A = self._manifold_matrix(self._num_antenna_adj())
+        with stage('spectrum'):
+            projection = noise_subspace.conj().swapaxes(-1, -2) @ A
+            p_music = np.sum(projection.real**2 + projection.imag**2, axis=-2)
+            p_music = np.where(p_music <= 0, 1e-6, p_music)
+            return 1 / p_music
+
+    def _signal_subspace_spectrum(self, signal_subspace: np.ndarray) -> np.ndarray:
+        """
+        MUSIC spectrum through the implicit projector `I - Es Es^H`:
+        `a^H (I - Es Es^H) a = ||a||^2 - ||Es^H a||^2`, so only the
+        (..., num_antenna, K) signal subspace is touched.
+
+        input shape:
+            (..., num_antenna, num_sources)
+        output shape:
+            (..., num_doas)
+        """
+        num_antenna = signal_subspace.shape[-2]
+        if self.backend == 'fft':
+            with stage('spectrum'):
+                power = fft_subspace_power(
+                    signal_subspace, self.all_doas, self.d / self._lambda, self._is_degrees, self.fft_size)
+        else:
+            with stage('manifold'):
+                A = self._manifold_matrix(num_antenna)
+            with stage('spectrum'):
+                projection = signal_subspace.conj().swapaxes(-1, -2) @ A
+                power = np.sum(projection.real**2 + projection.imag**2, axis=-2)
+        # steering vectors have unit-modulus entries, so ||a||^2 = num_antenna
+        p_music = num_antenna - power
         p_music = np.where(p_music <= 0, 1e-6, p_music)
-        return np.abs(1 / p_music)
+        return 1 / p_music
+
+    def _context_spectrum(self, ctx: FrameContext, num_sources: int) -> np.ndarray:
+        if self.eigensolver != 'full':
+            return self._signal_subspace_spectrum(ctx.dominant_subspace(num_sources, self.eigensolver))
+        projector = ctx.noise_projector(num_sources) if self.backend == 'fft' else None
+        return self._spectrum(ctx.noise_subspace(num_sources), projector)
+
+    def estimate(self, input_signal: np.ndarray, num_sources: int) -> np.ndarray:
+        """
+        `input_signal` may also be a `FrameContext`, whose decomposition is reused.
+        """
+        return self._context_spectrum(as_frame_context(input_signal, self.complex_dtype), num_sources)
+
+    def estimate_batch(self, input_signals: np.ndarray, num_sources: int) -> np.ndarray:
+        """
+        input shape:
+            (batch, num_sample, num_antenna), or a `FrameContext`
+        output shape:
+            (batch, num_doas)
+        """
+        return self._context_spectrum(as_frame_context(input_signals, self.complex_dtype), num_sources)
+
+    def estimate_from_covariance(self, R: np.ndarray, num_sources: int) -> np.ndarray:
+        """
+        Accepts covariances directly, e.g. the output of `fbss` when `num_subarray` is set.
+
+        input shape:
+            (..., num_antenna, num_antenna)
+        output shape:
+            (..., num_doas)
+        """
+        return self._context_spectrum(FrameContext(covariance=R, dtype=self.complex_dtype), num_sources)
 
     def estimate_via_noise_subspace(self, noise_subspace: np.ndarray) -> np.ndarray:
-        noise_subspace = noise_subspace @ noise_subspace.conj().T
+        return self._spectrum(noise_subspace)
 
-        if self.num_subarray is not None:
-            num_antenna -= (self.num_subarray - 1)
-        else:
-            num_antenna = self.num_antenna
+    def _refined(self, ctx, num_sources, method, num_iter, peak_finder):
+        spectrum = self._context_spectrum(ctx, num_sources)
+        angles = coarse_peaks(spectrum, self.all_doas, num_sources, peak_finder)
+        return refine_minima(
+            self, ctx.noise_projector(num_sources, self.eigensolver), angles, method, num_iter, grid_spacing(self.all_doas))
 
-        A = self._manifold_matrix(num_antenna=num_antenna)
-        p_music = A.conj().T @ noise_subspace @ A
-        p_music = np.diag(p_music)
-        p_music = np.where(p_music <= 0, 1e-6, p_music)
-        return np.abs(1 / p_music)
+    def estimate_refined(
+        self,
+        input_signals: np.ndarray,
+        num_sources: int,
+        method: str = 'newton',
+        num_iter: int = None,
+        peak_finder=None
+    ) -> np.ndarray:
+        """
+        Coarse-to-fine DOAs: `all_doas` only needs to be fine enough to
+        separate the sources, the peaks found on it are refined off-grid
+        by `refine_minima` on `a^H En En^H a`.
+
+        input shape:
+            (..., num_sample, num_antenna), or a `FrameContext`
+        output shape:
+            (..., num_sources)
+        """
+        return self._refined(as_frame_context(input_signals, self.complex_dtype), num_sources, method, num_iter, peak_finder)
+
+    def estimate_refined_from_covariance(
+        self,
+        R: np.ndarray,
+        num_sources: int,
+        method: str = 'newton',
+        num_iter: int = None,
+        peak_finder=None
+    ) -> np.ndarray:
+        """
+        input shape:
+            (..., num_antenna, num_antenna)
+        output shape:
+            (..., num_sources)
+        """
+        return self._refined(FrameContext(covariance=R, dtype=self.complex_dtype), num_sources, method, num_iter, peak_finder)
@@ -0,0 +1,166 @@
+import numpy as np
+from signal_model.covariance import sample_covariance
+from signal_model.sensor_array import UniformRectangularSensorArray
+
+from .capon import whitening_matrix
+from .context import EIGENSOLVERS, FrameContext, as_frame_context
+from .profiling import stage
+from .utils import find_peaks_2d, indices_to_angles
+
+
+def separable_power(F: np.ndarray, A_el: np.ndarray, A_az: np.ndarray, block_bytes: int = 64 * 2**20) -> np.ndarray:
+    """
+    `||F a||^2` for every steering vector `a = a_el kron a_az` of an
+    (elevation, azimuth) grid, without forming the joint manifold. `F` is
+    viewed as (rows, num_antenna_el, num_antenna_az) and contracted with
+    `A_el` over the element rows first, then with `A_az` in one batched
+    product per elevation, which costs
+    O(rows * num_antenna * num_elevations + rows * num_antenna_az * num_elevations * num_azimuths)
+    instead of O(rows * num_antenna * num_elevations * num_azimuths).
+    Elevations are contracted in blocks of at most `block_bytes` of projections.
+
+    input shape:
+        F: (..., rows, num_antenna_el * num_antenna_az)
+        A_el: (num_antenna_el, num_elevations)
+        A_az: (num_elevations, num_antenna_az, num_azimuths)
+    output shape:
+        (..., num_elevations, num_azimuths)
+    """
+    num_antenna_el = A_el.shape[0]
+    num_elevations, num_antenna_az, num_azimuths = A_az.shape
+    F = F.reshape(F.shape[:-1] + (num_antenna_el, num_antenna_az))
+    # (..., rows, num_antenna_az, num_elevations) -> (..., num_elevations, rows, num_antenna_az)
+    partial = np.moveaxis(F.swapaxes(-1, -2) @ A_el, -1, -3)
+
+    power = np.empty(partial.shape[:-2] + (num_azimuths,), dtype=partial.real.dtype)
+    bytes_per_elevation = partial[..., 0, :, :1].size * num_azimuths * partial.itemsize
+    block = max(1, block_bytes // max(bytes_per_elevation, 1))
+    for start in range(0, num_elevations, block):
+        stop = min(start + block, num_elevations)
+        projection = partial[..., start:stop, :, :] @ A_az[start:stop]
+        power[..., start:stop, :] = np.sum(projection.real**2 + projection.imag**2, axis=-2)
+    return power
+
+
+def coarse_peaks_2d(spectra: np.ndarray, azimuths: np.ndarray, elevations: np.ndarray, num_peaks: int) -> np.ndarray:
+    """
+    (azimuth, elevation) of the `num_peaks` highest peaks of every spectrum
+    over the `elevations x azimuths` grid, strongest first.
+
+    input shape:
+        (..., num_elevations, num_azimuths)
+    output shape:
+        (..., num_peaks, 2)
+    """
+    indices = find_peaks_2d(spectra, num_peaks)
+    return np.stack((
+        indices_to_angles(indices[..., 1], np.asarray(azimuths)),
+        indices_to_angles(indices[..., 0], np.asarray(elevations))), axis=-1)
+
+
+class Music2D(UniformRectangularSensorArray):
+    """
+    Azimuth-elevation MUSIC for a `UniformRectangularSensorArray`, evaluated
+    over the `elevations x azimuths` grid with `separable_power`.
+
+    Parameters:
+    - `azimuths`, `elevations`: Search grid axes.
+    - `eigensolver`: 'full' projects onto the noise subspace, 'lanczos' and
+      'randomized' use `num_antenna - ||Es^H a||^2` with only the signal subspace.
+    """
+
+    def __init__(self, azimuths: np.ndarray, elevations: np.ndarray, *args, eigensolver: str = 'full', **kwargs):
+        super().__init__(*args, **kwargs)
+        if eigensolver not in EIGENSOLVERS:
+            raise ValueError(f"Invalid eigensolver '{eigensolver}'. Supported are {EIGENSOLVERS}.")
+        self.azimuths = azimuths
+        self.elevations = elevations
+        self.eigensolver = eigensolver
+
+    def _context_spectrum(self, ctx: FrameContext, num_sources: int) -> np.ndarray:
+        if ctx.num_antenna != self.num_antenna:
+            raise ValueError(
+                f"Input signal should have {self.num_antenna} columns (antennas). "
+                f"Got {ctx.num_antenna}"
+            )
+        if self.eigensolver == 'full':
+            F = ctx.noise_subspace(num_sources).conj().swapaxes(-1, -2)
+        else:
+            F = ctx.dominant_subspace(num_sources, self.eigensolver).conj().swapaxes(-1, -2)
+
+        with stage('manifold'):
+            A_el, A_az = self.separable_manifold(self.azimuths, self.elevations)
+        with stage('spectrum'):
+            power = separable_power(F, A_el, A_az)
+            # steering vectors have unit-modulus entries, so ||a||^2 = num_antenna
+            p_music = power if self.eigensolver == 'full' else self.num_antenna - power
+            p_music = np.where(p_music <= 0, 1e-6, p_music)
+            return 1 / p_music
+
+    def estimate(self, input_signal: np.ndarray, num_sources: int) -> np.ndarray:
+        """
+        input shape:
+            (..., num_sample, num_antenna), or a `FrameContext`
+        output shape:
+            (..., num_elevations, num_azimuths)
+        """
+        return self._context_spectrum(as_frame_context(input_signal, self.complex_dtype), num_sources)
+
+    def estimate_from_covariance(self, R: np.ndarray, num_sources: int) -> np.ndarray:
+        """
+        input shape:
+            (..., num_antenna, num_antenna)
+        output shape:
+            (..., num_elevations, num_azimuths)
+        """
+        return self._context_spectrum(FrameContext(covariance=R, dtype=self.complex_dtype), num_sources)
+
+
+class Capon2D(UniformRectangularSensorArray):
+    """
+    Azimuth-elevation MVDR spectrum `1 / ||W a||^2` for a
+    `UniformRectangularSensorArray`, with the whitening matrix `W` of
+    `whitening_matrix` and the grid evaluated by `separable_power`.
+    """
+
+    def __init__(self, azimuths: np.ndarray, elevations: np.ndarray, *args, diagonal_loading: float = 0.0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.azimuths = azimuths
+        self.elevations = elevations
+        self.diagonal_loading = diagonal_loading
+
+    def _spectrum(self, W: np.ndarray) -> np.ndarray:
+        with stage('manifold'):
+            A_el, A_az = self.separable_manifold(self.azimuths, self.elevations)
+        with stage('spectrum'):
+            return (1 / separable_power(W, A_el, A_az)).astype(self.real_dtype)
+
+    def estimate(self, input_signal: np.ndarray, diagonal_loading: float = None) -> np.ndarray:
+        """
+        A `FrameContext` is whitened with its eigendecomposition, snapshots
+        with a Cholesky factor of their covariance.
+
+        input shape:
+            (..., num_sample, num_antenna), or a `FrameContext`
+        output shape:
+            (..., num_elevations, num_azimuths)
+        """
+        if diagonal_loading is None:
+            diagonal_loading = self.diagonal_loading
+        if isinstance(input_signal, FrameContext):
+            source = input_signal
+        else:
+            with stage('covariance'):
+                source = sample_covariance(input_signal, dtype=self.complex_dtype)
+        return self._spectrum(whitening_matrix(source, diagonal_loading, self.complex_dtype))
+
+    def estimate_from_covariance(self, R: np.ndarray, diagonal_loading: float = None) -> np.ndarray:
+        """
+        input shape:
+            (..., num_antenna, num_antenna)
+        output shape:
+            (..., num_elevations, num_azimuths)
+        """
+        if diagonal_loading is None:
+            diagonal_loading = self.diagonal_loading
+        return self._spectrum(whitening_matrix(R, diagonal_loading, self.complex_dtype))
@@ -0,0 +1,109 @@
+import json
+import logging
+import threading
+import time
+from contextlib import nullcontext
+
+_collectors = []
+_lock = threading.Lock()
+_disabled = nullcontext()
+
+
+class _StageTimer:
+    __slots__ = ['name', 'start']
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        with _lock:
+            for collector in _collectors:
+                collector.record(self.name, elapsed)
+        return False
+
+
+def stage(name: str):
+    """
+    Time the enclosed block as stage `name` for every active `StageProfiler`.
+    Without an active profiler this returns a shared no-op context, so the
+    instrumentation in the estimators costs one list check per stage.
+    """
+    if not _collectors:
+        return _disabled
+    return _StageTimer(name)
+
+
+class StageProfiler:
+    """
+    Collects per-stage timings and call counts from the estimators while active.
+
+    Usage:
+        with StageProfiler() as profiler:
+            music.estimate(sig, 2)
+        profiler.to_dict()
+
+    Stages are 'covariance', 'decomposition', 'manifold', 'spectrum',
+    'peak_search', 'refinement', 'rooting', 'rotational', 'fisher' and 'focusing'.
+    Profilers may be nested or shared between threads; every active profiler sees
+    every stage.
+    """
+
+    def __init__(self):
+        self._stats = {}
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    def start(self):
+        with _lock:
+            if self not in _collectors:
+                _collectors.append(self)
+
+    def stop(self):
+        with _lock:
+            if self in _collectors:
+                _collectors.remove(self)
+
+    def reset(self):
+        self._stats = {}
+
+    def record(self, name: str, seconds: float):
+        stats = self._stats.get(name)
+        if stats is None:
+            self._stats[name] = [1, seconds, seconds]
+        else:
+            stats[0] += 1
+            stats[1] += seconds
+            stats[2] = max(stats[2], seconds)
+
+    def to_dict(self) -> dict:
+        return {
+            name: {
+                'calls': calls,
+                'total_seconds': total,
+                'mean_seconds': total / calls,
+                'max_seconds': longest,
+            }
+            for name, (calls, total, longest) in sorted(self._stats.items())
+        }
+
+    def to_json(self, **kwargs) -> str:
+        return json.dumps(self.to_dict(), **kwargs)
+
+    def log(self, logger: logging.Logger = None, level: int = logging.INFO):
+        if logger is None:
+            logger = logging.getLogger(__name__)
+        for name, stats in self.to_dict().items():
+            logger.log(
+                level, "%s: %d calls, %.6f s total, %.6f s mean, %.6f s max",
+                name, stats['calls'], stats['total_seconds'], stats['mean_seconds'], stats['max_seconds'])
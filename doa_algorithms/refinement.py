@@ -0,0 +1,175 @@
+import numpy as np
+
+from .profiling import stage
+from .utils import SpectrumPeakFinder, indices_to_angles
+
+REFINEMENT_METHODS = ('newton', 'zoom')
+
+
+def _per_batch(X, shape):
+    """
+    input shape:
+        (num_antenna, batch * num_angles)
+    output shape:
+        (batch, num_antenna, num_angles)
+    """
+    return X.reshape(X.shape[0], *shape).transpose(1, 0, 2)
+
+
+def _steering(array, angles, num_antenna):
+    """
+    input shape:
+        (batch, num_angles)
+    output shape:
+        (batch, num_antenna, num_angles)
+    """
+    return _per_batch(array.steering_matrix(angles.reshape(-1), num_antenna), angles.shape)
+
+
+def _quadratic_form(Q, A):
+    """
+    `a^H Q a` for every column of A.
+
+    input shape:
+        Q: (batch, num_antenna, num_antenna), A: (batch, num_antenna, num_angles)
+    output shape:
+        (batch, num_angles)
+    """
+    return np.real(np.sum(A.conj() * (Q @ A), axis=-2))
+
+
+def _newton(array, Q, angles, num_iter, max_step, tol):
+    num_antenna = Q.shape[-1]
+    k_n = 2 * np.pi * array.d / array._lambda * np.arange(num_antenna)[:, np.newaxis]
+
+    for _ in range(num_iter):
+        flat = angles.reshape(-1)
+        radians = np.deg2rad(flat) if array._is_degrees else flat
+        A = array.steering_matrix(flat, num_antenna)
+        D = array.steering_matrix_derivative(flat, num_antenna, A)
+        # a'' = j k n (sin(theta) a - cos(theta) a')
+        A2 = 1j * k_n * (np.sin(radians) * A - np.cos(radians) * D)
+        A, D, A2 = (_per_batch(X, angles.shape) for X in (A, D, A2))
+
+        QA = Q @ A
+        value = np.real(np.sum(A.conj() * QA, axis=-2))
+        gradient = 2 * np.real(np.sum(D.conj() * QA, axis=-2))
+        gauss_newton = 2 * np.real(np.sum(D.conj() * (Q @ D), axis=-2))
+        hessian = gauss_newton + 2 * np.real(np.sum(A2.conj() * QA, axis=-2))
+        # away from a minimum the exact curvature can be negative, Gauss-Newton's never is
+        hessian = np.where(hessian > 0, hessian, gauss_newton)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            step = np.where(hessian > 0, -gradient / hessian, 0.0)
+        # derivatives are taken in radians
+        step = np.clip(step, -max_step, max_step)
+        if array._is_degrees:
+            step = np.rad2deg(step)
+
+        # halve steps that do not decrease the objective, and drop those that
+        # still do not after four halvings
+        for halving in range(5):
+            worse = _quadratic_form(Q, _steering(array, angles + step, num_antenna)) > value
+            if not worse.any():
+                break
+            step = np.where(worse, step / 2 if halving < 4 else 0.0, step)
+        angles = angles + step
+
+        if np.max(np.abs(step), initial=0.0) < tol:
+            break
+    return angles
+
+
+def _zoom(array, Q, angles, num_iter, span, num_points):
+    num_antenna = Q.shape[-1]
+    batch, num_angles = angles.shape
+    offsets = np.linspace(-1.0, 1.0, num_points)
+    for _ in range(num_iter):
+        # (batch, num_angles, num_points) candidates around every estimate
+        candidates = angles[..., np.newaxis] + span * offsets
+        values = _quadratic_form(Q, _steering(array, candidates.reshape(batch, -1), num_antenna))
+        best = np.argmin(values.reshape(batch, num_angles, num_points), axis=-1)
+        angles = np.take_along_axis(candidates, best[..., np.newaxis], axis=-1)[..., 0]
+        span = 2 * span / (num_points - 1)
+    return angles
+
+
+def grid_spacing(all_doas: np.ndarray) -> float:
+    """
+    Largest gap of a (possibly non-uniform) search grid.
+    """
+    return float(np.max(np.abs(np.diff(np.asarray(all_doas, dtype=float)))))
+
+
+def refine_minima(
+    array,
+    Q: np.ndarray,
+    angles: np.ndarray,
+    method: str = 'newton',
+    num_iter: int = None,
+    grid_spacing: float = None,
+    num_points: int = 9,
+    tol: float = 1e-12,
+) -> np.ndarray:
+    """
+    Refine coarse estimates to local minima of `f(theta) = a(theta)^H Q a(theta)`,
+    i.e. to peaks of the MUSIC (`Q = En En^H`) or Capon (`Q = R^-1`) spectrum.
+
+    'newton' iterates `theta -= f' / f''` with analytic derivatives from
+    `steering_matrix_derivative`, using the Gauss-Newton curvature `2 a'^H Q a'`
+    where the exact one is not positive. Steps that increase `f` are halved, and
+    dropped if they still do after four halvings.
+    'zoom' re-evaluates `f` on `num_points` local grid points around every
+    estimate, shrinking the window to one point spacing at each iteration.
+
+    Parameters:
+    - `array`: `UniformLinearSensorArray` whose geometry and angle unit `Q` refers to.
+    - `Q`: Hermitian positive semi-definite weighting, (..., p, p) for a `p`-element (sub)array.
+    - `angles`: Coarse estimates, (..., num_angles).
+    - `method`: 'newton' or 'zoom'.
+    - `num_iter`: Iterations, 5 for 'newton' and 4 for 'zoom' by default.
+    - `grid_spacing`: Coarse grid spacing; bounds Newton steps and sets the initial zoom window.
+    - `num_points`: Points of every zoom grid.
+    - `tol`: Newton stops once every step is below this size.
+
+    Returns:
+    - Refined angles with the shape of `angles`.
+    """
+    if method not in REFINEMENT_METHODS:
+        raise ValueError(f"Unknown refinement method '{method}'. Supported are {REFINEMENT_METHODS}.")
+
+    # steps are differences of nearly equal quadratic forms, so refinement runs in double precision
+    Q = np.asarray(Q).astype(np.complex128, copy=False)
+    angles = np.asarray(angles, dtype=float)
+    batch_shape = angles.shape[:-1]
+    Q = np.broadcast_to(Q, batch_shape + Q.shape[-2:]).reshape(-1, *Q.shape[-2:])
+    flat_angles = angles.reshape(-1, angles.shape[-1])
+    if grid_spacing is None:
+        grid_spacing = np.pi / Q.shape[-1] / 4
+        if array._is_degrees:
+            grid_spacing = np.rad2deg(grid_spacing)
+
+    with stage('refinement'):
+        if method == 'newton':
+            max_step = np.deg2rad(grid_spacing) if array._is_degrees else grid_spacing
+            refined = _newton(array, Q, flat_angles, 5 if num_iter is None else num_iter, max_step, tol)
+        else:
+            refined = _zoom(array, Q, flat_angles, 4 if num_iter is None else num_iter, grid_spacing, num_points)
+    return refined.reshape(angles.shape)
+
+
+def coarse_peaks(spectra: np.ndarray, all_doas: np.ndarray, num_peaks: int, peak_finder=None) -> np.ndarray:
+    """
+    Angles of the `num_peaks` highest peaks of every coarse spectrum, with
+    parabolic sub-bin interpolation.
+
+    input shape:
+        (..., num_doas)
+    output shape:
+        (..., num_peaks)
+    """
+    if peak_finder is None:
+        peak_finder = SpectrumPeakFinder(num_peaks, filter_type='none')
+    spectra = np.asarray(spectra)
+    indices = peak_finder.find_peaks_batch(spectra.reshape(-1, spectra.shape[-1]))
+    return indices_to_angles(indices, np.asarray(all_doas)).reshape(spectra.shape[:-1] + (-1,))
@@ -1,40 +1,81 @@
 import numpy as np
-from scipy import linalg
 from signal_model.antenna_response import FarField1DSource
 
+from .context import EIGENSOLVERS, as_frame_context
+from .profiling import stage
+from .utils import diagonal_sums, polynomial_roots, subspace_diagonal_sums
+
 
 class RootMUSIC(FarField1DSource):
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, eigensolver: str = 'full', **kwargs):
         super().__init__(*args, **kwargs)
+        if eigensolver not in EIGENSOLVERS:
+            raise ValueError(f"Invalid eigensolver '{eigensolver}'. Supported are {EIGENSOLVERS}.")
+        self.eigensolver = eigensolver
 
-    def estimate(self, input_signal: np.ndarray):
-        if input_signal.shape[1] != self.num_antenna:
+    def _check_input(self, ctx):
+        if ctx.num_antenna != self.num_antenna:
             raise ValueError(
                 f"Input signal should have {self.num_antenna} columns (antennas). "
-                f"Got shape {input_signal.shape}"
+                f"Got {ctx.num_antenna}"
             )
-
-        R = np.cov(input_signal.T)
-        eigenvectors = linalg.svd(R)[0]
-
         if self.num_target >= self.num_antenna:
             raise ValueError(
                 f"Number of sources ({self.num_target}) must be less than "
                 f"number of antennas ({self.num_antenna})"
             )
 
-        noise_eigenvectors = eigenvectors[:, self.num_target:]
-        Q = noise_eigenvectors @ noise_eigenvectors.conj().T
-        a_coeffs = np.zeros(2 * self.num_antenna - 1, dtype=complex)
-        for i in range(self.num_antenna):
-            for j in range(self.num_antenna):
-                a_coeffs[self.num_antenna - 1 + i - j] += Q[i, j]
-
-        all_roots = np.roots(a_coeffs)
-        sorted_indices = np.argsort(np.abs(np.abs(all_roots) - 1.0))
-        signal_roots = all_roots[sorted_indices[:self.num_target]]
-        angles = np.angle(signal_roots)
-        sin_thetas = -angles * self._lambda / (2 * np.pi * self.d)
+    def _signal_roots(self, all_roots: np.ndarray, unit_circle_only: bool) -> np.ndarray:
+        """
+        The polynomial is conjugate reciprocal, so its roots come in pairs `z`,
+        `1/z*` at the same distance from the unit circle. `unit_circle_only`,
+        the default, keeps only the roots on or inside the circle, so both
+        members of a pair are never returned as two DOAs.
+
+        input shape:
+            (..., 2 * num_antenna - 2)
+        output shape:
+            (..., num_target)
+        """
+        distance = np.abs(np.abs(all_roots) - 1.0)
+        if unit_circle_only:
+            distance = np.where(np.abs(all_roots) <= 1.0, distance, np.inf)
+        sorted_indices = np.argsort(distance, axis=-1)[..., :self.num_target]
+        return np.take_along_axis(all_roots, sorted_indices, axis=-1)
+
+    def _coefficients(self, ctx) -> np.ndarray:
+        """
+        Polynomial coefficients, the diagonal sums of the noise projector. With a
+        partial `eigensolver` they are those of `I - Es Es^H`, from the
+        autocorrelations of the signal subspace columns. Rooting is
+        ill-conditioned, so the coefficients are always double precision.
+
+        output shape:
+            (..., 2 * num_antenna - 1)
+        """
+        if self.eigensolver == 'full':
+            return diagonal_sums(ctx.noise_projector(self.num_target).astype(np.complex128, copy=False))
+
+        Es = ctx.dominant_subspace(self.num_target, self.eigensolver).astype(np.complex128, copy=False)
+        coeffs = -subspace_diagonal_sums(Es)
+        coeffs[..., self.num_antenna - 1] += self.num_antenna
+        return coeffs
+
+    def _sin_thetas(self, signal_roots: np.ndarray) -> np.ndarray:
+        return -np.angle(signal_roots) * self._lambda / (2 * np.pi * self.d)
+
+    def estimate(self, input_signal: np.ndarray, unit_circle_only: bool = True):
+        """
+        `input_signal` may also be a `FrameContext`, whose decomposition is reused.
+        """
+        ctx = as_frame_context(input_signal, self.complex_dtype)
+        self._check_input(ctx)
+
+        a_coeffs = self._coefficients(ctx)
+        with stage('rooting'):
+            all_roots = np.roots(a_coeffs)
+            signal_roots = self._signal_roots(all_roots, unit_circle_only)
+        sin_thetas = self._sin_thetas(signal_roots)
         valid_indices = np.abs(sin_thetas) <= 1.0
         sin_thetas = sin_thetas[valid_indices]
 
@@ -42,3 +83,23 @@ class RootMUSIC(FarField1DSource):
             return np.array([])
 
         return np.arcsin(sin_thetas)
+
+    def estimate_batch(self, input_signals: np.ndarray, unit_circle_only: bool = True) -> np.ndarray:
+        """
+        Roots all polynomials with one stacked companion eigenvalue call.
+        Estimates outside the visible region are returned as NaN.
+
+        input shape:
+            (batch, num_sample, num_antenna), or a `FrameContext`
+        output shape:
+            (batch, num_target)
+        """
+        ctx = as_frame_context(input_signals, self.complex_dtype)
+        self._check_input(ctx)
+
+        a_coeffs = self._coefficients(ctx)
+        with stage('rooting'):
+            all_roots = polynomial_roots(a_coeffs)
+            sin_thetas = self._sin_thetas(self._signal_roots(all_roots, unit_circle_only))
+        sin_thetas = np.where(np.abs(sin_thetas) <= 1.0, sin_thetas, np.nan)
+        return np.arcsin(sin_thetas)
@@ -0,0 +1,336 @@
+"""
+Asyncio DOA service: reads snapshot frames from a socket or file, estimates
+their DOAs on a bounded worker pool and streams the results as JSON lines.
+
+Frames are a `FRAME_HEADER` (frame id, num_sample, num_antenna as little-endian
+uint64, uint32, uint32) followed by num_sample * num_antenna complex64 samples
+with all antennas of one sample contiguous, see `encode_frame`.
+
+Usage (from the repository root):
+    python -m doa_algorithms.service tcp://127.0.0.1:5000 --num-antenna 16 --num-target 2 --freq 1e9
+    python -m doa_algorithms.service unix:///tmp/array.sock --algorithm capon --num-grid 1024 ...
+    python -m doa_algorithms.service frames.bin --frame-interval 0.01 --overflow drop_oldest ...
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import struct
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import nullcontext
+
+import numpy as np
+
+from .workers import ALGORITHMS, blas_thread_environment, build_estimators, estimate_doas, init_worker
+
+FRAME_HEADER = struct.Struct('<QII')
+EXECUTORS = ('thread', 'process')
+OVERFLOW_POLICIES = ('block', 'drop_oldest')
+
+
+def encode_frame(frame_id: int, block: np.ndarray) -> bytes:
+    """
+    input shape:
+        (num_sample, num_antenna)
+    """
+    block = np.ascontiguousarray(block, dtype=np.complex64)
+    return FRAME_HEADER.pack(frame_id, *block.shape) + block.tobytes()
+
+
+def _decode_payload(header: bytes, payload: bytes):
+    frame_id, num_sample, num_antenna = FRAME_HEADER.unpack(header)
+    block = np.frombuffer(payload, dtype=np.complex64).reshape(num_sample, num_antenna)
+    return frame_id, block
+
+
+def _payload_size(header: bytes) -> int:
+    _, num_sample, num_antenna = FRAME_HEADER.unpack(header)
+    return num_sample * num_antenna * np.dtype(np.complex64).itemsize
+
+
+async def _stream_frames(reader: asyncio.StreamReader):
+    while True:
+        try:
+            header = await reader.readexactly(FRAME_HEADER.size)
+            payload = await reader.readexactly(_payload_size(header))
+        except asyncio.IncompleteReadError as e:
+            if e.partial:
+                raise ValueError("Stream ended inside a frame.")
+            return
+        yield _decode_payload(header, payload)
+
+
+def _read_file_frame(f):
+    header = f.read(FRAME_HEADER.size)
+    if not header:
+        return None
+    payload = f.read(_payload_size(header)) if len(header) == FRAME_HEADER.size else b''
+    if len(header) < FRAME_HEADER.size or len(payload) < _payload_size(header):
+        raise ValueError("File ended inside a frame.")
+    return _decode_payload(header, payload)
+
+
+async def _file_frames(path: str, frame_interval: float = None):
+    loop = asyncio.get_running_loop()
+    with open(path, 'rb') as f:
+        next_time = loop.time()
+        while True:
+            frame = await loop.run_in_executor(None, _read_file_frame, f)
+            if frame is None:
+                return
+            if frame_interval is not None:
+                next_time += frame_interval
+                await asyncio.sleep(max(0.0, next_time - loop.time()))
+            yield frame
+
+
+async def open_source(spec: str, frame_interval: float = None):
+    """
+    Async iterator of `(frame_id, block)` from 'tcp://host:port', 'unix:///path'
+    or a framed file ('file:///path' or a plain path). `frame_interval` paces
+    file frames to emulate a live feed; sockets are read as fast as they deliver.
+    """
+    if spec.startswith('tcp://'):
+        host, port = spec[len('tcp://'):].rsplit(':', 1)
+        reader, writer = await asyncio.open_connection(host, int(port))
+    elif spec.startswith('unix://'):
+        reader, writer = await asyncio.open_unix_connection(spec[len('unix://'):])
+    else:
+        path = spec[len('file://'):] if spec.startswith('file://') else spec
+        async for frame in _file_frames(path, frame_interval):
+            yield frame
+        return
+
+    try:
+        async for frame in _stream_frames(reader):
+            yield frame
+    finally:
+        writer.close()
+
+
+def process_frame(config: dict, algorithm: str, block: np.ndarray):
+    """
+    Estimate the DOAs of one frame. Runs inside the worker pool; returns the
+    sorted estimates and the compute time in seconds.
+    """
+    estimators = build_estimators(config, block.shape[0])
+    tic = time.perf_counter()
+    doas = estimate_doas(estimators, algorithm, block, np.asarray(config['all_doas']), config['num_target'])
+    return doas, time.perf_counter() - tic
+
+
+class DOAService:
+    """
+    Real-time DOA estimation over a stream of snapshot frames.
+
+    Frames are queued in a bounded queue of `queue_size` and dispatched to
+    `max_workers` thread or process workers. When the queue is full, the
+    'block' policy stops reading the source, which backpressures a socket
+    producer, and 'drop_oldest' discards the oldest queued frame to keep
+    latency bounded. Every frame produces one JSON line with its DOAs and its
+    queue, compute and total latency in seconds; dropped and failed frames are
+    reported with `dropped` or `error` fields instead.
+
+    Parameters:
+    - `num_antenna`, `num_target`, `freq`: Array and scene description for the estimators.
+    - `all_doas`: Search grid in radians, required by 'music' and 'capon'.
+    - `algorithm`: One of `ALGORITHMS`.
+    - `executor`: 'thread' or 'process'.
+    - `max_workers`: Concurrent frames, defaults to the number of CPUs.
+    - `queue_size`: Frames waiting for a worker before the overflow policy applies.
+    - `overflow`: 'block' or 'drop_oldest'.
+    - `blas_threads`: BLAS threads per process worker.
+    """
+
+    def __init__(
+        self,
+        num_antenna: int,
+        num_target: int,
+        freq: float,
+        all_doas: np.ndarray = None,
+        algorithm: str = 'root_music',
+        executor: str = 'thread',
+        max_workers: int = None,
+        queue_size: int = 8,
+        overflow: str = 'block',
+        blas_threads: int = 1,
+        coherent: bool = False,
+        is_baseband: bool = True,
+    ):
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"Unknown algorithm '{algorithm}'. Supported are {ALGORITHMS}.")
+        if algorithm in ('music', 'capon') and all_doas is None:
+            raise ValueError(f"'{algorithm}' needs a search grid in all_doas.")
+        if executor not in EXECUTORS:
+            raise ValueError(f"Invalid executor '{executor}'. Supported are {EXECUTORS}.")
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Invalid overflow policy '{overflow}'. Supported are {OVERFLOW_POLICIES}.")
+        if queue_size <= 0:
+            raise ValueError("queue_size must be positive.")
+
+        self.config = {
+            'num_antenna': num_antenna,
+            'num_target': num_target,
+            'freq': float(freq),
+            'all_doas': [] if all_doas is None else np.asarray(all_doas, dtype=float).tolist(),
+            'coherent': bool(coherent),
+            'is_baseband': bool(is_baseband),
+        }
+        self.algorithm = algorithm
+        self.executor = executor
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.overflow = overflow
+        self.blas_threads = blas_threads
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self._counts = {'received': 0, 'processed': 0, 'dropped': 0, 'errors': 0}
+        self._latency_sum = 0.0
+        self._latency_max = 0.0
+        self._recent_latency = deque(maxlen=1024)
+
+    def stats(self) -> dict:
+        """
+        Frame counts and total latency statistics; percentiles cover the last 1024 frames.
+        """
+        result = dict(self._counts)
+        processed = self._counts['processed']
+        recent = np.asarray(self._recent_latency)
+        result['latency'] = {
+            'mean': self._latency_sum / processed if processed else None,
+            'max': self._latency_max if processed else None,
+            'p50': float(np.percentile(recent, 50)) if recent.size else None,
+            'p95': float(np.percentile(recent, 95)) if recent.size else None,
+        }
+        return result
+
+    def _executor(self):
+        if self.executor == 'thread':
+            return nullcontext(), ThreadPoolExecutor(max_workers=self.max_workers)
+        return blas_thread_environment(self.blas_threads), ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=init_worker,
+            initargs=(self.blas_threads,),
+        )
+
+    @staticmethod
+    def _emit(output, record):
+        if output is not None:
+            output.write(json.dumps(record) + '\n')
+            output.flush()
+
+    async def _enqueue(self, queue, item, output):
+        if self.overflow == 'block':
+            await queue.put(item)
+            return
+        while queue.full():
+            frame_id = queue.get_nowait()[0]
+            self._counts['dropped'] += 1
+            self._emit(output, {'frame': frame_id, 'dropped': True})
+        queue.put_nowait(item)
+
+    async def _worker(self, queue, executor, output):
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            frame_id, block, received = item
+            started = loop.time()
+            record = {'frame': frame_id}
+            try:
+                if block.shape[1] != self.config['num_antenna']:
+                    raise ValueError(
+                        f"Frame has {block.shape[1]} antennas, expected {self.config['num_antenna']}.")
+                doas, compute = await loop.run_in_executor(
+                    executor, process_frame, self.config, self.algorithm, block)
+            except Exception as e:
+                self._counts['errors'] += 1
+                record['error'] = f"{type(e).__name__}: {e}"
+                self._emit(output, record)
+                continue
+
+            total = loop.time() - received
+            self._counts['processed'] += 1
+            self._latency_sum += total
+            self._latency_max = max(self._latency_max, total)
+            self._recent_latency.append(total)
+            record['doas'] = [None if np.isnan(doa) else float(doa) for doa in doas]
+            record['latency'] = {'queue': started - received, 'compute': compute, 'total': total}
+            self._emit(output, record)
+
+    async def run(self, source, output=None, frame_interval: float = None) -> dict:
+        """
+        Process every frame of `source` and return `stats()`.
+
+        Parameters:
+        - `source`: Source spec for `open_source`, or any async iterator of `(frame_id, block)`.
+        - `output`: Text stream receiving one JSON line per frame, e.g. `sys.stdout`.
+        - `frame_interval`: Pacing of file sources in seconds.
+        """
+        if isinstance(source, str):
+            source = open_source(source, frame_interval)
+        self._reset_stats()
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=self.queue_size)
+
+        environment, executor = self._executor()
+        with environment, executor:
+            workers = [
+                asyncio.create_task(self._worker(queue, executor, output))
+                for _ in range(self.max_workers)
+            ]
+            try:
+                async for frame_id, block in source:
+                    self._counts['received'] += 1
+                    await self._enqueue(queue, (frame_id, block, loop.time()), output)
+                for _ in workers:
+                    await queue.put(None)
+                await asyncio.gather(*workers)
+            finally:
+                for worker in workers:
+                    worker.cancel()
+        return self.stats()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('source', help="'tcp://host:port', 'unix:///path' or a framed file")
+    parser.add_argument('--num-antenna', type=int, required=True)
+    parser.add_argument('--num-target', type=int, required=True)
+    parser.add_argument('--freq', type=float, required=True)
+    parser.add_argument('--algorithm', choices=ALGORITHMS, default='root_music')
+    parser.add_argument('--num-grid', type=int, default=1024, help='grid points over [-pi/2, pi/2) for music and capon')
+    parser.add_argument('--executor', choices=EXECUTORS, default='thread')
+    parser.add_argument('--max-workers', type=int)
+    parser.add_argument('--queue-size', type=int, default=8)
+    parser.add_argument('--overflow', choices=OVERFLOW_POLICIES, default='block')
+    parser.add_argument('--blas-threads', type=int, default=1)
+    parser.add_argument('--frame-interval', type=float, help='pace file sources, in seconds per frame')
+    parser.add_argument('--output', help='write JSON lines to this file instead of stdout')
+    args = parser.parse_args(argv)
+
+    service = DOAService(
+        args.num_antenna, args.num_target, args.freq,
+        all_doas=np.linspace(-np.pi/2, np.pi/2, args.num_grid, endpoint=False),
+        algorithm=args.algorithm, executor=args.executor, max_workers=args.max_workers,
+        queue_size=args.queue_size, overflow=args.overflow, blas_threads=args.blas_threads,
+    )
+    output = sys.stdout if args.output is None else open(args.output, 'w')
+    try:
+        stats = asyncio.run(service.run(args.source, output, args.frame_interval))
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    print(json.dumps(stats), file=sys.stderr)
+    return stats
+
+
+if __name__ == '__main__':
+    main()
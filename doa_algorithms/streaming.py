@@ -0,0 +1,215 @@
+import numpy as np
+from scipy import linalg
+from signal_model.covariance import sample_covariance
+
+
+class StreamingCovariance:
+    """
+    Covariance of a continuous snapshot feed maintained with rank-1 updates.
+
+    Parameters:
+    - `num_antenna`: Number of array elements.
+    - `window`: Length of the sliding window in snapshots. Mutually exclusive with `forgetting_factor`.
+    - `forgetting_factor`: Exponential weighting in (0, 1]; 1 keeps the full history.
+    """
+
+    def __init__(self, num_antenna: int, window: int = None, forgetting_factor: float = None):
+        if (window is None) == (forgetting_factor is None):
+            raise ValueError("Exactly one of window or forgetting_factor must be given.")
+        if window is not None and window < 1:
+            raise ValueError("Window must be positive.")
+        if forgetting_factor is not None and not 0 < forgetting_factor <= 1:
+            raise ValueError("Forgetting factor must be in (0, 1].")
+
+        self.num_antenna = num_antenna
+        self.window = window
+        self.forgetting_factor = forgetting_factor
+        self.reset()
+
+    def reset(self):
+        self._R = np.zeros((self.num_antenna, self.num_antenna), dtype=np.complex128)
+        self._weight = 0.0
+        self.num_updates = 0
+        if self.window is not None:
+            self._buffer = np.zeros((self.window, self.num_antenna), dtype=np.complex128)
+            self._head = 0
+            self._since_refresh = 0
+
+    @property
+    def covariance(self) -> np.ndarray:
+        """
+        output shape:
+            (num_antenna, num_antenna)
+        """
+        if self._weight == 0:
+            raise ValueError("No snapshots have been received yet.")
+        return self._R / self._weight
+
+    def update(self, snapshot: np.ndarray) -> np.ndarray:
+        """
+        input shape:
+            (num_antenna,)
+        """
+        return self.update_block(snapshot[np.newaxis, :])
+
+    def update_block(self, snapshots: np.ndarray) -> np.ndarray:
+        """
+        input shape:
+            (num_sample, num_antenna)
+        output shape:
+            (num_antenna, num_antenna)
+        """
+        if snapshots.shape[-1] != self.num_antenna:
+            raise ValueError(
+                f"Snapshots should have {self.num_antenna} columns (antennas). "
+                f"Got shape {snapshots.shape}"
+            )
+        if self.window is None:
+            self._update_exponential(snapshots)
+        else:
+            self._update_sliding(snapshots)
+        self.num_updates += snapshots.shape[0]
+        return self.covariance
+
+    def _update_exponential(self, snapshots):
+        num_sample = snapshots.shape[0]
+        weights = self.forgetting_factor ** np.arange(num_sample - 1, -1, -1)
+        decay = self.forgetting_factor ** num_sample
+        self._R *= decay
+        self._R += (snapshots.T * weights) @ snapshots.conj()
+        self._weight = decay * self._weight + np.sum(weights)
+
+    def _update_sliding(self, snapshots):
+        num_sample = snapshots.shape[0]
+        if num_sample >= self.window:
+            self._buffer[:] = snapshots[-self.window:]
+            self._head = 0
+            self._weight = float(self.window)
+            self._refresh()
+            return
+
+        num_valid = int(self._weight)
+        slots = (self._head + np.arange(num_sample)) % self.window
+        num_evicted = max(0, num_valid + num_sample - self.window)
+        outgoing = self._buffer[slots[num_sample - num_evicted:]]
+
+        self._R += snapshots.T @ snapshots.conj() - outgoing.T @ outgoing.conj()
+        self._buffer[slots] = snapshots
+        self._head = (self._head + num_sample) % self.window
+        self._weight = float(min(num_valid + num_sample, self.window))
+
+        # downdates accumulate rounding error; rebuilding the sum once per window
+        # keeps the amortized cost at O(num_antenna^2) per snapshot
+        self._since_refresh += num_sample
+        if self._since_refresh >= self.window:
+            self._refresh()
+
+    def _refresh(self):
+        valid = self._buffer[:int(self._weight)]
+        self._R = valid.T @ valid.conj()
+        self._since_refresh = 0
+
+
+class SubspaceTracker:
+    """
+    Signal-subspace tracker based on projection approximation subspace tracking.
+
+    `method='past'` runs the RLS form with a (num_sources, num_sources) inverse
+    correlation matrix, `method='pastd'` the deflation form that also tracks the
+    dominant eigenvalues. Both cost O(num_antenna * num_sources) per snapshot.
+
+    References:
+        [1] B. Yang, "Projection approximation subspace tracking," IEEE
+        Transactions on Signal Processing, vol. 43, no. 1, pp. 95–107,
+        Jan. 1995.
+    """
+
+    def __init__(self, num_antenna: int, num_sources: int, forgetting_factor: float = 0.99, method: str = 'pastd'):
+        if num_sources >= num_antenna:
+            raise ValueError(
+                f"Number of sources ({num_sources}) must be less than "
+                f"number of antennas ({num_antenna})"
+            )
+        if not 0 < forgetting_factor <= 1:
+            raise ValueError("Forgetting factor must be in (0, 1].")
+        if method not in ('past', 'pastd'):
+            raise ValueError("Method must be either 'past' or 'pastd'.")
+
+        self.num_antenna = num_antenna
+        self.num_sources = num_sources
+        self.forgetting_factor = forgetting_factor
+        self.method = method
+        self.reset()
+
+    def reset(self):
+        self.W = np.eye(self.num_antenna, self.num_sources, dtype=np.complex128)
+        self.P = np.eye(self.num_sources, dtype=np.complex128)
+        self.eigenvalues = np.ones(self.num_sources)
+
+    def initialize(self, snapshots: np.ndarray):
+        """
+        Seed the tracker from the eigendecomposition of a snapshot block.
+
+        input shape:
+            (num_sample, num_antenna)
+        """
+        R = sample_covariance(snapshots)
+        eigenvalues, eigenvectors = linalg.eigh(R)
+        self.W = eigenvectors[:, ::-1][:, :self.num_sources].copy()
+        self.eigenvalues = eigenvalues[::-1][:self.num_sources].copy()
+        self.P = np.diag(1 / self.eigenvalues).astype(np.complex128)
+
+    def update(self, snapshot: np.ndarray):
+        """
+        input shape:
+            (num_antenna,)
+        """
+        if self.method == 'past':
+            self._update_past(snapshot)
+        else:
+            self._update_pastd(snapshot)
+
+    def update_block(self, snapshots: np.ndarray):
+        """
+        input shape:
+            (num_sample, num_antenna)
+        """
+        for snapshot in snapshots:
+            self.update(snapshot)
+
+    def _update_past(self, x):
+        beta = self.forgetting_factor
+        y = self.W.conj().T @ x
+        h = self.P @ y
+        g = h / (beta + y.conj() @ h)
+        P = (self.P - np.outer(g, h.conj())) / beta
+        self.P = 0.5 * (P + P.conj().T)
+        e = x - self.W @ y
+        self.W += np.outer(e, g.conj())
+
+    def _update_pastd(self, x):
+        beta = self.forgetting_factor
+        x = x.astype(np.complex128)
+        for i in range(self.num_sources):
+            w = self.W[:, i]
+            y = w.conj() @ x
+            self.eigenvalues[i] = beta * self.eigenvalues[i] + np.abs(y)**2
+            w += (x - w * y) * (y.conj() / self.eigenvalues[i])
+            x = x - w * y
+
+    def signal_subspace(self) -> np.ndarray:
+        """
+        output shape:
+            (num_antenna, num_sources)
+        """
+        return linalg.qr(self.W, mode='economic')[0]
+
+    def noise_subspace(self) -> np.ndarray:
+        """
+        Orthonormal complement of the tracked signal subspace, ready for
+        `Music.estimate_via_noise_subspace`.
+
+        output shape:
+            (num_antenna, num_antenna - num_sources)
+        """
+        return linalg.qr(self.W, mode='full')[0][:, self.num_sources:]
@@ -0,0 +1,230 @@
+import numpy as np
+
+from .capon import Capon
+from .context import SOURCE_COUNT_CRITERIA, as_frame_context
+from .profiling import stage
+from .refinement import coarse_peaks, grid_spacing, refine_minima
+from .utils import indices_to_angles
+
+
+class DOATracker:
+    """
+    Warm-started DOA tracking over a stream of frames.
+
+    Each track keeps an angle and a velocity. A frame evaluates the spectrum
+    of `estimator` only on `2 * half_window + 1` points of `all_doas` around
+    every predicted angle. This costs O(num_tracks * half_window) steering
+    vectors instead of the whole grid. The full grid is scanned when:
+    - there are no tracks yet,
+    - the number of sources changes,
+    - a track is lost, i.e. its window has no interior peak or the peak fell
+      below `min_peak_ratio` of its height on the previous frame,
+    - two tracks merge,
+    - `rescan_interval` frames have passed since the last full scan.
+
+    Usage:
+        tracker = DOATracker(Music(all_doas, None, 16, 1e9), num_sources=2)
+        for frame in frames:
+            angles = tracker.update(frame)
+
+    Parameters:
+    - `estimator`: A `Music` or `Capon` instance; its grid, backend, eigensolver and precision are used.
+    - `num_sources`: Number of tracks. Either an int or 'mdl'/'aic' to count the sources of every frame.
+    - `half_window`: Grid points searched on each side of a predicted angle.
+    - `min_peak_ratio`: Fraction of its previous height below which a track's peak counts as lost.
+    - `rescan_interval`: Frames between forced full scans, so new sources are picked up. None disables it.
+    - `velocity_smoothing`: Weight of the previous velocity in [0, 1); 0 predicts with the last step.
+    - `refinement`: 'newton' or 'zoom' to refine every frame with `refine_minima`, or None.
+    """
+
+    def __init__(
+        self,
+        estimator,
+        num_sources=None,
+        half_window: int = 8,
+        min_peak_ratio: float = 0.25,
+        rescan_interval: int = None,
+        velocity_smoothing: float = 0.5,
+        refinement: str = None
+    ):
+        if num_sources is None:
+            if not isinstance(estimator, Capon):
+                raise ValueError("num_sources is required for MUSIC.")
+            num_sources = estimator.num_target
+        if isinstance(num_sources, str) and num_sources not in SOURCE_COUNT_CRITERIA:
+            raise ValueError(f"Unknown criterion '{num_sources}'. Supported are {SOURCE_COUNT_CRITERIA}.")
+        if half_window < 1:
+            raise ValueError("half_window must be positive.")
+        if rescan_interval is not None and rescan_interval < 1:
+            raise ValueError("rescan_interval must be positive.")
+        if not 0 <= velocity_smoothing < 1:
+            raise ValueError("velocity_smoothing must be in [0, 1).")
+
+        self.estimator = estimator
+        self.num_sources = num_sources
+        self.half_window = half_window
+        self.min_peak_ratio = min_peak_ratio
+        self.rescan_interval = rescan_interval
+        self.velocity_smoothing = velocity_smoothing
+        self.refinement = refinement
+        self.all_doas = np.asarray(estimator.all_doas, dtype=float)
+        if 2 * half_window + 1 > self.all_doas.shape[0]:
+            raise ValueError(f"A window of {2 * half_window + 1} points does not fit a grid of {self.all_doas.shape[0]}.")
+        self.reset()
+
+    def reset(self):
+        self.angles = np.empty(0)
+        self.velocities = np.empty(0)
+        self.peaks = np.empty(0)
+        self.num_frames = 0
+        self.num_full_scans = 0
+        self.last_scan = None
+        self._since_full_scan = 0
+
+    def _num_sources(self, ctx) -> int:
+        if isinstance(self.num_sources, str):
+            return int(ctx.mdl() if self.num_sources == 'mdl' else ctx.aic())
+        return self.num_sources
+
+    def _factor(self, ctx, num_sources):
+        """
+        `F` and `offset` with `a^H Q a = ||F a||^2`, or `offset - ||F a||^2`
+        for a MUSIC signal subspace, where `Q` is the matrix the estimator
+        inverts into its spectrum.
+
+        output shape:
+            (rows, num_antenna)
+        """
+        estimator = self.estimator
+        if isinstance(estimator, Capon):
+            return estimator._whitening(ctx), 0
+        if estimator.eigensolver != 'full':
+            Es = ctx.dominant_subspace(num_sources, estimator.eigensolver)
+            return Es.conj().T, ctx.num_antenna
+        return ctx.noise_subspace(num_sources).conj().T, 0
+
+    def _weighting(self, ctx, num_sources) -> np.ndarray:
+        """
+        `Q` for `refine_minima`: `R^-1` for Capon, the noise projector for MUSIC.
+        """
+        estimator = self.estimator
+        if isinstance(estimator, Capon):
+            return estimator._inverse(estimator._whitening(ctx))
+        return ctx.noise_projector(num_sources, estimator.eigensolver)
+
+    def _full_scan(self, ctx, num_sources):
+        """
+        output shape:
+            (num_sources,) angles and (num_sources,) peak heights
+        """
+        estimator = self.estimator
+        if isinstance(estimator, Capon):
+            spectrum = estimator.estimate_batch(ctx)
+        else:
+            spectrum = estimator.estimate(ctx, num_sources)
+        angles = coarse_peaks(spectrum, self.all_doas, num_sources)
+        return angles, np.interp(angles, self.all_doas, spectrum)
+
+    def _local_search(self, ctx, num_sources):
+        """
+        Peaks of the spectrum in a window around every predicted angle.
+
+        output shape:
+            (num_tracks,) angles, (num_tracks,) peak heights and (num_tracks,) bool, True for lost tracks
+        """
+        num_doas = self.all_doas.shape[0]
+        predicted = self.angles + self.velocities
+        centers = np.rint(np.interp(predicted, self.all_doas, np.arange(num_doas))).astype(int)
+        # (num_tracks, window) grid indices, shifted inwards at the ends of the grid
+        offsets = np.arange(-self.half_window, self.half_window + 1)
+        centers = np.clip(centers, self.half_window, num_doas - 1 - self.half_window)
+        indices = centers[:, np.newaxis] + offsets
+
+        F, offset = self._factor(ctx, num_sources)
+        with stage('manifold'):
+            A = self.estimator.steering_matrix(self.all_doas[indices.reshape(-1)], ctx.num_antenna)
+            A = A.astype(F.dtype, copy=False)
+        with stage('spectrum'):
+            projection = F @ A
+            power = np.sum(projection.real**2 + projection.imag**2, axis=0).reshape(indices.shape)
+            cost = offset - power if offset else power
+            cost = np.maximum(cost, 1e-6)
+
+        with stage('peak_search'):
+            spectrum = 1 / cost.astype(float)
+            best = np.argmax(spectrum, axis=-1)
+            rows = np.arange(len(best))
+            interior = (best > 0) & (best < indices.shape[1] - 1)
+            lost = ~interior | (spectrum[rows, best] < self.min_peak_ratio * self.peaks)
+
+            # parabolic sub-bin offset, as in `SpectrumPeakFinder.find_peaks_batch`
+            left = spectrum[rows, np.maximum(best - 1, 0)]
+            center = spectrum[rows, best]
+            right = spectrum[rows, np.minimum(best + 1, indices.shape[1] - 1)]
+            curvature = left - 2 * center + right
+            with np.errstate(divide='ignore', invalid='ignore'):
+                shift = np.where(curvature < 0, 0.5 * (left - right) / curvature, 0.0)
+            shift = np.clip(shift, -0.5, 0.5)
+            fractional = indices[rows, best] + shift
+
+            # two windows locking onto the same peak
+            order = np.argsort(fractional)
+            merged = np.diff(fractional[order]) < 1
+            lost[order[1:]] |= merged
+            lost[order[:-1]] |= merged
+        return indices_to_angles(fractional, self.all_doas), center, lost
+
+    def update(self, input_signal: np.ndarray) -> np.ndarray:
+        """
+        Track one frame.
+
+        input shape:
+            (num_sample, num_antenna), or a `FrameContext`
+        output shape:
+            (num_tracks,), ascending
+        """
+        ctx = as_frame_context(input_signal, self.estimator.complex_dtype)
+        num_sources = self._num_sources(ctx)
+
+        full_scan = (
+            num_sources != len(self.angles)
+            or (self.rescan_interval is not None and self._since_full_scan + 1 >= self.rescan_interval)
+        )
+        if num_sources == 0:
+            # a source-free frame leaves nothing to search
+            angles, peaks = np.empty(0), np.empty(0)
+        else:
+            if not full_scan:
+                angles, peaks, lost = self._local_search(ctx, num_sources)
+                full_scan = bool(np.any(lost))
+
+            if full_scan:
+                angles, peaks = self._full_scan(ctx, num_sources)
+                self.num_full_scans += 1
+                self._since_full_scan = 0
+            else:
+                self._since_full_scan += 1
+
+        if self.refinement is not None and num_sources > 0:
+            angles = refine_minima(
+                self.estimator, self._weighting(ctx, num_sources), angles, self.refinement,
+                grid_spacing=grid_spacing(self.all_doas))
+
+        order = np.argsort(angles)
+        angles = angles[order]
+        if num_sources != len(self.angles):
+            self.velocities = np.zeros(num_sources)
+        else:
+            # a full scan with unchanged source count keeps the tracks, associated in angle order
+            previous = self.angles if full_scan else self.angles[order]
+            velocities = self.velocities if full_scan else self.velocities[order]
+            self.velocities = self.velocity_smoothing * velocities + (1 - self.velocity_smoothing) * (angles - previous)
+
+        self.angles = angles
+        self.peaks = peaks[order]
+        if num_sources == 0:
+            self.last_scan = None
+        else:
+            self.last_scan = 'full' if full_scan else 'local'
+        self.num_frames += 1
+        return angles.copy()
@@ -0,0 +1,171 @@
+import numpy as np
+from signal_model.covariance import sample_covariance
+from signal_model.sensor_array import UniformLinearSensorArray
+from signal_model.wideband import bin_frequencies, stft_snapshots
+
+from .context import FrameContext
+from .profiling import stage
+from .refinement import coarse_peaks
+from .utils import diagonal_sums
+
+WIDEBAND_METHODS = ('incoherent', 'cssm')
+
+
+class WidebandMusic(UniformLinearSensorArray):
+    """
+    Wideband MUSIC over STFT bins of complex baseband samples.
+
+    The samples are channelized with `stft_snapshots` and the covariances of
+    all used bins are formed as one (..., num_bins, num_antenna, num_antenna)
+    tensor, decomposed by one batched `eigh`.
+
+    'incoherent' evaluates every bin against its own manifold from
+    `wideband_manifold` and combines the bins in one pass:
+        P(theta) = 1 / mean_k(a_k^H En_k En_k^H a_k)
+    Each quadratic form is expanded in the diagonal sums of its projector, so
+    the whole sum is one (num_bins * num_antenna)-long product per grid point.
+    'cssm' (coherent signal subspace method) maps every bin onto the carrier
+    with rotational focusing matrices `T_k = V_k U_k^H`, from the SVD
+    `A_k(beta) A_0(beta)^H = U_k S_k V_k^H` at the focusing angles `beta`.
+    It then runs narrowband MUSIC on `sum_k T_k R_k T_k^H`. Without explicit
+    focusing angles, the incoherent peaks and their neighbours a quarter
+    beamwidth away are used.
+
+    Parameters:
+    - `all_doas`: Search grid.
+    - `sampling_rate`: Complex baseband sampling rate.
+    - `nfft`: STFT length, i.e. number of bins.
+    - `hop`: STFT hop, `nfft` by default.
+    - `bandwidth`: Only bins within `bandwidth / 2` of the carrier are used; all bins by default.
+    - `method`: 'incoherent' or 'cssm'.
+
+    References:
+        [1] H. Wang and M. Kaveh, "Coherent signal-subspace processing for the
+        detection and estimation of angles of arrival of multiple wide-band
+        sources," IEEE Transactions on Acoustics, Speech and Signal Processing,
+        vol. 33, no. 4, pp. 823–831, Aug. 1985.
+        [2] H. Hung and M. Kaveh, "Focussing matrices for coherent signal-subspace
+        processing," IEEE Transactions on Acoustics, Speech and Signal Processing,
+        vol. 36, no. 8, pp. 1272–1281, Aug. 1988.
+    """
+
+    def __init__(
+        self,
+        all_doas: np.ndarray,
+        sampling_rate: float,
+        *args,
+        nfft: int = 64,
+        hop: int = None,
+        bandwidth: float = None,
+        method: str = 'incoherent',
+        **kwargs
+    ):
+        super().__init__(*args, **kwargs)
+        if method not in WIDEBAND_METHODS:
+            raise ValueError(f"Invalid method '{method}'. Supported are {WIDEBAND_METHODS}.")
+        self.all_doas = all_doas
+        self.sampling_rate = sampling_rate
+        self.nfft = nfft
+        self.hop = hop
+        self.method = method
+
+        offsets = np.fft.fftfreq(nfft, 1 / sampling_rate)
+        bins = np.arange(nfft) if bandwidth is None else np.flatnonzero(np.abs(offsets) <= bandwidth / 2)
+        if len(bins) == 0:
+            raise ValueError("No STFT bin lies within the bandwidth.")
+        self.bins = bins
+        self.freqs = bin_frequencies(nfft, sampling_rate, self.freq)[bins]
+
+    def bin_covariances(self, input_signal: np.ndarray) -> np.ndarray:
+        """
+        input shape:
+            (..., num_sample, num_antenna)
+        output shape:
+            (..., num_bins, num_antenna, num_antenna)
+        """
+        input_signal = np.asarray(input_signal).astype(self.complex_dtype, copy=False)
+        if input_signal.shape[-1] != self.num_antenna:
+            raise ValueError(
+                f"Input signal should have {self.num_antenna} columns (antennas). "
+                f"Got {input_signal.shape[-1]}"
+            )
+        with stage('covariance'):
+            snapshots = stft_snapshots(input_signal, self.nfft, self.hop)[..., self.bins, :, :]
+            return sample_covariance(snapshots.astype(self.complex_dtype, copy=False))
+
+    def _incoherent(self, ctx: FrameContext, num_sources: int) -> np.ndarray:
+        Q = ctx.noise_projector(num_sources)
+        with stage('manifold'):
+            A = self.wideband_manifold(self.all_doas, self.freqs)
+        with stage('spectrum'):
+            # a_k^H Q_k a_k = Re sum_l c_kl conj(a_kl) with c_k0 the trace and c_kl twice the
+            # l-th lower diagonal sum, so all bins and lags contract in a single product
+            coeffs = diagonal_sums(Q)[..., self.num_antenna - 1:]
+            coeffs[..., 1:] *= 2
+            num_bins = A.shape[0]
+            flat_coeffs = coeffs.conj().reshape(coeffs.shape[:-2] + (1, num_bins * self.num_antenna))
+            p_music = np.real(flat_coeffs @ A.reshape(num_bins * self.num_antenna, -1))[..., 0, :] / num_bins
+            p_music = np.where(p_music <= 0, 1e-6, p_music)
+            return 1 / p_music
+
+    def _focusing_angles(self, ctx: FrameContext, num_sources: int) -> np.ndarray:
+        """
+        Incoherent peaks and their neighbours a quarter beamwidth away.
+
+        output shape:
+            (..., 3 * num_sources)
+        """
+        peaks = coarse_peaks(self._incoherent(ctx, num_sources), self.all_doas, num_sources)
+        # half-power beamwidth at broadside is about lambda / (num_antenna d) radians
+        offset = self._lambda / (self.num_antenna * self.d) / 4
+        if self._is_degrees:
+            offset = np.rad2deg(offset)
+        return (peaks[..., np.newaxis] + offset * np.array([-1.0, 0.0, 1.0])).reshape(peaks.shape[:-1] + (-1,))
+
+    def _focused_covariance(self, R: np.ndarray, focusing_angles: np.ndarray) -> np.ndarray:
+        """
+        input shape:
+            R: (..., num_bins, num_antenna, num_antenna), focusing_angles: (..., num_angles)
+        output shape:
+            (..., num_antenna, num_antenna)
+        """
+        with stage('focusing'):
+            A_k = self.steering_matrix_at(focusing_angles, self.freqs)
+            A_0 = self.steering_matrix_at(focusing_angles, np.array([self.freq]))
+            U, _, Vh = np.linalg.svd(A_k @ A_0.conj().swapaxes(-1, -2))
+            T = (U @ Vh).conj().swapaxes(-1, -2).astype(self.complex_dtype, copy=False)
+            return np.mean(T @ R @ T.conj().swapaxes(-1, -2), axis=-3)
+
+    def _coherent(self, R: np.ndarray, focusing_angles: np.ndarray, num_sources: int) -> np.ndarray:
+        En = FrameContext(covariance=self._focused_covariance(R, focusing_angles)).noise_subspace(num_sources)
+        with stage('manifold'):
+            A = self.manifold(self.all_doas)
+        with stage('spectrum'):
+            projection = En.conj().swapaxes(-1, -2) @ A
+            p_music = np.sum(projection.real**2 + projection.imag**2, axis=-2)
+            p_music = np.where(p_music <= 0, 1e-6, p_music)
+            return 1 / p_music
+
+    def estimate(self, input_signal: np.ndarray, num_sources: int, focusing_angles: np.ndarray = None) -> np.ndarray:
+        """
+        input shape:
+            (..., num_sample, num_antenna)
+        output shape:
+            (..., num_doas)
+        """
+        return self.estimate_from_covariance(self.bin_covariances(input_signal), num_sources, focusing_angles)
+
+    def estimate_from_covariance(self, R: np.ndarray, num_sources: int, focusing_angles: np.ndarray = None) -> np.ndarray:
+        """
+        input shape:
+            R: (..., num_bins, num_antenna, num_antenna), e.g. from `bin_covariances`
+            focusing_angles: (..., num_angles), only used by 'cssm'
+        output shape:
+            (..., num_doas)
+        """
+        ctx = FrameContext(covariance=R, dtype=self.complex_dtype)
+        if self.method == 'incoherent':
+            return self._incoherent(ctx, num_sources)
+        if focusing_angles is None:
+            focusing_angles = self._focusing_angles(ctx, num_sources)
+        return self._coherent(ctx.covariance, np.asarray(focusing_angles, dtype=float), num_sources)
@@ -0,0 +1,110 @@
+"""
+Estimator setup shared by the process pools of `evaluation` and `service`.
+"""
+import json
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import numpy as np
+
+from .capon import Capon
+from .cramer_rao_bound_doa import CramerRaoBound
+from .esprite import Esprit
+from .music import Music
+from .root_music import RootMUSIC
+from .utils import SpectrumPeakFinder, indices_to_angles
+
+ALGORITHMS = ('music', 'root_music', 'capon', 'esprit')
+BLAS_THREAD_VARIABLES = (
+    'OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS',
+    'BLIS_NUM_THREADS', 'VECLIB_MAXIMUM_THREADS', 'NUMEXPR_NUM_THREADS',
+)
+
+MAX_CACHED_ESTIMATORS = 8
+
+_worker_estimators = OrderedDict()
+_worker_estimators_lock = threading.Lock()
+
+
+@contextmanager
+def blas_thread_environment(num_threads):
+    """
+    Spawned workers read the BLAS thread variables at import time, so they are
+    set in the parent for the lifetime of the pool and restored afterwards.
+    """
+    saved = {var: os.environ.get(var) for var in BLAS_THREAD_VARIABLES}
+    if num_threads is not None:
+        for var in BLAS_THREAD_VARIABLES:
+            os.environ[var] = str(num_threads)
+    try:
+        yield
+    finally:
+        for var, value in saved.items():
+            if value is None:
+                os.environ.pop(var, None)
+            else:
+                os.environ[var] = value
+
+
+def init_worker(num_threads):
+    """
+    Pool initializer capping the worker's BLAS threads, when threadpoolctl is installed.
+    """
+    if num_threads is None:
+        return
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        return
+    threadpool_limits(num_threads)
+
+
+def build_estimators(config, num_sample):
+    """
+    Estimators for `config` and blocks of `num_sample` snapshots, built once
+    per worker process and reused across tasks and frames. Only the
+    `MAX_CACHED_ESTIMATORS` most recently used sets are kept, so a stream of
+    varying frame lengths does not grow the cache without bound.
+    """
+    key = (json.dumps(config, sort_keys=True), num_sample)
+    with _worker_estimators_lock:
+        estimators = _worker_estimators.get(key)
+        if estimators is not None:
+            _worker_estimators.move_to_end(key)
+            return estimators
+
+        args = (num_sample, config['num_target'], config['coherent'], config['num_antenna'],
+                config['freq'], config['is_baseband'])
+        all_doas = np.asarray(config['all_doas'])
+        estimators = {
+            'music': Music(all_doas, None, config['num_antenna'], config['freq']),
+            'root_music': RootMUSIC(*args),
+            'capon': Capon(all_doas, *args),
+            'esprit': Esprit(*args),
+            'crb': CramerRaoBound(num_sample, config['num_antenna'], config['freq']),
+            'peak_finder': SpectrumPeakFinder(config['num_target'], filter_type='butterworth'),
+        }
+        _worker_estimators[key] = estimators
+        while len(_worker_estimators) > MAX_CACHED_ESTIMATORS:
+            _worker_estimators.popitem(last=False)
+        return estimators
+
+
+def estimate_doas(estimators, name, sig, all_doas, num_target):
+    """
+    Sorted DOA estimates of one (num_sample, num_antenna) block, or of a
+    `FrameContext` shared between estimators, with the estimator `name`
+    from `build_estimators`.
+    """
+    if name in ('music', 'capon'):
+        if name == 'music':
+            spectrum = estimators['music'].estimate(sig, num_target)
+        else:
+            spectrum = estimators['capon'].estimate_batch(sig)
+        peaks = estimators['peak_finder'].find_peaks_batch(spectrum)[0]
+        return indices_to_angles(peaks, all_doas)
+    if name == 'root_music':
+        return np.sort(estimators['root_music'].estimate(sig, unit_circle_only=True))
+    return np.sort(estimators['esprit'].estimate_from_snapshots(sig))
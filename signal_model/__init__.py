@@ -1,4 +1,8 @@
-from .antenna_response import FarField1DSource
-from .sensor_array import UniformLinearSensorArray
+from .antenna_response import FarField1DSource, FarField2DSource
+from .covariance import CovarianceAccumulator, sample_covariance
+from .manifold_cache import ManifoldCache, manifold_cache
+from .sensor_array import UniformLinearSensorArray, UniformRectangularSensorArray
 from .spatial_smoothing import fbss, improved_spatial_smoothed_covariance
-from .utils import generate_random_angles
+from .utils import generate_random_angles, generate_random_angles_batch
+from .wideband import WidebandFarField1DSource, bin_frequencies, stft_snapshots
+from .capture import IQCapture, process_capture, save_capture
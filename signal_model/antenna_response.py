@@ -1,5 +1,5 @@
 import numpy as np
-from signal_model.sensor_array import UniformLinearSensorArray
+from signal_model.sensor_array import UniformLinearSensorArray, UniformRectangularSensorArray
 
 
 class RandomGenarator:
@@ -8,75 +8,53 @@ class RandomGenarator:
         self.rng = np.random.default_rng(seed)
 
 
-class FarField1DSource(UniformLinearSensorArray, RandomGenarator):
-    __slots__ = ['num_sample', 'num_target', 'coherent', 'is_baseband', 'sampling_time']
-
-    def __init__(
-        self,
-        num_sample: int,
-        num_target: int,
-        coherent: bool,
-        num_antenna: int,
-        freq: int,
-        is_baseband: bool = False,
-        element_spacing: float = 0.5,  # means lambda / 2
-        angle_type: str = 'rad',
-        **kwargs
-    ):
-        super().__init__(num_antenna, freq, element_spacing, angle_type, **kwargs)
-        if num_sample <= 0:
-            raise ValueError("Number of samples must be positive.")
-        if num_target <= 0:
-            raise ValueError("Number of targets must be positive.")
-
-        self.num_sample = num_sample
-        self.num_target = num_target
-        self.coherent = coherent
-        self.is_baseband = is_baseband
-
-        if not is_baseband:
-            self.freq_sampling = self.freq
-            self.sampling_time = self._compute_sampling_time(self.freq)
+class SourceSignals:
+    """
+    Emitted waveforms and receiver noise shared by the far-field sources. The
+    host class provides `num_sample`, `num_target`, `num_antenna`, `coherent`,
+    `rng` and, for non-baseband signals, `freq`.
+    """
+    __slots__ = ()
 
     def _compute_sampling_time(self, freq) -> np.ndarray:
         freq_sampling = 4 * freq
         return np.arange(self.num_sample) / freq_sampling
 
-    def _emitted_normal_signal(self) -> np.ndarray:
+    def _emitted_normal_signal(self, batch_shape: tuple = ()) -> np.ndarray:
         """
         output shape:
-            (num_target, num_sample)
+            (*batch_shape, num_target, num_sample)
         """
         if self.coherent:
             sig = (
-                self.rng.standard_normal((1, self.num_sample)) +
-                1j * self.rng.standard_normal((1, self.num_sample)))
-            amplitudes = self.rng.uniform(0.5, 1.5, (self.num_target, 1))
+                self.rng.standard_normal(batch_shape + (1, self.num_sample)) +
+                1j * self.rng.standard_normal(batch_shape + (1, self.num_sample)))
+            amplitudes = self.rng.uniform(0.5, 1.5, batch_shape + (self.num_target, 1))
             sig = sig * amplitudes
         else:
             sig = (
-                self.rng.standard_normal((self.num_target, self.num_sample)) +
-                1j * self.rng.standard_normal((self.num_target, self.num_sample))
+                self.rng.standard_normal(batch_shape + (self.num_target, self.num_sample)) +
+                1j * self.rng.standard_normal(batch_shape + (self.num_target, self.num_sample))
             )
 
         return sig
 
-    def _emitted_sinusoidal_signal(self) -> np.ndarray:
+    def _emitted_sinusoidal_signal(self, batch_shape: tuple = ()) -> np.ndarray:
         """
         output shape:
-            (num_target, num_sample)
+            (*batch_shape, num_target, num_sample)
         """
         t = self.sampling_time[np.newaxis, :]
 
         if self.coherent:
-            random_amplitudes = self.rng.uniform(0.5, 1.5, (self.num_target, 1))
+            random_amplitudes = self.rng.uniform(0.5, 1.5, batch_shape + (self.num_target, 1))
             phase = 2 * np.pi * self.freq_sampling * t
             sig = np.exp(-1j * phase) * random_amplitudes
         else:
-            random_phases = self.rng.uniform(0, 2*np.pi, self.num_target)
-            random_amplitudes = self.rng.uniform(0.5, 1.5, self.num_target)
-            phase = 2 * np.pi * self.freq_sampling * t + random_phases[:, np.newaxis]
-            sig = np.exp(-1j * phase) * random_amplitudes[:, np.newaxis]
+            random_phases = self.rng.uniform(0, 2*np.pi, batch_shape + (self.num_target,))
+            random_amplitudes = self.rng.uniform(0.5, 1.5, batch_shape + (self.num_target,))
+            phase = 2 * np.pi * self.freq_sampling * t + random_phases[..., np.newaxis]
+            sig = np.exp(-1j * phase) * random_amplitudes[..., np.newaxis]
         return sig
 
     def _complex_normal_noise(self) -> np.ndarray:
@@ -84,9 +62,40 @@ class FarField1DSource(UniformLinearSensorArray, RandomGenarator):
         output shape:
             (num_sample, num_antenna)
         """
-        n = (self.rng.standard_normal((self.num_sample, self.num_antenna)) +
-             1j * self.rng.standard_normal((self.num_sample, self.num_antenna)))
-        return n / np.sqrt(2)
+        n = (self.rng.standard_normal((self.num_sample, self.num_antenna), dtype=self.real_dtype) +
+             1j * self.rng.standard_normal((self.num_sample, self.num_antenna), dtype=self.real_dtype))
+        return n / self.real_dtype.type(np.sqrt(2))
+
+
+class FarField1DSource(UniformLinearSensorArray, SourceSignals, RandomGenarator):
+    __slots__ = ['num_sample', 'num_target', 'coherent', 'is_baseband', 'sampling_time']
+
+    def __init__(
+        self,
+        num_sample: int,
+        num_target: int,
+        coherent: bool,
+        num_antenna: int,
+        freq: int,
+        is_baseband: bool = False,
+        element_spacing: float = 0.5,  # means lambda / 2
+        angle_type: str = 'rad',
+        **kwargs
+    ):
+        super().__init__(num_antenna, freq, element_spacing, angle_type, **kwargs)
+        if num_sample <= 0:
+            raise ValueError("Number of samples must be positive.")
+        if num_target <= 0:
+            raise ValueError("Number of targets must be positive.")
+
+        self.num_sample = num_sample
+        self.num_target = num_target
+        self.coherent = coherent
+        self.is_baseband = is_baseband
+
+        if not is_baseband:
+            self.freq_sampling = self.freq
+            self.sampling_time = self._compute_sampling_time(self.freq)
 
     def collect_plane_wave_response(self, angles: np.ndarray, snr: int, num_antenna: int = None) -> np.ndarray:
         """
@@ -108,7 +117,7 @@ class FarField1DSource(UniformLinearSensorArray, RandomGenarator):
         scaling = np.sqrt(10 ** (snr * 0.1) / sig_p)
         X *= scaling
 
-        return X.T + N
+        return X.T.astype(self.complex_dtype, copy=False) + N
 
     def collect_plane_wave_response_doublets(self, angles: np.ndarray, snr: int, num_antenna: int = None) -> np.ndarray:
         """
@@ -131,4 +140,140 @@ class FarField1DSource(UniformLinearSensorArray, RandomGenarator):
         scaling = np.sqrt(10 ** (snr * 0.1) / sig_p)
         X *= scaling
 
-        return X.T + N
+        return X.T.astype(self.complex_dtype, copy=False) + N
+
+    def collect_plane_wave_response_batch(
+        self,
+        angles: np.ndarray,
+        snr,
+        num_antenna: int = None,
+        out: np.ndarray = None,
+        dtype=None,
+        doublets: bool = False
+    ) -> np.ndarray:
+        """
+        One trial per row of `angles`, each with its own SNR. Source signals, noise
+        and steering matrices for the whole batch are drawn in bulk from `rng`,
+        and the result is written into `out` when given. `dtype` defaults to the
+        array's `complex_dtype`.
+
+        input shape:
+            angles: (batch, num_target)
+            snr: scalar or (batch,)
+        output shape:
+            (batch, num_sample, num_antenna)
+        """
+        angles = np.asarray(angles)
+        if angles.ndim != 2 or angles.shape[1] != self.num_target:
+            raise ValueError("Angles must have shape (batch, num_target).")
+        if num_antenna is None:
+            num_antenna = self.num_antenna
+
+        dtype = self.complex_dtype if dtype is None else np.dtype(dtype)
+        batch = angles.shape[0]
+        shape = (batch, self.num_sample, num_antenna)
+        if out is None:
+            out = np.empty(shape, dtype=dtype)
+        elif out.shape != shape or out.dtype != dtype:
+            raise ValueError(f"out must have shape {shape} and dtype {dtype}.")
+
+        if self.is_baseband:
+            S = self._emitted_normal_signal((batch,))
+        else:
+            S = self._emitted_sinusoidal_signal((batch,))
+
+        A = self.steering_matrix(angles.reshape(-1), num_antenna)
+        if doublets:
+            flat = np.deg2rad(angles.reshape(-1)) if self._is_degrees else angles.reshape(-1)
+            A = A * np.exp(1j * np.sin(flat))
+        # (num_antenna, batch * num_target) -> (batch, num_target, num_antenna)
+        A = A.reshape(num_antenna, batch, self.num_target).transpose(1, 2, 0)
+
+        np.matmul(S.swapaxes(-1, -2).astype(dtype, copy=False), A.astype(dtype, copy=False), out=out)
+        real_view = out.view(out.real.dtype).reshape(batch, -1)
+        sig_p = np.einsum('bi,bi->b', real_view, real_view) / (self.num_sample * num_antenna)
+        scaling = np.sqrt(10 ** (np.asarray(snr) * 0.1) / sig_p).astype(out.real.dtype)
+        out *= scaling[:, np.newaxis, np.newaxis]
+
+        noise = self.rng.standard_normal(shape + (2,), dtype=out.real.dtype)
+        noise *= 1 / np.sqrt(2)
+        out += noise.view(dtype)[..., 0]
+        return out
+
+
+class FarField2DSource(UniformRectangularSensorArray, SourceSignals, RandomGenarator):
+    """
+    Far-field sources seen by a `UniformRectangularSensorArray`. Directions
+    are (azimuth, elevation) pairs.
+    """
+    __slots__ = ['num_sample', 'num_target', 'coherent', 'is_baseband', 'sampling_time']
+
+    def __init__(
+        self,
+        num_sample: int,
+        num_target: int,
+        coherent: bool,
+        num_antenna_az: int,
+        num_antenna_el: int,
+        freq: int,
+        is_baseband: bool = False,
+        element_spacing: float = 0.5,  # means lambda / 2
+        angle_type: str = 'rad',
+        **kwargs
+    ):
+        super().__init__(num_antenna_az, num_antenna_el, freq, element_spacing, angle_type, **kwargs)
+        if num_sample <= 0:
+            raise ValueError("Number of samples must be positive.")
+        if num_target <= 0:
+            raise ValueError("Number of targets must be positive.")
+
+        self.num_sample = num_sample
+        self.num_target = num_target
+        self.coherent = coherent
+        self.is_baseband = is_baseband
+
+        if not is_baseband:
+            self.freq_sampling = self.freq
+            self.sampling_time = self._compute_sampling_time(self.freq)
+
+    def collect_plane_wave_response(self, angles: np.ndarray, snr: int) -> np.ndarray:
+        """
+        input shape:
+            (num_target, 2), azimuth and elevation per row
+        output shape:
+            (num_sample, num_antenna)
+        """
+        return self.collect_plane_wave_response_batch(np.asarray(angles)[np.newaxis], snr)[0]
+
+    def collect_plane_wave_response_batch(self, angles: np.ndarray, snr, dtype=None) -> np.ndarray:
+        """
+        One trial per leading index of `angles`, each with its own SNR.
+
+        input shape:
+            angles: (batch, num_target, 2)
+            snr: scalar or (batch,)
+        output shape:
+            (batch, num_sample, num_antenna)
+        """
+        angles = np.asarray(angles)
+        if angles.ndim != 3 or angles.shape[1:] != (self.num_target, 2):
+            raise ValueError("Angles must have shape (batch, num_target, 2).")
+        dtype = self.complex_dtype if dtype is None else np.dtype(dtype)
+        batch = angles.shape[0]
+
+        if self.is_baseband:
+            S = self._emitted_normal_signal((batch,))
+        else:
+            S = self._emitted_sinusoidal_signal((batch,))
+
+        A = self.steering_matrix(angles[..., 0].reshape(-1), angles[..., 1].reshape(-1))
+        # (num_antenna, batch * num_target) -> (batch, num_target, num_antenna)
+        A = A.reshape(self.num_antenna, batch, self.num_target).transpose(1, 2, 0)
+
+        X = S.swapaxes(-1, -2) @ A
+        sig_p = np.mean(X.real**2 + X.imag**2, axis=(-2, -1))
+        X *= np.sqrt(10 ** (np.asarray(snr) * 0.1) / sig_p)[:, np.newaxis, np.newaxis]
+
+        noise = self.rng.standard_normal((batch, self.num_sample, self.num_antenna, 2), dtype=self.real_dtype)
+        noise *= 1 / np.sqrt(2)
+        return X.astype(dtype) + noise.view(self.complex_dtype)[..., 0].astype(dtype, copy=False)
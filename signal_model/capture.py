@@ -0,0 +1,182 @@
+import numpy as np
+
+SAMPLE_FORMATS = ('int16', 'complex64')
+LAYOUTS = ('sample_major', 'antenna_major')
+
+
+class IQCapture:
+    """
+    Memory-mapped view of a raw multi-channel IQ recording.
+
+    Parameters:
+    - `path`: Raw capture file.
+    - `num_antenna`: Number of channels in the recording.
+    - `sample_format`: 'int16' for interleaved I/Q int16 pairs, 'complex64' for interleaved float32 pairs.
+    - `layout`: 'sample_major' when all antennas of one sample are contiguous,
+      'antenna_major' when each antenna's samples are stored as one contiguous run.
+    - `offset`: Header bytes to skip.
+    - `scale`: Factor applied when converting int16 data, full scale maps to 1 by default.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        num_antenna: int,
+        sample_format: str = 'complex64',
+        layout: str = 'sample_major',
+        offset: int = 0,
+        scale: float = None
+    ):
+        if sample_format not in SAMPLE_FORMATS:
+            raise ValueError(f"Invalid sample_format '{sample_format}'. Supported are {SAMPLE_FORMATS}.")
+        if layout not in LAYOUTS:
+            raise ValueError(f"Invalid layout '{layout}'. Supported are {LAYOUTS}.")
+        if num_antenna <= 0:
+            raise ValueError("Number of antennas must be positive.")
+
+        self.path = path
+        self.num_antenna = num_antenna
+        self.sample_format = sample_format
+        self.layout = layout
+        self.scale = 1 / 32768 if scale is None else scale
+
+        if sample_format == 'int16':
+            raw = np.memmap(path, dtype=np.int16, mode='r', offset=offset)
+            item_shape = (2,)
+        else:
+            raw = np.memmap(path, dtype=np.complex64, mode='r', offset=offset)
+            item_shape = ()
+
+        items_per_sample = num_antenna * (2 if sample_format == 'int16' else 1)
+        if raw.shape[0] % items_per_sample:
+            raise ValueError(
+                f"Capture size is not a whole number of {num_antenna}-antenna samples.")
+        self.num_sample = raw.shape[0] // items_per_sample
+
+        if layout == 'sample_major':
+            self._data = raw.reshape((self.num_sample, num_antenna) + item_shape)
+        else:
+            self._data = raw.reshape((num_antenna, self.num_sample) + item_shape)
+
+    def __len__(self) -> int:
+        return self.num_sample
+
+    def raw_block(self, start: int, num_sample: int) -> np.ndarray:
+        """
+        Zero-copy view of the stored data for samples `[start, start + num_sample)`.
+
+        output shape:
+            (num_sample, num_antenna) for complex64, (num_sample, num_antenna, 2) for int16
+        """
+        if self.layout == 'sample_major':
+            return self._data[start:start+num_sample]
+        return self._data[:, start:start+num_sample].swapaxes(0, 1)
+
+    def convert(self, raw: np.ndarray, dtype=np.complex64) -> np.ndarray:
+        """
+        Complex samples from a raw block. complex64 data in the requested dtype is
+        returned as the same view; int16 pairs are scaled into a new array.
+        """
+        if self.sample_format == 'complex64':
+            return raw.astype(dtype, copy=False)
+        out = np.empty(raw.shape[:-1], dtype=dtype)
+        out.real = raw[..., 0]
+        out.imag = raw[..., 1]
+        out *= self.scale
+        return out
+
+    def block(self, start: int, num_sample: int, dtype=np.complex64) -> np.ndarray:
+        """
+        output shape:
+            (num_sample, num_antenna)
+        """
+        return self.convert(self.raw_block(start, num_sample), dtype)
+
+    def num_blocks(self, num_sample: int, hop: int = None) -> int:
+        hop = num_sample if hop is None else hop
+        if self.num_sample < num_sample:
+            return 0
+        return (self.num_sample - num_sample) // hop + 1
+
+    def blocks(self, num_sample: int, hop: int = None, dtype=np.complex64):
+        """
+        Yield `(start, block)` for consecutive full blocks of `num_sample`
+        snapshots, `hop` samples apart (non-overlapping by default). Blocks are
+        converted only when they are reached.
+        """
+        if num_sample <= 0:
+            raise ValueError("Number of samples must be positive.")
+        hop = num_sample if hop is None else hop
+        if hop <= 0:
+            raise ValueError("Hop must be positive.")
+        for i in range(self.num_blocks(num_sample, hop)):
+            yield i * hop, self.block(i * hop, num_sample, dtype)
+
+
+def save_capture(path: str, signal: np.ndarray, sample_format: str = 'complex64', layout: str = 'sample_major', scale: float = None):
+    """
+    Write (num_sample, num_antenna) snapshots in the raw format read by `IQCapture`.
+    """
+    if sample_format not in SAMPLE_FORMATS:
+        raise ValueError(f"Invalid sample_format '{sample_format}'. Supported are {SAMPLE_FORMATS}.")
+    if layout == 'antenna_major':
+        signal = signal.T
+    elif layout != 'sample_major':
+        raise ValueError(f"Invalid layout '{layout}'. Supported are {LAYOUTS}.")
+
+    if sample_format == 'complex64':
+        data = np.ascontiguousarray(signal, dtype=np.complex64)
+    else:
+        scale = 1 / 32768 if scale is None else scale
+        data = np.empty(signal.shape + (2,), dtype=np.int16)
+        data[..., 0] = np.clip(np.round(signal.real / scale), -32768, 32767)
+        data[..., 1] = np.clip(np.round(signal.imag / scale), -32768, 32767)
+    data.tofile(path)
+
+
+def process_capture(
+    capture: IQCapture,
+    estimate,
+    num_sample: int,
+    output_path: str = None,
+    hop: int = None,
+    num_outputs: int = None,
+    dtype=np.complex64
+) -> np.ndarray:
+    """
+    Run `estimate` on every block of `capture` and collect one row of DOAs per block.
+
+    Parameters:
+    - `capture`: Source recording.
+    - `estimate`: Callable mapping a (num_sample, num_antenna) block to a 1-D array of DOAs,
+      e.g. `RootMUSIC.estimate`.
+    - `num_sample`: Snapshots per block.
+    - `output_path`: When given, tracks are written to this `.npy` file through a memory map,
+      so memory stays bounded for arbitrarily long captures.
+    - `hop`: Samples between block starts, defaults to `num_sample`.
+    - `num_outputs`: DOAs per row. Inferred from the first block when omitted;
+      shorter estimates are padded with NaN and longer ones truncated.
+
+    Returns:
+    - (num_blocks, num_outputs) array where row `i` covers samples `[i * hop, i * hop + num_sample)`.
+    """
+    num_blocks = capture.num_blocks(num_sample, hop)
+    tracks = None
+    for i, (_, block) in enumerate(capture.blocks(num_sample, hop, dtype)):
+        doas = np.asarray(estimate(block), dtype=float).reshape(-1)
+        if tracks is None:
+            if num_outputs is None:
+                num_outputs = doas.shape[0]
+            shape = (num_blocks, num_outputs)
+            if output_path is None:
+                tracks = np.empty(shape)
+            else:
+                tracks = np.lib.format.open_memmap(output_path, mode='w+', dtype=float, shape=shape)
+        tracks[i] = np.nan
+        tracks[i, :min(num_outputs, doas.shape[0])] = doas[:num_outputs]
+
+    if tracks is None:
+        tracks = np.empty((0, num_outputs or 0))
+    if isinstance(tracks, np.memmap):
+        tracks.flush()
+    return tracks
@@ -0,0 +1,109 @@
+import numpy as np
+from scipy.linalg import get_blas_funcs
+
+
+def _hermitian_rank_k(x: np.ndarray) -> np.ndarray:
+    """
+    `x^T x^*` for snapshots stored row-wise. A single block goes through the
+    BLAS Hermitian rank-k update, which only computes one triangle.
+
+    input shape:
+        (..., num_sample, num_antenna)
+    output shape:
+        (..., num_antenna, num_antenna)
+    """
+    if x.ndim == 2 and np.iscomplexobj(x):
+        herk = get_blas_funcs('herk', (x,))
+        # x.T is Fortran-ordered, so BLAS reads it without a copy
+        upper = herk(1.0, x.T, trans=0)
+        return upper + np.triu(upper, 1).conj().T
+    return x.swapaxes(-1, -2) @ x.conj()
+
+
+class CovarianceAccumulator:
+    """
+    Chunk-by-chunk sample covariance, so long captures never have to be held in
+    memory at once.
+
+    Parameters:
+    - `num_antenna`: Number of array elements.
+    - `batch_shape`: Leading shape of the chunks for batched accumulation.
+    - `dtype`: Accumulation dtype; complex64 halves memory traffic.
+    - `centered`: Subtract the sample mean and normalize by `N - 1` like `np.cov`.
+      Baseband IQ is zero-mean, so the default is the plain `X^T X^* / N`.
+    """
+
+    def __init__(self, num_antenna: int, batch_shape: tuple = (), dtype=np.complex128, centered: bool = False):
+        self.num_antenna = num_antenna
+        self.batch_shape = tuple(batch_shape)
+        self.dtype = np.dtype(dtype)
+        self.centered = centered
+        self.reset()
+
+    def reset(self):
+        self._sum = np.zeros(self.batch_shape + (self.num_antenna, self.num_antenna), dtype=self.dtype)
+        self._mean_sum = np.zeros(self.batch_shape + (self.num_antenna,), dtype=self.dtype)
+        self.num_sample = 0
+
+    def update(self, chunk: np.ndarray):
+        """
+        input shape:
+            (*batch_shape, num_sample, num_antenna)
+        """
+        if chunk.shape[-1] != self.num_antenna:
+            raise ValueError(
+                f"Chunk should have {self.num_antenna} columns (antennas). "
+                f"Got shape {chunk.shape}"
+            )
+        chunk = chunk.astype(self.dtype, copy=False)
+        self._sum += _hermitian_rank_k(chunk)
+        if self.centered:
+            self._mean_sum += chunk.sum(axis=-2)
+        self.num_sample += chunk.shape[-2]
+
+    def covariance(self, out_dtype=None) -> np.ndarray:
+        """
+        output shape:
+            (*batch_shape, num_antenna, num_antenna)
+        """
+        if out_dtype is None:
+            out_dtype = self.dtype
+        R = self._sum.astype(out_dtype)
+        if not self.centered:
+            return R / self.num_sample
+        mean_sum = self._mean_sum.astype(out_dtype)
+        R -= mean_sum[..., :, np.newaxis] * mean_sum[..., np.newaxis, :].conj() / self.num_sample
+        return R / (self.num_sample - 1)
+
+
+def sample_covariance(
+    input_signal: np.ndarray,
+    chunk_size: int = None,
+    dtype=None,
+    out_dtype=None,
+    centered: bool = False
+) -> np.ndarray:
+    """
+    Sample covariance `X^T X^* / N` of snapshot blocks, oriented like
+    `np.cov(X, rowvar=False)` but without mean removal by default.
+
+    Parameters:
+    - `input_signal`: (..., num_sample, num_antenna) snapshots.
+    - `chunk_size`: Accumulate over blocks of this many snapshots instead of the whole input at once.
+    - `dtype`: Accumulation dtype, defaults to the input's complex dtype.
+    - `out_dtype`: Result dtype, e.g. complex128 after complex64 accumulation.
+    - `centered`: Subtract the mean and normalize by `N - 1`, matching `np.cov`.
+
+    Returns:
+    - (..., num_antenna, num_antenna) covariance.
+    """
+    if dtype is None:
+        dtype = np.result_type(input_signal.dtype, np.complex64)
+    num_sample = input_signal.shape[-2]
+    if chunk_size is None:
+        chunk_size = num_sample
+
+    accumulator = CovarianceAccumulator(input_signal.shape[-1], input_signal.shape[:-2], dtype, centered)
+    for start in range(0, num_sample, chunk_size):
+        accumulator.update(input_signal[..., start:start+chunk_size, :])
+    return accumulator.covariance(out_dtype)
@@ -0,0 +1,78 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+class ManifoldCache:
+    """
+    Process-wide LRU store for steering manifolds.
+
+    Entries are keyed by array geometry, angle grid, sub-array size, angle unit,
+    kind (steering or derivative) and dtype, and are evicted least-recently-used
+    first once the total size exceeds `max_bytes`. Cached arrays are read-only
+    because they are shared between every estimator using the same grid.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 2**20):
+        if max_bytes < 0:
+            raise ValueError("max_bytes must be non-negative.")
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._nbytes = 0
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def grid_key(angles: np.ndarray) -> tuple:
+        angles = np.ascontiguousarray(angles)
+        digest = hashlib.blake2b(angles.tobytes(), digest_size=16).hexdigest()
+        return angles.shape, angles.dtype.str, digest
+
+    @property
+    def nbytes(self) -> int:
+        return self._nbytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key) -> bool:
+        return key in self._entries
+
+    def get(self, key, factory) -> np.ndarray:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            self.misses += 1
+            value = factory()
+            value.setflags(write=False)
+            if value.nbytes <= self.max_bytes:
+                self._entries[key] = value
+                self._nbytes += value.nbytes
+                self._evict()
+            return value
+
+    def _evict(self):
+        while self._nbytes > self.max_bytes and self._entries:
+            _, value = self._entries.popitem(last=False)
+            self._nbytes -= value.nbytes
+
+    def resize(self, max_bytes: int):
+        with self._lock:
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+            self.hits = 0
+            self.misses = 0
+
+
+manifold_cache = ManifoldCache()
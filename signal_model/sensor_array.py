@@ -1,20 +1,28 @@
 import numpy as np
+from signal_model.manifold_cache import manifold_cache
+
+PRECISIONS = {'double': np.complex128, 'single': np.complex64}
 
 
 class UniformLinearSensorArray:
-    __slots__ = ['d', 'num_antenna', 'freq', '_lambda', '_is_degrees']
+    __slots__ = ['d', 'num_antenna', 'freq', '_lambda', '_is_degrees', 'precision', 'complex_dtype', 'real_dtype']
 
     def __init__(
         self,
         num_antenna: int,
         freq: int,
         element_spacing: float = 0.5,  # means lambda / 2
-        angle_type: str = 'rad'
+        angle_type: str = 'rad',
+        precision: str = 'double',
+        **kwargs
     ):
-        super().__init__()
+        super().__init__(**kwargs)
         if angle_type.lower() not in ['rad', 'deg']:
             raise ValueError(
                 f"Invalid angle_type '{angle_type}'. Supported types are 'deg' and 'rad'.")
+        if precision not in PRECISIONS:
+            raise ValueError(
+                f"Invalid precision '{precision}'. Supported are {tuple(PRECISIONS)}.")
         if freq <= 0:
             raise ValueError("Frequency must be positive.")
         if num_antenna <= 0:
@@ -23,6 +31,10 @@ class UniformLinearSensorArray:
             raise ValueError("Element spacing must be positive.")
 
         self._is_degrees = angle_type == 'deg'
+        # 'single' carries complex64 / float32 through manifolds, signals and spectra
+        self.precision = precision
+        self.complex_dtype = np.dtype(PRECISIONS[precision])
+        self.real_dtype = np.finfo(self.complex_dtype).dtype
         self.freq = freq
         self.num_antenna = num_antenna
         self._lambda = 3e8 / self.freq
@@ -59,21 +71,94 @@ class UniformLinearSensorArray:
         element_positions = element_indices * self.d * np.sin(angles_reshaped) / self._lambda
         return np.exp(-2j * np.pi * element_positions)
 
-    def steering_matrix_derivative(self, angles: np.ndarray) -> np.ndarray:
+    def steering_matrix_derivative(self, angles: np.ndarray, num_antenna: int = None, steering: np.ndarray = None) -> np.ndarray:
         """
         output shape:
             (num_antenna, num_angles)
         """
+        if num_antenna is None:
+            num_antenna = self.num_antenna
+        if steering is None:
+            steering = self.steering_matrix(angles, num_antenna)
         if self._is_degrees:
             angles = np.deg2rad(angles)
         num_angles = angles.shape[0]
 
         angles_reshaped = np.reshape(angles, (1, num_angles))
         cos_angles = np.cos(angles_reshaped)
-        n = np.arange(self.num_antenna)[:, np.newaxis]
-        st_v = np.exp(-2j * np.pi * n * self.d * np.sin(angles_reshaped) / self._lambda)
+        n = np.arange(num_antenna)[:, np.newaxis]
+
+        return -2j * np.pi * n * self.d * cos_angles * steering / self._lambda
+
+    def manifold(self, angles: np.ndarray, num_antenna: int = None, derivative: bool = False, dtype=None) -> np.ndarray:
+        """
+        Read-only steering matrix (or its derivative) shared through the process-wide
+        `manifold_cache`, so estimators over the same grid and geometry reuse one copy.
+        `dtype` defaults to the array's `complex_dtype`.
+
+        output shape:
+            (num_antenna, num_angles)
+        """
+        angles = np.asarray(angles, dtype=float)
+        if num_antenna is None:
+            num_antenna = self.num_antenna
+        dtype = self.complex_dtype if dtype is None else np.dtype(dtype)
+        key = (
+            'ula', self.d / self._lambda, num_antenna, self._is_degrees,
+            manifold_cache.grid_key(angles), 'derivative' if derivative else 'steering', dtype.str)
+
+        def factory():
+            # only a double-precision steering matrix is reused from the cache, so a
+            # single-precision manifold is cast from an uncached intermediate
+            if not derivative:
+                return self.steering_matrix(angles, num_antenna).astype(dtype, copy=False)
+            if dtype == np.complex128:
+                steering = self.manifold(angles, num_antenna, dtype=np.complex128)
+            else:
+                steering = self.steering_matrix(angles, num_antenna)
+            return self.steering_matrix_derivative(angles, num_antenna, steering).astype(dtype, copy=False)
+
+        return manifold_cache.get(key, factory)
+
+    def steering_matrix_at(self, angles: np.ndarray, freqs: np.ndarray, num_antenna: int = None) -> np.ndarray:
+        """
+        Steering matrices at the absolute frequencies `freqs` for the fixed
+        element spacing `d`, i.e. `exp(-2j pi m d sin(theta) f / c)`. At
+        `freq` this equals `steering_matrix`.
+
+        input shape:
+            angles: (..., num_angles), freqs: (num_freqs,)
+        output shape:
+            (..., num_freqs, num_antenna, num_angles)
+        """
+        angles = np.asarray(angles, dtype=float)
+        if self._is_degrees:
+            angles = np.deg2rad(angles)
+        if num_antenna is None:
+            num_antenna = self.num_antenna
 
-        return -2j * np.pi * n * self.d * cos_angles * st_v / self._lambda
+        freqs = np.asarray(freqs, dtype=float)[:, np.newaxis, np.newaxis]
+        element_indices = np.arange(num_antenna)[:, np.newaxis]
+        sines = np.sin(angles)[..., np.newaxis, np.newaxis, :]
+        return np.exp(-2j * np.pi * element_indices * self.d * sines * freqs / 3e8)
+
+    def wideband_manifold(self, angles: np.ndarray, freqs: np.ndarray, num_antenna: int = None, dtype=None) -> np.ndarray:
+        """
+        Read-only `steering_matrix_at` over a grid for every frequency bin,
+        shared through `manifold_cache` like `manifold`.
+
+        output shape:
+            (num_freqs, num_antenna, num_angles)
+        """
+        angles = np.asarray(angles, dtype=float)
+        freqs = np.asarray(freqs, dtype=float)
+        if num_antenna is None:
+            num_antenna = self.num_antenna
+        dtype = self.complex_dtype if dtype is None else np.dtype(dtype)
+        key = (
+            'ula_wideband', self.d, num_antenna, self._is_degrees,
+            manifold_cache.grid_key(angles), manifold_cache.grid_key(freqs), dtype.str)
+        return manifold_cache.get(key, lambda: self.steering_matrix_at(angles, freqs, num_antenna).astype(dtype))
 
     def doublet_phase_delays_matrix(self, angles: np.ndarray) -> np.ndarray:
         """
@@ -89,3 +174,117 @@ class UniformLinearSensorArray:
             phi[i, i] = np.exp(1j * np.sin(angle))
 
         return phi
+
+
+class UniformRectangularSensorArray:
+    """
+    Planar array of `num_antenna_el` rows of `num_antenna_az` elements in the
+    vertical plane, element `(p, q)` at height `p * d` and horizontal offset
+    `q * d`, stored row by row in `p * num_antenna_az + q` order.
+
+    A direction is an (azimuth, elevation) pair measured from broadside, with
+    elevation 0 in the horizontal plane. Its steering vector factors as
+    `a = a_el(el) kron a_az(az, el)` with
+        a_el[p] = exp(-2j pi p d sin(el) / lambda)
+        a_az[q] = exp(-2j pi q d cos(el) sin(az) / lambda)
+    so each row is a ULA at `sin(az) cos(el)`, and elevation 0 reduces to
+    `UniformLinearSensorArray`.
+    """
+    __slots__ = [
+        'd', 'num_antenna', 'num_antenna_az', 'num_antenna_el', 'freq', '_lambda', '_is_degrees',
+        'precision', 'complex_dtype', 'real_dtype']
+
+    def __init__(
+        self,
+        num_antenna_az: int,
+        num_antenna_el: int,
+        freq: int,
+        element_spacing: float = 0.5,  # means lambda / 2
+        angle_type: str = 'rad',
+        precision: str = 'double',
+        **kwargs
+    ):
+        super().__init__(**kwargs)
+        if angle_type.lower() not in ['rad', 'deg']:
+            raise ValueError(
+                f"Invalid angle_type '{angle_type}'. Supported types are 'deg' and 'rad'.")
+        if precision not in PRECISIONS:
+            raise ValueError(
+                f"Invalid precision '{precision}'. Supported are {tuple(PRECISIONS)}.")
+        if freq <= 0:
+            raise ValueError("Frequency must be positive.")
+        if num_antenna_az <= 0 or num_antenna_el <= 0:
+            raise ValueError("Number of antennas must be positive.")
+        if element_spacing <= 0:
+            raise ValueError("Element spacing must be positive.")
+
+        self._is_degrees = angle_type == 'deg'
+        self.precision = precision
+        self.complex_dtype = np.dtype(PRECISIONS[precision])
+        self.real_dtype = np.finfo(self.complex_dtype).dtype
+        self.freq = freq
+        self.num_antenna_az = num_antenna_az
+        self.num_antenna_el = num_antenna_el
+        self.num_antenna = num_antenna_az * num_antenna_el
+        self._lambda = 3e8 / self.freq
+        self.d = element_spacing * self._lambda
+
+    def _radians(self, angles: np.ndarray) -> np.ndarray:
+        angles = np.asarray(angles, dtype=float)
+        return np.deg2rad(angles) if self._is_degrees else angles
+
+    def elevation_steering(self, elevations: np.ndarray) -> np.ndarray:
+        """
+        output shape:
+            (num_antenna_el, num_elevations)
+        """
+        p = np.arange(self.num_antenna_el)[:, np.newaxis]
+        return np.exp(-2j * np.pi * p * self.d * np.sin(self._radians(elevations)) / self._lambda)
+
+    def azimuth_steering(self, azimuths: np.ndarray, elevations: np.ndarray) -> np.ndarray:
+        """
+        Row steering vectors for every pair of the broadcast `azimuths` and `elevations`.
+
+        output shape:
+            (*broadcast_shape, num_antenna_az)
+        """
+        sines = np.cos(self._radians(elevations)) * np.sin(self._radians(azimuths))
+        q = np.arange(self.num_antenna_az)
+        return np.exp(-2j * np.pi * sines[..., np.newaxis] * q * self.d / self._lambda)
+
+    def steering_matrix(self, azimuths: np.ndarray, elevations: np.ndarray) -> np.ndarray:
+        """
+        Joint steering vectors of the (azimuth, elevation) pairs, for a few
+        directions; spectra over a grid use `separable_manifold` instead.
+
+        output shape:
+            (num_antenna, num_angles)
+        """
+        elevations = np.asarray(elevations, dtype=float)
+        A_el = self.elevation_steering(elevations)
+        A_az = self.azimuth_steering(azimuths, elevations).T
+        return (A_el[:, np.newaxis, :] * A_az[np.newaxis, :, :]).reshape(self.num_antenna, -1)
+
+    def separable_manifold(self, azimuths: np.ndarray, elevations: np.ndarray, dtype=None) -> tuple:
+        """
+        Factors of the manifold over the `elevations x azimuths` grid, shared
+        through `manifold_cache`. Together they hold `num_antenna_el` (for
+        `A_el`) plus `num_antenna_az` (for `A_az`) numbers per grid point,
+        instead of `num_antenna` for the joint steering matrix.
+
+        output shape:
+            A_el: (num_antenna_el, num_elevations)
+            A_az: (num_elevations, num_antenna_az, num_azimuths)
+        """
+        azimuths = np.asarray(azimuths, dtype=float)
+        elevations = np.asarray(elevations, dtype=float)
+        dtype = self.complex_dtype if dtype is None else np.dtype(dtype)
+        geometry = (self.d / self._lambda, self._is_degrees, dtype.str)
+        elevation_key = manifold_cache.grid_key(elevations)
+        A_el = manifold_cache.get(
+            ('ura_el', self.num_antenna_el, elevation_key) + geometry,
+            lambda: self.elevation_steering(elevations).astype(dtype))
+        A_az = manifold_cache.get(
+            ('ura_az', self.num_antenna_az, manifold_cache.grid_key(azimuths), elevation_key) + geometry,
+            lambda: self.azimuth_steering(azimuths, elevations[:, np.newaxis]).swapaxes(-1, -2).astype(dtype))
+        return A_el, A_az
@@ -1,31 +1,71 @@
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 
+from signal_model.covariance import sample_covariance
 
-def fbss(input_signal, num_antenna, num_subarray):
+
+def _covariance(input_signal, is_covariance):
+    if is_covariance:
+        return np.asarray(input_signal)
+    return sample_covariance(input_signal)
+
+
+def _diagonal_block_sum(R, size):
+    """
+    Sum of the sub-array blocks `R[i:i+size, i:i+size]` over all shifts `i`,
+    read from a strided view without copying the blocks.
+
+    input shape:
+        (..., num_antenna, num_antenna)
+    output shape:
+        (..., size, size)
+    """
+    windows = sliding_window_view(R, (size, size), axis=(-2, -1))
+    return np.diagonal(windows, axis1=-4, axis2=-3).sum(axis=-1)
+
+
+def _all_block_sum(R, size):
+    """
+    Sum of `R[i:i+size, j:j+size]` over all pairs of shifts `(i, j)`, from a
+    summed-area table in O(num_antenna^2).
+
+    input shape:
+        (..., num_antenna, num_antenna)
+    output shape:
+        (..., size, size)
+    """
+    num_shift = R.shape[-1] - size + 1
+    table = np.zeros(R.shape[:-2] + (R.shape[-2] + 1, R.shape[-1] + 1), dtype=R.dtype)
+    table[..., 1:, 1:] = R.cumsum(axis=-2).cumsum(axis=-1)
+    return (table[..., num_shift:, num_shift:] - table[..., :size, num_shift:]
+            - table[..., num_shift:, :size] + table[..., :size, :size])
+
+
+def fbss(input_signal, num_antenna, num_subarray, is_covariance=False):
     """
     Compute the forward backward spatially smoothed (FBSS) covariance matrix of a signal.
 
     Parameters:
-    - `input_signal`: 2D array where each row represents a time series data from all antennas.
+    - `input_signal`: 2D array where each row represents a time series data from all antennas,
+      a batch of such arrays, or covariance matrices when `is_covariance` is set.
     - `num_antenna`: Total number of antennas.
     - `num_subarray`: Number of subarrays to consider for smoothing.
+    - `is_covariance`: Whether `input_signal` already holds (..., num_antenna, num_antenna) covariances.
 
     Returns:
-    - 2D array representing the spatially smoothed covariance matrix.
+    - Array of shape (..., p, p) representing the spatially smoothed covariance matrix,
+      where `p = num_antenna - num_subarray + 1`.
     """
     if num_subarray < 1 or num_subarray > num_antenna:
         raise ValueError(f'The number of subarrays must be within [1, {num_antenna}].')
 
-    R = np.cov(input_signal, rowvar=False)
-    Rf = R[:num_antenna-num_subarray+1, :num_antenna-num_subarray+1].copy()
-    for i in range(1, num_subarray):
-        Rf += R[i:i+num_antenna-num_subarray+1, i:i+num_antenna-num_subarray+1]
-    Rf /= num_subarray
+    R = _covariance(input_signal, is_covariance)
+    Rf = _diagonal_block_sum(R, num_antenna-num_subarray+1) / num_subarray
 
-    return 0.5 * (Rf + np.flip(Rf).conj())
+    return 0.5 * (Rf + np.flip(Rf, axis=(-2, -1)).conj())
 
 
-def improved_spatial_smoothed_covariance(input_signal, num_antenna, num_subarray):
+def improved_spatial_smoothed_covariance(input_signal, num_antenna, num_subarray, is_covariance=False):
     """
     Compute the improved spatially smoothed covariance matrix for a given input signal.
     Based on paper `DOA-Estimation Method Based on Improved Spatial-Smoothing Technique`
@@ -34,7 +74,8 @@ def improved_spatial_smoothed_covariance(input_signal, num_antenna, num_subarray
     Parameters:
     - `input_signal` : numpy.ndarray
     The input signal with dimensions (num_samples, num_antennas), where `num_samples` is the number of time samples
-    and `num_antennas` is the total number of antennas in the array.
+    and `num_antennas` is the total number of antennas in the array. A batch (..., num_samples, num_antennas)
+    is also accepted, as are covariance matrices when `is_covariance` is set.
 
     - `num_antenna` : int
         The total number of antennas in the array.
@@ -42,21 +83,23 @@ def improved_spatial_smoothed_covariance(input_signal, num_antenna, num_subarray
     - `num_subarray` : int
         The number of subarrays used for smoothing. It should be less than or equal to `num_antennas`.
 
+    - `is_covariance` : bool
+        Whether `input_signal` already holds (..., num_antenna, num_antenna) covariances.
+
     Returns:
     - `R1` : numpy.ndarray
-        The improved spatially smoothed covariance matrix with dimensions (p, p), where `p = num_antenna - num_subarray + 1`.
+        The improved spatially smoothed covariance matrix with dimensions (..., p, p), where `p = num_antenna - num_subarray + 1`.
     """
 
     p = num_antenna-num_subarray+1
-    R = np.cov(input_signal, rowvar=False)
-    Rf_ii = Rf_jj = Rf_ij = Rf_ji = 0
-    for i in range(num_subarray):
-        for j in range(num_subarray):
-            Rf_ii += R[i:i+p, i:i+p]
-            Rf_jj += R[j:j+p, j:j+p]
-            Rf_ij += R[i:i+p, j:j+p]
-            Rf_ji += R[j:j+p, i:i+p]
-
-    R1 = (Rf_ii @ np.flip(Rf_ii)) + (Rf_jj @ np.flip(Rf_jj))
-    R1 += (Rf_ij @ np.flip(Rf_ij)) + (Rf_ji @ np.flip(Rf_ji))
+    R = _covariance(input_signal, is_covariance)
+
+    # Summed over both subarray indices, the ii and jj terms are each num_subarray
+    # copies of the diagonal-block sum, and the ij and ji terms are both the sum
+    # over every pair of blocks.
+    Rf_ii = num_subarray * _diagonal_block_sum(R, p)
+    Rf_ij = _all_block_sum(R, p)
+
+    R1 = 2 * (Rf_ii @ np.flip(Rf_ii, axis=(-2, -1)))
+    R1 += 2 * (Rf_ij @ np.flip(Rf_ij, axis=(-2, -1)))
     return R1 / 2*num_subarray
@@ -1,7 +1,7 @@
 import numpy as np
 
 
-def generate_random_angles(num_targets, all_angles_range, min_separation) -> np.ndarray:
+def generate_random_angles(num_targets, all_angles_range, min_separation, rng: np.random.Generator = None) -> np.ndarray:
     angles = np.empty(num_targets)
     available_mask = np.ones(len(all_angles_range), dtype=bool)
     available_indices = np.arange(len(all_angles_range))
@@ -12,7 +12,10 @@ def generate_random_angles(num_targets, all_angles_range, min_separation) -> np.
         if len(valid_indices) == 0:
             return angles[:i]
 
-        chosen_idx = np.random.choice(valid_indices)
+        if rng is None:
+            chosen_idx = np.random.choice(valid_indices)
+        else:
+            chosen_idx = rng.choice(valid_indices)
         selected_angle = all_angles_range[chosen_idx]
         angles[i] = selected_angle
 
@@ -20,3 +23,42 @@ def generate_random_angles(num_targets, all_angles_range, min_separation) -> np.
         available_mask &= (angle_diffs >= min_separation)
 
     return angles
+
+
+def generate_random_angles_batch(
+    batch: int,
+    num_targets: int,
+    all_angles_range: np.ndarray,
+    min_separation: float,
+    rng: np.random.Generator,
+    max_rounds: int = 1000
+) -> np.ndarray:
+    """
+    `batch` sorted angle sets drawn from `all_angles_range` with every pair at
+    least `min_separation` apart. All sets are drawn at once and the rows that
+    violate the separation are redrawn, so every valid set is equally likely.
+
+    output shape:
+        (batch, num_targets)
+    """
+    all_angles_range = np.asarray(all_angles_range)
+    if num_targets > 1 and (num_targets - 1) * min_separation > np.ptp(all_angles_range):
+        raise ValueError(
+            f"{num_targets} targets {min_separation} apart do not fit in the angle range.")
+
+    angles = np.empty((batch, num_targets), dtype=all_angles_range.dtype)
+    pending = np.arange(batch)
+    for _ in range(max_rounds):
+        if len(pending) == 0:
+            break
+        indices = rng.integers(len(all_angles_range), size=(len(pending), num_targets))
+        candidates = np.sort(all_angles_range[indices], axis=-1)
+        accepted = np.all(np.diff(candidates, axis=-1) >= min_separation, axis=-1)
+        angles[pending[accepted]] = candidates[accepted]
+        pending = pending[~accepted]
+
+    if len(pending) > 0:
+        raise ValueError(
+            f"No valid angle set found for {len(pending)} of {batch} rows after {max_rounds} rounds, "
+            f"consider a smaller min_separation.")
+    return angles
@@ -0,0 +1,141 @@
+import numpy as np
+from scipy.signal import get_window
+
+from signal_model.antenna_response import RandomGenarator
+from signal_model.sensor_array import UniformLinearSensorArray
+
+
+def bin_frequencies(nfft: int, sampling_rate: float, center_freq: float = 0.0) -> np.ndarray:
+    """
+    Frequencies of the `nfft` STFT bins of baseband samples around `center_freq`, in FFT order.
+
+    output shape:
+        (nfft,)
+    """
+    return center_freq + np.fft.fftfreq(nfft, 1 / sampling_rate)
+
+
+def stft_snapshots(input_signal: np.ndarray, nfft: int, hop: int = None, window: str = 'hann') -> np.ndarray:
+    """
+    Channelize array samples with a short-time Fourier transform. Every bin
+    holds one narrowband snapshot per frame, so per-bin covariances of the
+    result are a single batched `sample_covariance` call.
+
+    input shape:
+        (..., num_sample, num_antenna)
+    output shape:
+        (..., nfft, num_frames, num_antenna), bins in FFT order
+    """
+    if hop is None:
+        hop = nfft
+    num_sample = input_signal.shape[-2]
+    if num_sample < nfft:
+        raise ValueError(f"At least {nfft} samples are needed, got {num_sample}.")
+
+    # (..., num_frames, num_antenna, nfft) views into the samples
+    frames = np.lib.stride_tricks.sliding_window_view(input_signal, nfft, axis=-2)[..., ::hop, :, :]
+    taper = get_window(window, nfft).astype(input_signal.real.dtype)
+    spectra = np.fft.fft(frames * taper, axis=-1)
+    return np.moveaxis(spectra, -1, -3)
+
+
+class WidebandFarField1DSource(UniformLinearSensorArray, RandomGenarator):
+    """
+    Far-field sources with a flat spectrum over `bandwidth` around the carrier
+    `freq`, received as complex baseband at `sampling_rate`. Each frequency
+    component reaches element `m` with the true delay `m d sin(theta) / c`, so
+    the array response changes across the band instead of being the single
+    steering vector of `FarField1DSource`. The element spacing is fixed at the
+    carrier.
+
+    Parameters:
+    - `num_sample`: Baseband samples per block.
+    - `num_target`: Number of sources.
+    - `coherent`: Scaled copies of one waveform instead of independent ones.
+    - `num_antenna`, `freq`: Array size and carrier frequency.
+    - `sampling_rate`: Complex baseband sampling rate.
+    - `bandwidth`: Occupied bandwidth, at most `sampling_rate`.
+    """
+    __slots__ = ['num_sample', 'num_target', 'coherent', 'sampling_rate', 'bandwidth']
+
+    def __init__(
+        self,
+        num_sample: int,
+        num_target: int,
+        coherent: bool,
+        num_antenna: int,
+        freq: float,
+        sampling_rate: float,
+        bandwidth: float,
+        element_spacing: float = 0.5,  # means lambda / 2 at freq
+        angle_type: str = 'rad',
+        **kwargs
+    ):
+        super().__init__(num_antenna, freq, element_spacing, angle_type, **kwargs)
+        if num_sample <= 0:
+            raise ValueError("Number of samples must be positive.")
+        if num_target <= 0:
+            raise ValueError("Number of targets must be positive.")
+        if not 0 < bandwidth <= sampling_rate:
+            raise ValueError("Bandwidth must be positive and at most the sampling rate.")
+
+        self.num_sample = num_sample
+        self.num_target = num_target
+        self.coherent = coherent
+        self.sampling_rate = sampling_rate
+        self.bandwidth = bandwidth
+
+    def _emitted_spectra(self, batch_shape: tuple = ()) -> np.ndarray:
+        """
+        Source spectra on the `num_sample`-point FFT grid, zero outside the band.
+
+        output shape:
+            (*batch_shape, num_target, num_sample)
+        """
+        in_band = np.abs(np.fft.fftfreq(self.num_sample, 1 / self.sampling_rate)) <= self.bandwidth / 2
+        num_waveforms = 1 if self.coherent else self.num_target
+        shape = batch_shape + (num_waveforms, self.num_sample)
+        S = (self.rng.standard_normal(shape) + 1j * self.rng.standard_normal(shape)) * in_band
+        if self.coherent:
+            S = S * self.rng.uniform(0.5, 1.5, batch_shape + (self.num_target, 1))
+        return S
+
+    def collect_plane_wave_response(self, angles: np.ndarray, snr: int) -> np.ndarray:
+        """
+        output shape:
+            (num_sample, num_antenna)
+        """
+        if angles.shape[0] != self.num_target:
+            raise ValueError("Number of angles must match the number of targets.")
+        return self.collect_plane_wave_response_batch(np.asarray(angles)[np.newaxis], snr)[0]
+
+    def collect_plane_wave_response_batch(self, angles: np.ndarray, snr, dtype=None) -> np.ndarray:
+        """
+        One trial per row of `angles`, each with its own SNR. Sources are
+        delayed per element in the frequency domain, so delays are circular
+        within a block.
+
+        input shape:
+            angles: (batch, num_target)
+            snr: scalar or (batch,)
+        output shape:
+            (batch, num_sample, num_antenna)
+        """
+        angles = np.asarray(angles)
+        if angles.ndim != 2 or angles.shape[1] != self.num_target:
+            raise ValueError("Angles must have shape (batch, num_target).")
+        dtype = self.complex_dtype if dtype is None else np.dtype(dtype)
+        batch = angles.shape[0]
+
+        S = self._emitted_spectra((batch,))
+        freqs = bin_frequencies(self.num_sample, self.sampling_rate, self.freq)
+        # (batch, num_sample, num_antenna, num_target) response of every FFT bin
+        A = self.steering_matrix_at(angles, freqs)
+        X = np.fft.ifft(np.einsum('bfmk,bkf->bfm', A, S), axis=-2)
+
+        sig_p = np.mean(X.real**2 + X.imag**2, axis=(-2, -1))
+        X *= np.sqrt(10 ** (np.asarray(snr) * 0.1) / sig_p)[:, np.newaxis, np.newaxis]
+
+        noise = self.rng.standard_normal((batch, self.num_sample, self.num_antenna, 2), dtype=self.real_dtype)
+        noise *= 1 / np.sqrt(2)
+        return X.astype(dtype) + noise.view(self.complex_dtype)[..., 0].astype(dtype, copy=False)
@@ -0,0 +1,29 @@
+import numpy as np
+
+from doa_algorithms import Capon
+from signal_model import FarField1DSource
+
+ALL_DOAS = np.linspace(-np.pi/2, np.pi/2, 181)
+
+
+def _per_angle_spectrum(capon, R, diagonal_loading=0.0):
+    R = R + diagonal_loading * np.trace(R).real / R.shape[0] * np.eye(R.shape[0])
+    R_inv = np.linalg.inv(R)
+    spectrum = []
+    for theta in ALL_DOAS:
+        a = capon.steering_matrix(np.array([theta]))[:, 0]
+        spectrum.append(1 / np.real(a.conj() @ R_inv @ a))
+    return np.array(spectrum)
+
+
+def test_closed_form_matches_per_angle_loop():
+    source = FarField1DSource(128, 2, False, 8, 1e9, True, seed=0)
+    signals = source.collect_plane_wave_response_batch(np.array([[-0.4, 0.3], [0.0, 0.9]]), 10)
+    capon = Capon(ALL_DOAS, 128, 2, False, 8, 1e9, True, precision='double')
+
+    spectra = capon.estimate_batch(signals)
+    loaded = capon.estimate_batch(signals, diagonal_loading=0.1)
+    for b, x in enumerate(signals):
+        R = x.T @ x.conj() / x.shape[0]
+        np.testing.assert_allclose(spectra[b], _per_angle_spectrum(capon, R), rtol=1e-8)
+        np.testing.assert_allclose(loaded[b], _per_angle_spectrum(capon, R, 0.1), rtol=1e-8)
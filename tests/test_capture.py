@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from signal_model import IQCapture, process_capture, save_capture
+
+
+def _signal(num_sample=100, num_antenna=4):
+    rng = np.random.default_rng(0)
+    return 0.5 * (rng.uniform(-1, 1, (num_sample, num_antenna)) + 1j * rng.uniform(-1, 1, (num_sample, num_antenna)))
+
+
+@pytest.mark.parametrize('layout', ['sample_major', 'antenna_major'])
+@pytest.mark.parametrize('sample_format, atol', [('complex64', 1e-7), ('int16', 1 / 32768)])
+def test_round_trips_save_capture(tmp_path, layout, sample_format, atol):
+    signal = _signal()
+    path = tmp_path / 'capture.bin'
+    save_capture(path, signal, sample_format, layout)
+
+    capture = IQCapture(path, 4, sample_format, layout)
+    assert len(capture) == 100
+    np.testing.assert_allclose(capture.block(0, 100), signal, atol=atol)
+    np.testing.assert_allclose(capture.block(30, 20, dtype=np.complex128), signal[30:50], atol=atol)
+
+    starts = [start for start, _ in capture.blocks(32, hop=16)]
+    assert starts == [0, 16, 32, 48, 64]
+
+
+def test_process_capture_writes_one_row_per_block(tmp_path):
+    signal = _signal()
+    path = tmp_path / 'capture.bin'
+    save_capture(path, signal)
+
+    tracks = process_capture(
+        IQCapture(path, 4), lambda block: block[:, 0].real.mean(keepdims=True), 25,
+        output_path=tmp_path / 'tracks.npy')
+    expected = signal[:, 0].real.reshape(4, 25).mean(axis=-1, keepdims=True)
+    np.testing.assert_allclose(tracks, expected, atol=1e-6)
+    np.testing.assert_allclose(np.load(tmp_path / 'tracks.npy'), tracks)
+
+
+def test_rejects_partial_samples(tmp_path):
+    path = tmp_path / 'capture.bin'
+    save_capture(path, _signal(10, 3))
+    with pytest.raises(ValueError):
+        IQCapture(path, 4)
@@ -0,0 +1,37 @@
+import numpy as np
+
+from doa_algorithms import Capon, Esprit, FrameContext, Music, RootMUSIC, StageProfiler
+from signal_model import FarField1DSource
+
+ALL_DOAS = np.linspace(-np.pi/2, np.pi/2, 361)
+ARGS = (256, 2, False, 8, 1e9, True)
+
+
+def _estimators():
+    return (
+        lambda x: Music(ALL_DOAS, None, 8, 1e9).estimate_batch(x, 2),
+        lambda x: Capon(ALL_DOAS, *ARGS).estimate_batch(x),
+        lambda x: RootMUSIC(*ARGS).estimate_batch(x),
+        lambda x: Esprit(*ARGS).estimate_from_snapshots(x),
+    )
+
+
+def test_shared_context_matches_snapshots_and_decomposes_once():
+    signals = FarField1DSource(*ARGS, seed=0).collect_plane_wave_response_batch(np.array([[-0.4, 0.3], [0.1, 0.6]]), 10)
+    ctx = FrameContext(signals, dtype=np.complex64)
+
+    with StageProfiler() as profiler:
+        from_context = [estimate(ctx) for estimate in _estimators()]
+    stats = profiler.to_dict()
+    assert stats['covariance']['calls'] == 1
+    assert stats['decomposition']['calls'] == 1
+
+    for shared, own in zip(from_context, (estimate(signals) for estimate in _estimators())):
+        np.testing.assert_allclose(shared, own, rtol=1e-4, atol=1e-5)
+
+
+def test_source_count_from_snapshots_and_covariance():
+    signals = FarField1DSource(*ARGS, seed=0).collect_plane_wave_response_batch(np.array([[-0.4, 0.3], [0.1, 0.6]]), 10)
+    ctx = FrameContext(signals)
+    np.testing.assert_array_equal(ctx.mdl(), [2, 2])
+    np.testing.assert_array_equal(FrameContext(covariance=ctx.covariance, num_sample=256).aic(), ctx.aic())
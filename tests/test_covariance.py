@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from signal_model.covariance import CovarianceAccumulator, sample_covariance
+
+
+def _snapshots(shape, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.standard_normal(shape) + 1j * rng.standard_normal(shape) + (0.3 - 0.2j)
+
+
+@pytest.mark.parametrize('chunk_size', [None, 7, 64])
+def test_centered_matches_np_cov(chunk_size):
+    x = _snapshots((3, 100, 6))
+    R = sample_covariance(x, chunk_size=chunk_size, centered=True)
+    for b in range(3):
+        np.testing.assert_allclose(R[b], np.cov(x[b], rowvar=False), atol=1e-12)
+
+
+@pytest.mark.parametrize('chunk_size', [None, 7])
+def test_uncentered_matches_outer_product(chunk_size):
+    x = _snapshots((100, 6))
+    np.testing.assert_allclose(sample_covariance(x, chunk_size=chunk_size), x.T @ x.conj() / 100, atol=1e-12)
+
+
+def test_single_precision_accumulation():
+    x = _snapshots((2, 1000, 6))
+    R = sample_covariance(x.astype(np.complex64), chunk_size=128, out_dtype=np.complex128)
+    assert R.dtype == np.complex128
+    np.testing.assert_allclose(R, sample_covariance(x), rtol=1e-5, atol=1e-5)
+
+
+def test_accumulator_rejects_wrong_antenna_count():
+    with pytest.raises(ValueError):
+        CovarianceAccumulator(6).update(np.zeros((10, 5), dtype=complex))
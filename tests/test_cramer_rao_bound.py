@@ -0,0 +1,97 @@
+import warnings
+
+import numpy as np
+import pytest
+
+from doa_algorithms import CramerRaoBound
+
+
+def _manifold(crb, doas):
+    A = crb.steering_matrix(doas)
+    return A, crb.steering_matrix_derivative(doas, steering=A)
+
+
+def _stochastic_reference(crb, doas, snr, num_samples):
+    """
+    Angle block of the inverse of the full Gaussian FIM `N tr(R^-1 dR_i R^-1 dR_j)`
+    over the angles, every real parameter of a Hermitian source covariance and the
+    noise power.
+    """
+    A, D = _manifold(crb, doas)
+    num_doas = len(doas)
+    p = 10**(snr / 10)
+    R = p * A @ A.conj().T + np.eye(A.shape[0])
+    derivatives = [p * (np.outer(D[:, k], A[:, k].conj()) + np.outer(A[:, k], D[:, k].conj())) for k in range(num_doas)]
+    for k in range(num_doas):
+        derivatives.append(np.outer(A[:, k], A[:, k].conj()))
+        for l in range(k + 1, num_doas):
+            cross = np.outer(A[:, k], A[:, l].conj())
+            derivatives += [cross + cross.conj().T, 1j * (cross - cross.conj().T)]
+    derivatives.append(np.eye(A.shape[0]))
+
+    R_inv = np.linalg.inv(R)
+    weighted = [R_inv @ dR for dR in derivatives]
+    FIM = num_samples * np.real([[np.trace(Wi @ Wj) for Wj in weighted] for Wi in weighted])
+    return np.diag(np.linalg.inv(FIM))[:num_doas]
+
+
+def _deterministic_reference(crb, doas, snr, num_samples):
+    """
+    Angle block of the inverse FIM `2 Re(J^H J)` of the stacked snapshot mean
+    `A s(t)` over the angles and every waveform sample, for waveforms whose
+    sample covariance is exactly `p I`.
+    """
+    A, D = _manifold(crb, doas)
+    num_antenna, num_doas = A.shape
+    p = 10**(snr / 10)
+    t = np.arange(num_samples)
+    S = np.sqrt(p) * np.exp(2j * np.pi * np.outer(np.arange(num_doas), t) / num_samples)
+
+    columns = [(D[:, [k]] * S[k]).T.reshape(-1) for k in range(num_doas)]
+    for k in range(num_doas):
+        for n in range(num_samples):
+            column = np.zeros((num_samples, num_antenna), dtype=complex)
+            column[n] = A[:, k]
+            columns += [column.reshape(-1), 1j * column.reshape(-1)]
+    J = np.stack(columns, axis=1)
+    FIM = 2 * np.real(J.conj().T @ J)
+    return np.diag(np.linalg.inv(FIM))[:num_doas]
+
+
+@pytest.mark.parametrize('doas', [[0.2], [-0.5, 0.4], [0.1, 0.15], [-0.9, 0.0, 0.6]])
+@pytest.mark.parametrize('snr', [-10.0, 0.0, 20.0])
+def test_stochastic_matches_dense_fim(doas, snr):
+    crb = CramerRaoBound(200, 8, 1e9)
+    doas = np.array(doas)
+    np.testing.assert_allclose(
+        crb.crb_surface(doas, snr), _stochastic_reference(crb, doas, snr, 200), rtol=1e-6)
+
+
+@pytest.mark.parametrize('doas', [[0.2], [-0.5, 0.4], [0.1, 0.15], [-0.9, 0.0, 0.6]])
+@pytest.mark.parametrize('snr', [-10.0, 0.0, 20.0])
+def test_deterministic_matches_dense_fim(doas, snr):
+    crb = CramerRaoBound(12, 8, 1e9)
+    doas = np.array(doas)
+    np.testing.assert_allclose(
+        crb.crb_surface(doas, snr, model='deterministic'), _deterministic_reference(crb, doas, snr, 12), rtol=1e-6)
+
+
+def test_surface_matches_single_configurations():
+    crb = CramerRaoBound(100, 8, 1e9, angle_type='deg')
+    doas = np.array([[0.0, 5.0], [10.0, 12.0], [-30.0, 20.0]])
+    snrs = np.array([-10.0, 0.0, 20.0])
+    surface = crb.crb_surface(doas, snrs)
+    assert surface.shape == (3, 3, 2)
+    for i, snr in enumerate(snrs):
+        for j, angles in enumerate(doas):
+            np.testing.assert_allclose(surface[i, j], CramerRaoBound(100, 8, 1e9, angle_type='deg').crb_stochastic(angles, snr))
+
+
+def test_singular_configurations_warn_once():
+    crb = CramerRaoBound(100, 8, 1e9)
+    doas = np.array([[0.1, 0.1], [0.2, 0.2], [-0.3, 0.4]])
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        surface = crb.crb_surface(doas, 10.0)
+    assert len(caught) == 1 and issubclass(caught[0].category, RuntimeWarning)
+    assert np.all(np.isinf(surface[:2])) and np.all(np.isfinite(surface[2]))
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from doa_algorithms import FrameContext, Music, RootMUSIC
+from signal_model import FarField1DSource
+
+ALL_DOAS = np.linspace(-np.pi/2, np.pi/2, 721)
+
+
+def _signals(num_antenna=64):
+    source = FarField1DSource(512, 3, False, num_antenna, 1e9, True, seed=0, precision='double')
+    return source.collect_plane_wave_response_batch(np.array([[-0.5, 0.1, 0.4], [-0.2, 0.3, 0.9]]), 5)
+
+
+@pytest.mark.parametrize('eigensolver', ['lanczos', 'randomized'])
+def test_partial_subspace_matches_eigh(eigensolver):
+    signals = _signals()
+    Es = FrameContext(signals).dominant_subspace(3, eigensolver)
+    reference = FrameContext(signals).signal_subspace(3)
+    assert Es.shape == reference.shape
+
+    np.testing.assert_allclose(Es.conj().swapaxes(-1, -2) @ Es, np.broadcast_to(np.eye(3), (2, 3, 3)), atol=1e-8)
+    np.testing.assert_allclose(
+        Es @ Es.conj().swapaxes(-1, -2), reference @ reference.conj().swapaxes(-1, -2), atol=1e-6)
+
+
+@pytest.mark.parametrize('eigensolver', ['lanczos', 'randomized'])
+def test_estimators_match_full_eigensolver(eigensolver):
+    signals = _signals()
+    full = Music(ALL_DOAS, None, 64, 1e9, precision='double').estimate_batch(signals, 3)
+    partial = Music(ALL_DOAS, None, 64, 1e9, eigensolver=eigensolver, precision='double').estimate_batch(signals, 3)
+    np.testing.assert_allclose(partial, full, rtol=1e-3)
+
+    args = (512, 3, False, 64, 1e9, True)
+    np.testing.assert_allclose(
+        np.sort(RootMUSIC(*args, eigensolver=eigensolver, precision='double').estimate_batch(signals), axis=-1),
+        np.sort(RootMUSIC(*args, precision='double').estimate_batch(signals), axis=-1), atol=1e-6)
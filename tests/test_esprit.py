@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+from doa_algorithms import Esprit
+from signal_model import FarField1DSource
+
+
+@pytest.mark.parametrize('formulation', ['ls', 'tls'])
+@pytest.mark.parametrize('angles', [[-0.4, 0.3], [-0.45, 0.05, 0.4]])
+def test_multiple_sources_are_resolved(formulation, angles):
+    angles = np.array(angles)
+    args = (512, len(angles), False, 10, 1e9, True)
+    source = FarField1DSource(*args, seed=0)
+    esprit = Esprit(*args)
+    signals = source.collect_plane_wave_response_batch(np.tile(angles, (3, 1)), 20)
+
+    batch = np.sort(esprit.estimate_from_snapshots(signals, formulation=formulation), axis=-1)
+    np.testing.assert_allclose(batch, np.tile(angles, (3, 1)), atol=0.01)
+
+    # a two-element displacement is unambiguous only for |sin(theta)| < 1/2
+    single = np.sort(esprit.estimate_from_snapshots(signals[0], displacement_vector=2, formulation=formulation))
+    np.testing.assert_allclose(single, angles, atol=0.01)
+
+
+def test_rotational_operator_solves_shift_invariance():
+    # the elementwise divisions used before only hold for a single source
+    esprit = Esprit(64, 2, False, 8, 1e9, True)
+    Es = np.linalg.qr(esprit.steering_matrix(np.array([-0.4, 0.3])))[0]
+    for formulation in ('ls', 'tls'):
+        Phi = esprit._rotational_operator(Es, 1, formulation)
+        np.testing.assert_allclose(Es[:-1] @ Phi, Es[1:], atol=1e-10)
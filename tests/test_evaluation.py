@@ -0,0 +1,34 @@
+import numpy as np
+
+from doa_algorithms import RootMUSIC
+from doa_algorithms.evaluation import MonteCarloEvaluator
+
+
+def _evaluator(algorithms, max_workers=1):
+    all_doas = np.linspace(-np.pi / 3, np.pi / 3, 256)
+    return MonteCarloEvaluator(
+        8, 2, 1e9, all_doas, 0.2, is_baseband=True, algorithms=algorithms, seed=0, max_workers=max_workers)
+
+
+def test_count_mismatches_are_reported_as_failures(monkeypatch):
+    estimate = RootMUSIC.estimate
+
+    def flaky_estimate(self, *args, **kwargs):
+        # drop one target from every other call
+        flaky_estimate.calls += 1
+        doas = estimate(self, *args, **kwargs)
+        return doas[:-1] if flaky_estimate.calls % 2 else doas
+    flaky_estimate.calls = 0
+    monkeypatch.setattr(RootMUSIC, 'estimate', flaky_estimate)
+
+    result = _evaluator(('root_music', 'esprit')).sweep_snr([20.0], 128, 10)
+    np.testing.assert_array_equal(result['num_failures']['root_music'], [5])
+    np.testing.assert_array_equal(result['num_failures']['esprit'], [0])
+    assert np.all(np.isfinite(result['rmse']['esprit']))
+    assert np.all(result['rmse']['root_music'] < 0.05)
+
+
+def test_sweep_is_independent_of_worker_count():
+    serial = _evaluator(('root_music',)).sweep_snr([10.0], 64, 4)
+    parallel = _evaluator(('root_music',), max_workers=2).sweep_snr([10.0], 64, 4)
+    np.testing.assert_allclose(serial['rmse']['root_music'], parallel['rmse']['root_music'])
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from doa_algorithms import Bartlett, Capon, Music
+from doa_algorithms.utils import fft_quadratic_form, fft_subspace_power
+from signal_model import FarField1DSource
+
+ALL_DOAS = np.linspace(-80, 80, 641)
+
+
+def _signals():
+    source = FarField1DSource(256, 2, False, 12, 1e9, True, angle_type='deg', seed=0, precision='double')
+    return source.collect_plane_wave_response_batch(np.array([[-20.0, 15.0], [5.0, 40.0]]), 10)
+
+
+def test_quadratic_form_matches_direct_evaluation():
+    rng = np.random.default_rng(0)
+    X = rng.standard_normal((3, 12, 12)) + 1j * rng.standard_normal((3, 12, 12))
+    Q = X @ X.conj().swapaxes(-1, -2)
+    theta = np.deg2rad(ALL_DOAS)
+    A = np.exp(-2j * np.pi * 0.5 * np.outer(np.arange(12), np.sin(theta)))
+    direct = np.real(np.sum(A.conj() * (Q @ A), axis=-2))
+
+    np.testing.assert_allclose(fft_quadratic_form(Q, ALL_DOAS, 0.5, is_degrees=True), direct, rtol=1e-6)
+    Es = np.linalg.eigh(Q)[1][..., -3:]
+    np.testing.assert_allclose(
+        fft_subspace_power(Es, ALL_DOAS, 0.5, is_degrees=True),
+        np.sum(np.abs(Es.conj().swapaxes(-1, -2) @ A)**2, axis=-2), rtol=1e-6, atol=1e-9)
+
+
+@pytest.mark.parametrize('estimator', ['music', 'capon', 'bartlett'])
+def test_fft_backend_matches_matrix_backend(estimator):
+    signals = _signals()
+    spectra = {}
+    for backend in ('matrix', 'fft'):
+        kwargs = dict(angle_type='deg', backend=backend, precision='double')
+        if estimator == 'music':
+            spectra[backend] = Music(ALL_DOAS, None, 12, 1e9, **kwargs).estimate_batch(signals, 2)
+        elif estimator == 'capon':
+            spectra[backend] = Capon(ALL_DOAS, 256, 2, False, 12, 1e9, True, **kwargs).estimate_batch(signals)
+        else:
+            spectra[backend] = Bartlett(ALL_DOAS, 12, 1e9, **kwargs).estimate(signals)
+    np.testing.assert_allclose(spectra['fft'], spectra['matrix'], rtol=1e-4)
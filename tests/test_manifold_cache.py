@@ -0,0 +1,20 @@
+import numpy as np
+
+from signal_model import manifold_cache
+from signal_model.sensor_array import UniformLinearSensorArray
+
+
+def test_single_precision_manifold_caches_one_copy():
+    array = UniformLinearSensorArray(8, 1e9)
+    angles = np.linspace(-1, 1, 123)
+    manifold_cache.clear()
+
+    A = array.manifold(angles, dtype=np.complex64)
+    dA = array.manifold(angles, derivative=True, dtype=np.complex64)
+    assert A.dtype == dA.dtype == np.complex64
+    assert len(manifold_cache) == 2
+    assert manifold_cache.nbytes == A.nbytes + dA.nbytes
+
+    np.testing.assert_allclose(A, array.manifold(angles, dtype=np.complex128), rtol=1e-6)
+    np.testing.assert_allclose(dA, array.manifold(angles, derivative=True, dtype=np.complex128), rtol=1e-5)
+    manifold_cache.clear()
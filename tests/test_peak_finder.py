@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from doa_algorithms import SpectrumPeakFinder
+
+
+def _spectra(centers, heights, num_doas=512, width=6.0):
+    grid = np.arange(num_doas)
+    return np.sum(
+        heights[..., np.newaxis] / (1 + ((grid - centers[..., np.newaxis]) / width)**2), axis=-2)
+
+
+@pytest.mark.parametrize('filter_type', ['butterworth', 'gaussian', 'none'])
+def test_batch_matches_per_spectrum_loop(filter_type):
+    rng = np.random.default_rng(0)
+    centers = np.array([100.0, 250.0, 400.0]) + rng.uniform(-40, 40, (32, 3))
+    spectra = _spectra(centers, rng.uniform(1, 3, (32, 3)), width=3.0)
+    peak_finder = SpectrumPeakFinder(3, filter_type=filter_type)
+
+    batch = peak_finder.find_peaks_batch(spectra, interpolation='none')
+    loop = np.array([peak_finder.find_peak_indices(spectrum) for spectrum in spectra])
+    # the loop truncates a centroid around each maximum, the batch returns the maximum itself
+    np.testing.assert_allclose(batch, loop, atol=1)
+    np.testing.assert_array_equal(batch, np.round(centers))
+
+
+def test_parabolic_interpolation_is_sub_bin():
+    centers = np.array([[100.3, 300.7]])
+    spectra = _spectra(centers, np.array([[1.0, 2.0]]), width=20.0)
+    peak_finder = SpectrumPeakFinder(2, filter_type='none')
+
+    np.testing.assert_array_equal(peak_finder.find_peaks_batch(spectra, interpolation='none'), [[100, 301]])
+    for interpolation in ('parabolic', 'log_parabolic'):
+        np.testing.assert_allclose(peak_finder.find_peaks_batch(spectra, interpolation=interpolation), centers, atol=0.05)
@@ -0,0 +1,43 @@
+import numpy as np
+
+from doa_algorithms import Capon2D, Music2D, coarse_peaks_2d
+from signal_model import FarField2DSource
+
+AZIMUTHS = np.linspace(-60, 60, 61)
+ELEVATIONS = np.linspace(0, 60, 31)
+ANGLES = np.array([[[-20.0, 10.0], [30.0, 40.0]]])
+
+
+def _signals():
+    source = FarField2DSource(256, 2, False, 6, 4, 1e9, True, angle_type='deg', seed=0, precision='double')
+    return source.collect_plane_wave_response_batch(ANGLES, 10)
+
+
+def _joint_manifold(array):
+    elevations, azimuths = np.meshgrid(ELEVATIONS, AZIMUTHS, indexing='ij')
+    return array.steering_matrix(azimuths.reshape(-1), elevations.reshape(-1))
+
+
+def test_separable_music_matches_joint_manifold():
+    signals = _signals()
+    music = Music2D(AZIMUTHS, ELEVATIONS, 6, 4, 1e9, angle_type='deg', precision='double')
+    spectrum = music.estimate(signals, 2)
+
+    En = np.linalg.eigh(signals[0].T @ signals[0].conj() / 256)[1][:, :-2]
+    projection = En.conj().T @ _joint_manifold(music)
+    expected = 1 / np.sum(np.abs(projection)**2, axis=0).reshape(len(ELEVATIONS), len(AZIMUTHS))
+    np.testing.assert_allclose(spectrum[0], expected, rtol=1e-8)
+
+    peaks = coarse_peaks_2d(spectrum, AZIMUTHS, ELEVATIONS, 2)
+    np.testing.assert_allclose(peaks[0][np.argsort(peaks[0, :, 0])], ANGLES[0], atol=2)
+
+
+def test_separable_capon_matches_joint_manifold():
+    signals = _signals()
+    capon = Capon2D(AZIMUTHS, ELEVATIONS, 6, 4, 1e9, angle_type='deg', precision='double')
+    spectrum = capon.estimate(signals)
+
+    A = _joint_manifold(capon)
+    R_inv = np.linalg.inv(signals[0].T @ signals[0].conj() / 256)
+    expected = 1 / np.real(np.sum(A.conj() * (R_inv @ A), axis=0)).reshape(len(ELEVATIONS), len(AZIMUTHS))
+    np.testing.assert_allclose(spectrum[0], expected, rtol=1e-8)
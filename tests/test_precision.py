@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from doa_algorithms import Capon, Esprit, Music, RootMUSIC
+from doa_algorithms.refinement import coarse_peaks
+from signal_model import FarField1DSource
+
+ALL_DOAS = np.linspace(-np.pi/2, np.pi/2, 2048, endpoint=False)
+ARGS = (256, 2, False, 16, 1e9, True)
+
+
+def _estimators(precision):
+    music = Music(ALL_DOAS, None, 16, 1e9, precision=precision)
+    capon = Capon(ALL_DOAS, *ARGS, precision=precision)
+    root_music = RootMUSIC(*ARGS, precision=precision)
+    esprit = Esprit(*ARGS, precision=precision)
+    return {
+        'music': lambda x: coarse_peaks(music.estimate_batch(x, 2), ALL_DOAS, 2),
+        'capon': lambda x: coarse_peaks(capon.estimate_batch(x), ALL_DOAS, 2),
+        'root_music': lambda x: np.sort(root_music.estimate_batch(x, unit_circle_only=True), axis=-1),
+        'esprit': lambda x: np.sort(esprit.estimate_from_snapshots(x), axis=-1),
+    }
+
+
+@pytest.mark.parametrize('name', ['music', 'capon', 'root_music', 'esprit'])
+def test_single_precision_matches_double(name):
+    rng = np.random.default_rng(0)
+    angles = np.sort(rng.uniform(-1.0, 1.0, (16, 2)), axis=-1)
+    angles[:, 1] = np.maximum(angles[:, 1], angles[:, 0] + 0.25)
+    source = FarField1DSource(*ARGS, seed=0)
+    x_double = source.collect_plane_wave_response_batch(angles, 10)
+    x_single = x_double.astype(np.complex64)
+
+    estimate_double = _estimators('double')[name](x_double)
+    estimate_single = _estimators('single')[name](x_single)
+    np.testing.assert_allclose(estimate_single, estimate_double, atol=1e-3)
+    assert np.all(np.isfinite(estimate_single))
+
+
+def test_capon_spectrum_follows_precision():
+    signals = FarField1DSource(*ARGS, seed=0).collect_plane_wave_response_batch(np.array([[-0.3, 0.4]]), 10)
+    for precision, dtype in (('single', np.float32), ('double', np.float64)):
+        capon = Capon(ALL_DOAS, *ARGS, precision=precision)
+        assert capon.estimate_batch(signals).dtype == dtype
+        assert Capon(ALL_DOAS, *ARGS, backend='fft', precision=precision).estimate_batch(signals).dtype == dtype
@@ -0,0 +1,18 @@
+import numpy as np
+
+from doa_algorithms.refinement import _quadratic_form, _steering, refine_minima
+from signal_model.sensor_array import UniformLinearSensorArray
+
+
+def test_newton_never_increases_objective():
+    array = UniformLinearSensorArray(8, 1e9)
+    rng = np.random.default_rng(0)
+    X = rng.standard_normal((200, 8, 8)) + 1j * rng.standard_normal((200, 8, 8))
+    Q = X @ X.conj().swapaxes(-1, -2)
+    angles = rng.uniform(-1.4, 1.4, (200, 6))
+
+    # a wide step bound lets single Newton steps overshoot far past the minimum
+    refined = refine_minima(array, Q, angles, 'newton', num_iter=3, grid_spacing=3.0)
+    before = _quadratic_form(Q, _steering(array, angles, 8))
+    after = _quadratic_form(Q, _steering(array, refined, 8))
+    assert np.all(after <= before * (1 + 1e-12))
@@ -0,0 +1,17 @@
+import numpy as np
+
+from doa_algorithms import RootMUSIC
+from signal_model import FarField1DSource
+
+
+def test_default_returns_distinct_doas():
+    angles = np.array([-0.4, 0.3])
+    source = FarField1DSource(256, 2, False, 8, 1e9, True, seed=0)
+    root_music = RootMUSIC(256, 2, False, 8, 1e9, True)
+    signals = source.collect_plane_wave_response_batch(np.tile(angles, (4, 1)), 20)
+
+    estimate = np.sort(root_music.estimate(signals[0]))
+    np.testing.assert_allclose(estimate, angles, atol=0.02)
+
+    batch = np.sort(root_music.estimate_batch(signals), axis=-1)
+    np.testing.assert_allclose(batch, np.tile(angles, (4, 1)), atol=0.02)
@@ -0,0 +1,26 @@
+import asyncio
+import io
+import json
+
+import numpy as np
+
+from doa_algorithms import DOAService
+from signal_model import FarField1DSource
+
+
+def test_root_music_service_returns_distinct_doas():
+    angles = np.array([-0.4, 0.3])
+    source = FarField1DSource(256, 2, False, 8, 1e9, True, seed=0)
+    blocks = source.collect_plane_wave_response_batch(np.tile(angles, (3, 1)), 20)
+
+    async def frames():
+        for frame_id, block in enumerate(blocks):
+            yield frame_id, block.astype(np.complex64)
+
+    output = io.StringIO()
+    service = DOAService(8, 2, 1e9, max_workers=1)
+    stats = asyncio.run(service.run(frames(), output))
+
+    assert stats['processed'] == 3
+    for line in output.getvalue().splitlines():
+        np.testing.assert_allclose(json.loads(line)['doas'], angles, atol=0.02)
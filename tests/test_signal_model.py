@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from signal_model import FarField1DSource, generate_random_angles, generate_random_angles_batch
+
+
+def test_seeded_source_is_reproducible():
+    angles = np.array([-0.4, 0.3])
+    first = FarField1DSource(64, 2, False, 8, 1e9, True, seed=7).collect_plane_wave_response(angles, 10)
+    second = FarField1DSource(64, 2, False, 8, 1e9, True, seed=7).collect_plane_wave_response(angles, 10)
+    other = FarField1DSource(64, 2, False, 8, 1e9, True, seed=8).collect_plane_wave_response(angles, 10)
+    np.testing.assert_array_equal(first, second)
+    assert not np.allclose(first, other)
+
+
+def test_random_angles_follow_the_generator():
+    all_angles = np.linspace(-1, 1, 200)
+    first = generate_random_angles(3, all_angles, 0.1, rng=np.random.default_rng(3))
+    second = generate_random_angles(3, all_angles, 0.1, rng=np.random.default_rng(3))
+    np.testing.assert_array_equal(first, second)
+    assert np.min(np.diff(np.sort(first))) >= 0.1
+
+
+def test_random_angle_batch_honours_min_separation():
+    all_angles = np.linspace(-1, 1, 201)
+    angles = generate_random_angles_batch(500, 4, all_angles, 0.3, np.random.default_rng(0))
+    assert angles.shape == (500, 4)
+    assert np.all(np.isin(angles, all_angles))
+    assert np.all(np.diff(angles, axis=-1) >= 0.3)
+
+    with pytest.raises(ValueError):
+        generate_random_angles_batch(1, 4, all_angles, 0.7, np.random.default_rng(0))
+
+
+def test_batch_response_spans_each_rows_steering_matrix():
+    angles = np.array([[-0.4, 0.3], [0.1, 0.5], [-1.0, 1.2]])
+    source = FarField1DSource(64, 2, False, 8, 1e9, True, seed=0, precision='double')
+    out = np.empty((3, 64, 8), dtype=np.complex128)
+    signals = source.collect_plane_wave_response_batch(angles, np.array([200.0, 200.0, 200.0]), out=out)
+    assert signals is out
+
+    for x, row in zip(signals, angles):
+        A = source.steering_matrix(row)
+        residual = x.T - A @ np.linalg.lstsq(A, x.T, rcond=None)[0]
+        assert np.linalg.norm(residual) < 1e-8 * np.linalg.norm(x)
+        np.testing.assert_allclose(np.mean(np.abs(x)**2), 1e20, rtol=1e-6)
+
+    with pytest.raises(ValueError):
+        source.collect_plane_wave_response_batch(angles, 10, out=np.empty((3, 64, 8), dtype=np.complex64))
+
+
+def test_batch_response_snr_per_row():
+    angles = np.tile([-0.4, 0.3], (2, 1))
+    source = FarField1DSource(4096, 2, False, 8, 1e9, True, seed=0)
+    signals = source.collect_plane_wave_response_batch(angles, np.array([0.0, 10.0]))
+    np.testing.assert_allclose(np.mean(np.abs(signals)**2, axis=(-2, -1)), [2.0, 11.0], rtol=0.05)
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from signal_model.covariance import sample_covariance
+from signal_model.spatial_smoothing import fbss, improved_spatial_smoothed_covariance
+
+
+def _fbss_loop(R, num_antenna, num_subarray):
+    p = num_antenna - num_subarray + 1
+    Rf = R[:p, :p].copy()
+    for i in range(1, num_subarray):
+        Rf += R[i:i+p, i:i+p]
+    Rf /= num_subarray
+    return 0.5 * (Rf + np.flip(Rf).conj())
+
+
+def _improved_loop(R, num_antenna, num_subarray):
+    p = num_antenna - num_subarray + 1
+    Rf_ii = Rf_jj = Rf_ij = Rf_ji = 0
+    for i in range(num_subarray):
+        for j in range(num_subarray):
+            Rf_ii += R[i:i+p, i:i+p]
+            Rf_jj += R[j:j+p, j:j+p]
+            Rf_ij += R[i:i+p, j:j+p]
+            Rf_ji += R[j:j+p, i:i+p]
+    R1 = (Rf_ii @ np.flip(Rf_ii)) + (Rf_jj @ np.flip(Rf_jj))
+    R1 += (Rf_ij @ np.flip(Rf_ij)) + (Rf_ji @ np.flip(Rf_ji))
+    return R1 / 2*num_subarray
+
+
+@pytest.mark.parametrize('num_subarray', [1, 3, 8])
+@pytest.mark.parametrize('smoothing, loop', [(fbss, _fbss_loop), (improved_spatial_smoothed_covariance, _improved_loop)])
+def test_matches_loop(smoothing, loop, num_subarray):
+    rng = np.random.default_rng(0)
+    signals = rng.standard_normal((4, 64, 8)) + 1j * rng.standard_normal((4, 64, 8))
+    R = sample_covariance(signals)
+
+    from_signals = smoothing(signals, 8, num_subarray)
+    from_covariance = smoothing(R, 8, num_subarray, is_covariance=True)
+    for b in range(4):
+        expected = loop(R[b], 8, num_subarray)
+        np.testing.assert_allclose(from_signals[b], expected, rtol=1e-10, atol=1e-10)
+        np.testing.assert_allclose(from_covariance[b], expected, rtol=1e-10, atol=1e-10)
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from doa_algorithms import StreamingCovariance, SubspaceTracker
+from signal_model import FarField1DSource
+from signal_model.covariance import sample_covariance
+
+
+def _snapshots(num_sample, seed=0):
+    source = FarField1DSource(num_sample, 2, False, 8, 1e9, True, seed=seed, precision='double')
+    return source.collect_plane_wave_response(np.array([-0.4, 0.3]), 10)
+
+
+def test_sliding_window_matches_sample_covariance():
+    snapshots = _snapshots(500)
+    streaming = StreamingCovariance(8, window=64)
+    for start in range(0, 500, 7):
+        R = streaming.update_block(snapshots[start:start + 7])
+    np.testing.assert_allclose(R, sample_covariance(snapshots[-64:]), atol=1e-10)
+
+
+def test_unit_forgetting_factor_matches_sample_covariance():
+    snapshots = _snapshots(300)
+    streaming = StreamingCovariance(8, forgetting_factor=1.0)
+    for snapshot in snapshots:
+        R = streaming.update(snapshot)
+    np.testing.assert_allclose(R, sample_covariance(snapshots), atol=1e-10)
+
+
+@pytest.mark.parametrize('method', ['past', 'pastd'])
+def test_tracker_converges_to_eigh_subspace(method):
+    snapshots = _snapshots(4000)
+    tracker = SubspaceTracker(8, 2, forgetting_factor=0.995, method=method)
+    tracker.update_block(snapshots)
+
+    _, eigenvectors = np.linalg.eigh(sample_covariance(snapshots[-1000:]))
+    Es = eigenvectors[:, -2:]
+    Us = tracker.signal_subspace()
+    distance = np.linalg.norm(Us @ Us.conj().T - Es @ Es.conj().T, 2)
+    assert distance < 0.05
+
+    En = tracker.noise_subspace()
+    np.testing.assert_allclose(En.conj().T @ En, np.eye(6), atol=1e-10)
+    np.testing.assert_allclose(En.conj().T @ Us, 0, atol=1e-10)
@@ -0,0 +1,37 @@
+import numpy as np
+
+from doa_algorithms import DOATracker, Music
+from signal_model import FarField1DSource
+
+
+def _noise_frame(rng, num_sample=256, num_antenna=8):
+    shape = (num_sample, num_antenna)
+    return (rng.standard_normal(shape) + 1j * rng.standard_normal(shape)) / np.sqrt(2)
+
+
+def test_source_free_frames():
+    all_doas = np.linspace(-np.pi / 2, np.pi / 2, 512, endpoint=False)
+    tracker = DOATracker(Music(all_doas, None, 8, 1e9), num_sources='mdl')
+    rng = np.random.default_rng(0)
+
+    for _ in range(3):
+        angles = tracker.update(_noise_frame(rng))
+        assert angles.shape == (0,)
+        assert tracker.last_scan is None
+    assert tracker.num_frames == 3
+    assert tracker.num_full_scans == 0
+
+
+def test_source_appears_after_source_free_frames():
+    all_doas = np.linspace(-np.pi / 2, np.pi / 2, 512, endpoint=False)
+    tracker = DOATracker(Music(all_doas, None, 8, 1e9), num_sources='mdl')
+    rng = np.random.default_rng(1)
+    source = FarField1DSource(256, 1, False, 8, 1e9, True, seed=1)
+
+    tracker.update(_noise_frame(rng))
+    angles = tracker.update(source.collect_plane_wave_response(np.array([0.3]), 10))
+    assert tracker.last_scan == 'full'
+    np.testing.assert_allclose(angles, [0.3], atol=0.02)
+
+    angles = tracker.update(_noise_frame(rng))
+    assert angles.shape == (0,)
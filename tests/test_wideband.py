@@ -0,0 +1,25 @@
+import numpy as np
+
+from doa_algorithms import WidebandMusic
+from signal_model import WidebandFarField1DSource
+
+ALL_DOAS = np.linspace(-np.pi/2, np.pi/2, 361)
+
+
+def _per_bin_incoherent(music, R, num_sources):
+    p_music = 0
+    for k, freq in enumerate(music.freqs):
+        _, eigenvectors = np.linalg.eigh(R[..., k, :, :])
+        En = eigenvectors[..., :music.num_antenna - num_sources]
+        projection = En.conj().swapaxes(-1, -2) @ music.steering_matrix_at(ALL_DOAS, np.array([freq]))[0]
+        p_music = p_music + np.sum(np.abs(projection)**2, axis=-2)
+    return len(music.freqs) / p_music
+
+
+def test_incoherent_matches_per_bin_loop():
+    source = WidebandFarField1DSource(1024, 2, False, 8, 1e9, 2e8, 1.6e8, seed=0)
+    signals = source.collect_plane_wave_response_batch(np.array([[-0.4, 0.3], [0.1, 0.7]]), 10)
+    music = WidebandMusic(ALL_DOAS, 2e8, 8, 1e9, nfft=16, bandwidth=1.6e8, precision='double')
+
+    R = music.bin_covariances(signals)
+    np.testing.assert_allclose(music.estimate_from_covariance(R, 2), _per_bin_incoherent(music, R, 2), rtol=1e-8)
@@ -0,0 +1,33 @@
+import numpy as np
+
+from doa_algorithms import workers
+from signal_model import FarField1DSource
+
+
+def test_estimator_cache_is_bounded():
+    config = {
+        'num_antenna': 8, 'num_target': 2, 'freq': 1e9, 'all_doas': np.linspace(-1, 1, 64).tolist(),
+        'coherent': False, 'is_baseband': True,
+    }
+    first = workers.build_estimators(config, 16)
+    assert workers.build_estimators(config, 16) is first
+
+    for num_sample in range(17, 17 + 2 * workers.MAX_CACHED_ESTIMATORS):
+        workers.build_estimators(config, num_sample)
+    assert len(workers._worker_estimators) == workers.MAX_CACHED_ESTIMATORS
+    assert workers.build_estimators(config, 16) is not first
+
+
+def test_spectral_estimates_use_batched_peaks():
+    config = {
+        'num_antenna': 8, 'num_target': 2, 'freq': 1e9, 'all_doas': np.linspace(-1.5, 1.5, 512).tolist(),
+        'coherent': False, 'is_baseband': True,
+    }
+    estimators = workers.build_estimators(config, 256)
+    angles = np.array([-0.4, 0.3])
+    source = FarField1DSource(256, 2, False, 8, 1e9, True, seed=0)
+    sig = source.collect_plane_wave_response(angles, 20)
+
+    for name in ('music', 'capon'):
+        doas = workers.estimate_doas(estimators, name, sig, np.asarray(config['all_doas']), 2)
+        np.testing.assert_allclose(doas, angles, atol=0.02)